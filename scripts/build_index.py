@@ -6,7 +6,11 @@ Automatically generates category README files from YAML prompt files.
 This ensures category READMEs stay in sync with prompt library.
 
 Usage:
-    python scripts/build_index.py
+    python scripts/build_index.py            # Rebuild only what changed
+    python scripts/build_index.py --force    # Rebuild every category
+    python scripts/build_index.py --stream   # Stream every README to disk
+    python scripts/build_index.py --prompts /tmp/corpus/prompts
+    python scripts/build_index.py --profile  # Print per-stage timings
 
 Features:
     - Scans all prompt YAML files in prompts/ directory
@@ -14,14 +18,41 @@ Features:
     - Maintains consistent formatting
     - Preserves category descriptions
     - Sorts prompts by creation date (newest first)
+    - Incremental: skips categories whose YAML files are unchanged, re-renders
+      only entries whose source changed, and writes a README only when its
+      bytes differ (state in .cache/build_index_state.json)
+    - Streaming: large categories are rendered one entry at a time straight
+      to a temp file that is atomically renamed into place, so memory stays
+      flat regardless of category size
 """
 
-import yaml
+import os
+import re
 import sys
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
+from prompt_corpus import load_document, read_document
+from instrumentation import add_profile_arguments, profiler_from_args
+from prompt_discovery import add_discovery_arguments, discovery_from_args, iter_categories
+
+# Default location of the incremental build state (ignored by git)
+DEFAULT_STATE_PATH = Path(__file__).parent.parent / ".cache" / "build_index_state.json"
+
+STATE_VERSION = 1
+
+# Categories with at least this many prompts are always streamed
+STREAMING_THRESHOLD = 5000
+
+# Top-level `created:` line, read without parsing the whole document
+CREATED_PATTERN = re.compile(r'^created:[ \t]*["\']?([^"\'#\n]*?)["\']?[ \t]*(?:#.*)?$', re.MULTILINE)
+
 # Category descriptions
 CATEGORY_DESCRIPTIONS = {
     "cinematic": {
@@ -46,8 +77,7 @@ CATEGORY_DESCRIPTIONS = {
 def load_prompt(file_path: Path) -> Dict:
     """Load and parse a YAML prompt file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        return load_document(file_path)
     except Exception as e:
         print(f"❌ Error loading {file_path}: {e}", file=sys.stderr)
         return None
@@ -134,91 +164,412 @@ def generate_prompt_entry(prompt_data: Dict, file_name: str) -> str:
     return "\n".join(entry_parts)
 
 
+def created_key(prompt_data: Dict) -> str:
+    """Sort key for a prompt's creation date (YYYY-MM-DD sorts as text)."""
+    return str(prompt_data.get('created', ''))
+
+
 def generate_category_readme(category: str, prompts: List[tuple]) -> str:
     """Generate complete README content for a category."""
+    entries = [
+        (created_key(prompt_data), generate_prompt_entry(prompt_data, file_name))
+        for prompt_data, file_name in prompts
+    ]
+    return render_category_readme(category, entries)
+
+
+def render_category_readme(category: str, entries: List[Tuple[str, str]]) -> str:
+    """Assemble README content from (created, rendered entry) pairs."""
     if category not in CATEGORY_DESCRIPTIONS:
         print(f"⚠️  Unknown category: {category}", file=sys.stderr)
         return None
 
-    cat_info = CATEGORY_DESCRIPTIONS[category]
-    lines = []
-
-    # Header
-    lines.append(f"# {cat_info['emoji']} {category.title()} Prompts\n")
-    lines.append(f"{cat_info['description']}\n")
-    lines.append(f"**Total Prompts**: {len(prompts)}\n")
-    lines.append("---\n")
+    lines = readme_header(category, len(entries))
 
     # Sort prompts by creation date (newest first)
-    sorted_prompts = sorted(prompts, key=lambda x: x[0].get('created', ''), reverse=True)
+    sorted_entries = sorted(entries, key=lambda x: x[0], reverse=True)
 
-    # Generate entries
-    for prompt_data, file_name in sorted_prompts:
-        entry = generate_prompt_entry(prompt_data, file_name)
+    # Add entries
+    for _, entry in sorted_entries:
         lines.append(entry)
 
-    # Back link
-    lines.append("\n---\n")
-    lines.append("← [Back to Main README](../../README.md)\n")
+    lines.extend(readme_footer())
 
     return "\n".join(lines)
 
 
-def main():
+def readme_header(category: str, prompt_count: int) -> List[str]:
+    """README lines that precede the prompt entries."""
+    cat_info = CATEGORY_DESCRIPTIONS[category]
+    return [
+        f"# {cat_info['emoji']} {category.title()} Prompts\n",
+        f"{cat_info['description']}\n",
+        f"**Total Prompts**: {prompt_count}\n",
+        "---\n",
+    ]
+
+
+def readme_footer() -> List[str]:
+    """README lines that follow the prompt entries (back link)."""
+    return [
+        "\n---\n",
+        "← [Back to Main README](../../README.md)\n",
+    ]
+
+
+def file_digest(data: bytes) -> str:
+    """Hash file contents."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def hash_file(file_path: Path) -> str:
+    """Hash a file in chunks, matching file_digest() of its bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildState:
+    """
+    Inputs and outputs of the previous build, used to skip unchanged work.
+
+    Tracks a fingerprint (mtime, size, content hash) and the rendered entry
+    of every prompt file, plus the input set and README hash of every
+    category. The whole state is discarded when this script changes, since
+    the rendering code may have changed with it.
+    """
+
+    def __init__(self, path: Path, generator_hash: str, fresh: bool = False):
+        self.path = Path(path)
+        self.generator_hash = generator_hash
+        self.files: Dict[str, Dict] = {}
+        self.categories: Dict[str, Dict] = {}
+
+        if fresh:
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == STATE_VERSION and data.get('generator') == generator_hash:
+            self.files = data.get('files', {})
+            self.categories = data.get('categories', {})
+
+    def fingerprint(self, file_path: Path, stat: Optional[os.stat_result] = None) -> str:
+        """
+        Return a file's content hash, trusting an unchanged mtime and size.
+
+        ``stat`` may be passed in when the caller already has it from discovery.
+        """
+        key = os.path.abspath(file_path)
+        stat = stat or os.stat(key)
+        record = self.files.get(key)
+        if record and record['mtime_ns'] == stat.st_mtime_ns and record['size'] == stat.st_size:
+            return record['digest']
+
+        with open(key, 'rb') as f:
+            digest = file_digest(f.read())
+
+        if record and record['digest'] == digest:
+            record['mtime_ns'] = stat.st_mtime_ns
+            record['size'] = stat.st_size
+        else:
+            # Content changed: the cached entry is stale
+            self.files[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'digest': digest}
+        return digest
+
+    def cached_entry(self, file_path: Path) -> Optional[Tuple[str, str]]:
+        """Return the (created, entry) rendered from the file's current content."""
+        record = self.files.get(os.path.abspath(file_path))
+        if record and 'entry' in record:
+            return record['created'], record['entry']
+        return None
+
+    def store_entry(self, file_path: Path, created: str, entry: str) -> None:
+        """Remember the entry rendered from the file's current content."""
+        record = self.files[os.path.abspath(file_path)]
+        record['created'] = created
+        record['entry'] = entry
+
+    def category_unchanged(self, category: str, inputs: Dict[str, str], readme_path: Path) -> bool:
+        """Check that a category's inputs and its README are as last built."""
+        record = self.categories.get(category)
+        if not record or record['inputs'] != inputs:
+            return False
+        try:
+            return hash_file(readme_path) == record['readme']
+        except OSError:
+            return False
+
+    def record_category(self, category: str, inputs: Dict[str, str], readme_digest: str) -> None:
+        """Remember a category's inputs and the hash of the README built from them."""
+        self.categories[category] = {
+            'inputs': inputs,
+            'readme': readme_digest,
+        }
+
+    def save(self) -> None:
+        """Write the state file, dropping files that no longer exist."""
+        self.files = {key: record for key, record in self.files.items() if os.path.exists(key)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': STATE_VERSION,
+                'generator': self.generator_hash,
+                'files': self.files,
+                'categories': self.categories,
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+def build_category(category: str, yaml_files: List[Path],
+                   state: BuildState) -> Tuple[Optional[str], int, int, bool]:
+    """
+    Render a category README, reusing cached entries for unchanged files.
+
+    Returns:
+        (readme_content, prompt_count, regenerated_entry_count, all_files_loaded)
+    """
+    entries = []
+    regenerated = 0
+    all_loaded = True
+
+    for yaml_file in yaml_files:
+        cached = state.cached_entry(yaml_file)
+        if cached:
+            entries.append(cached)
+            continue
+
+        prompt_data = load_prompt(yaml_file)
+        if not prompt_data:
+            all_loaded = False
+            continue
+
+        created = created_key(prompt_data)
+        entry = generate_prompt_entry(prompt_data, yaml_file.name)
+        state.store_entry(yaml_file, created, entry)
+        entries.append((created, entry))
+        regenerated += 1
+
+    if not entries:
+        return None, 0, 0, all_loaded
+
+    return render_category_readme(category, entries), len(entries), regenerated, all_loaded
+
+
+def read_created(file_path: Path) -> str:
+    """
+    Read a prompt's creation date as a sort key.
+
+    Scans for the top-level ``created:`` line instead of parsing the whole
+    document, falling back to a full parse when the line is not found.
+    """
+    text = file_path.read_text(encoding='utf-8')
+    match = CREATED_PATTERN.search(text)
+    if match:
+        return match.group(1).strip()
+    try:
+        return created_key(read_document(file_path) or {})
+    except Exception:
+        return ''
+
+
+def iter_category_entries(yaml_files: List[Path], state: BuildState) -> Iterator[Tuple[Optional[str], bool]]:
+    """
+    Yield rendered entries newest first, loading one prompt at a time.
+
+    Only (created, path) sort keys are held for the whole category. Yields
+    (entry, regenerated) pairs; entry is None for a file that failed to load.
+    """
+    keys = [(read_created(yaml_file), yaml_file) for yaml_file in yaml_files]
+    keys.sort(key=lambda key: key[0], reverse=True)
+
+    for _, yaml_file in keys:
+        cached = state.cached_entry(yaml_file)
+        if cached:
+            yield cached[1], False
+            continue
+
+        try:
+            prompt_data = read_document(yaml_file)
+        except Exception as e:
+            print(f"❌ Error loading {yaml_file}: {e}", file=sys.stderr)
+            prompt_data = None
+
+        if prompt_data:
+            yield generate_prompt_entry(prompt_data, yaml_file.name), True
+        else:
+            yield None, False
+
+
+def stream_category_readme(category: str, yaml_files: List[Path], readme_path: Path,
+                           state: BuildState) -> Tuple[bool, int, int, bool, str]:
+    """
+    Write a category README entry by entry and atomically rename it into place.
+
+    Entries go to a temporary body file first, because the header's prompt
+    count is only known once every file has been loaded. The README is
+    replaced only when the new bytes differ from the current file.
+
+    Returns:
+        (changed, prompt_count, regenerated_entry_count, all_files_loaded, readme_digest)
+    """
+    prompt_count = 0
+    regenerated = 0
+    all_loaded = True
+
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as body:
+        for entry, was_regenerated in iter_category_entries(yaml_files, state):
+            if entry is None:
+                all_loaded = False
+                continue
+            body.write("\n")
+            body.write(entry)
+            prompt_count += 1
+            regenerated += was_regenerated
+
+        if not prompt_count:
+            return False, 0, 0, all_loaded, ''
+
+        body.seek(0)
+        fd, tmp_name = tempfile.mkstemp(dir=readme_path.parent, prefix=".README.", suffix=".tmp")
+        tmp_path = Path(tmp_name)
+        try:
+            with open(fd, 'w', encoding='utf-8') as out:
+                out.write("\n".join(readme_header(category, prompt_count)))
+                shutil.copyfileobj(body, out)
+                out.write("\n" + "\n".join(readme_footer()))
+
+            digest = hash_file(tmp_path)
+            if readme_path.exists() and hash_file(readme_path) == digest:
+                tmp_path.unlink()
+                return False, prompt_count, regenerated, all_loaded, digest
+
+            os.replace(tmp_path, readme_path)
+            return True, prompt_count, regenerated, all_loaded, digest
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate category README files from prompt YAML files.")
+    parser.add_argument('--force', action='store_true',
+                        help="Ignore the build state and re-render every category")
+    parser.add_argument('--state', type=Path, default=DEFAULT_STATE_PATH,
+                        help="Incremental build state (default: .cache/build_index_state.json)")
+    parser.add_argument('--stream', action='store_true',
+                        help=f"Stream every category to disk (always on for {STREAMING_THRESHOLD}+ prompts)")
+    parser.add_argument('--prompts', type=Path, default=Path(__file__).parent.parent / "prompts",
+                        help="Prompt directory (default: prompts/)")
+    add_profile_arguments(parser)
+    add_discovery_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Main execution function."""
+    args = parse_args(argv)
+    profiler = profiler_from_args('build_index', args)
+    discovery_from_args(args)
+
     print("🔨 Building category indexes...\n")
 
-    # Get project root
-    script_dir = Path(__file__).parent
-    project_root = script_dir.parent
-    prompts_dir = project_root / "prompts"
+    prompts_dir = args.prompts
 
     if not prompts_dir.exists():
         print(f"❌ Prompts directory not found: {prompts_dir}", file=sys.stderr)
         sys.exit(1)
 
-    # Collect prompts by category
-    prompts_by_category = {}
+    generator_hash = file_digest(Path(__file__).read_bytes())
+    state = BuildState(args.state, generator_hash, fresh=args.force)
 
-    for category_dir in prompts_dir.iterdir():
-        if not category_dir.is_dir():
-            continue
+    updated_count = 0
+    unchanged_count = 0
+    skipped_count = 0
 
-        category = category_dir.name
-        prompts_by_category[category] = []
+    # Categories are listed concurrently and arrive in name order as each finishes
+    categories = iter_categories(prompts_dir)
+    while True:
+        with profiler.stage('discover'):
+            category, prompt_files = next(categories, (None, None))
+        if category is None:
+            break
 
-        # Find all YAML files
-        for yaml_file in category_dir.glob("*.yaml"):
-            if yaml_file.name == "README.md":
-                continue
-
-            prompt_data = load_prompt(yaml_file)
-            if prompt_data:
-                prompts_by_category[category].append((prompt_data, yaml_file.name))
+        readme_path = prompts_dir / category / "README.md"
 
-    # Generate README for each category
-    updated_count = 0
-    for category, prompts in prompts_by_category.items():
-        if not prompts:
+        # Prompt files come sorted, so equal dates always render in the same order
+        yaml_files = [prompt_file.path for prompt_file in prompt_files]
+        if not yaml_files:
             print(f"⚠️  No prompts found for category: {category}")
             continue
 
-        readme_content = generate_category_readme(category, prompts)
-        if not readme_content:
+        with profiler.stage('fingerprint'):
+            inputs = {prompt_file.path.name: state.fingerprint(prompt_file.path, prompt_file.stat)
+                      for prompt_file in prompt_files}
+        if state.category_unchanged(category, inputs, readme_path):
+            print(f"⏭️  Skipped {category}/README.md (inputs unchanged)")
+            skipped_count += 1
             continue
 
-        readme_path = prompts_dir / category / "README.md"
+        if category not in CATEGORY_DESCRIPTIONS:
+            print(f"⚠️  Unknown category: {category}", file=sys.stderr)
+            continue
 
-        # Write README
         try:
-            with open(readme_path, 'w', encoding='utf-8') as f:
-                f.write(readme_content)
-            print(f"✅ Updated {category}/README.md ({len(prompts)} prompts)")
-            updated_count += 1
+            with profiler.stage('render', histogram='readme_render_seconds', category=category):
+                if args.stream or len(yaml_files) >= STREAMING_THRESHOLD:
+                    changed, prompt_count, regenerated, all_loaded, readme_digest = stream_category_readme(
+                        category, yaml_files, readme_path, state
+                    )
+                else:
+                    readme_content, prompt_count, regenerated, all_loaded = build_category(category, yaml_files, state)
+                    changed = False
+                    readme_digest = ''
+                    if readme_content:
+                        current = readme_path.read_text(encoding='utf-8') if readme_path.exists() else None
+                        changed = current != readme_content
+                        if changed:
+                            with open(readme_path, 'w', encoding='utf-8') as f:
+                                f.write(readme_content)
+                        readme_digest = file_digest(readme_content.encode('utf-8'))
         except Exception as e:
             print(f"❌ Error writing {readme_path}: {e}", file=sys.stderr)
+            continue
+
+        if not prompt_count:
+            if all_loaded:
+                print(f"⚠️  No prompts found for category: {category}")
+            continue
+
+        if changed:
+            print(f"✅ Updated {category}/README.md "
+                  f"({prompt_count} prompts, {regenerated} entries re-rendered)")
+            updated_count += 1
+        else:
+            print(f"✔️  {category}/README.md already up to date "
+                  f"({prompt_count} prompts, {regenerated} entries re-rendered)")
+            unchanged_count += 1
+
+        # Files that failed to load must be retried (and reported) next run
+        if all_loaded:
+            state.record_category(category, inputs, readme_digest)
+
+    try:
+        with profiler.stage('save_state'):
+            state.save()
+    except OSError as e:
+        print(f"⚠️  Could not save build state: {e}", file=sys.stderr)
 
-    print(f"\n✨ Successfully updated {updated_count} category READMEs")
+    print(f"\n✨ Successfully updated {updated_count} category READMEs "
+          f"({unchanged_count} already current, {skipped_count} skipped)")
 
 
 if __name__ == "__main__":
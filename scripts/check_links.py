@@ -9,28 +9,108 @@ Usage:
     python scripts/check_links.py                    # Check all prompts
     python scripts/check_links.py prompts/category/  # Check specific category
     python scripts/check_links.py prompt.yaml        # Check single file
+    python scripts/check_links.py --jobs 32 --per-host 2 prompts/
+    python scripts/check_links.py --no-cache prompts/  # Ignore the result cache
+    python scripts/check_links.py --host-rate youtube.com=1 prompts/
+    python scripts/check_links.py --profile prompts/  # Per-host request latency
+    python scripts/check_links.py --circuit-threshold 5 --max-retries 3 prompts/
+    python scripts/check_links.py --oembed youtube.com=http://localhost:8000/oembed prompts/
+    python scripts/check_links.py --no-platform-probes prompts/  # HEAD/GET for every link
+
+    # Fan out across CI jobs, then combine their results
+    python scripts/check_links.py --shard 1/4 --results results-1.json prompts/
+    python scripts/check_links.py merge results-*.json
 
 Features:
     - Validates HTTP/HTTPS accessibility
+    - Checks links concurrently with a bounded worker pool
+    - Probes each unique link once (youtu.be, /shorts/, tracking params on
+      video hosts etc. collapse), using the URL as written in the YAML
+    - Rate-limits requests per host to avoid 429s
+    - Caps in-flight requests per host and reuses pooled keep-alive connections
+    - Stops probing a host after repeated timeouts or connection errors
+      (circuit breaker); its remaining links are reported as "Circuit open"
+    - Retries 429/503 answers after their Retry-After delay, pausing the host
+    - Checks YouTube and Vimeo videos through their oEmbed endpoints, which
+      answer with a small JSON document and report removed or private videos
+      (the watch pages return 200 for those); channels, playlists and
+      other hosts get HEAD, then GET
+    - Caches results on disk with TTLs and conditional revalidation
     - Checks for common video hosting platforms
     - Reports broken links with details
+    - Splits the unique links into deterministic shards (--shard i/N) whose
+      result files `merge` combines into one report and exit code
     - Exit code 1 if any links are broken (for CI)
 
 Requirements:
     - requests library (included in requirements.txt)
 """
 
-import yaml
+import os
+import re
 import sys
+import json
+import heapq
+import hashlib
+import argparse
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-from urllib.parse import urlparse
-from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qs, parse_qsl, urlencode
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from dataclasses import asdict, dataclass, field
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from prompt_corpus import load_document
+from instrumentation import add_profile_arguments, get_profiler, profiler_from_args
+from prompt_discovery import add_discovery_arguments, discovery_from_args, find_prompt_files
+from link_cache import LinkCache, DEFAULT_CACHE_PATH, HEALTHY_TTL, BROKEN_TTL, normalize_url
 
 # Timeout for HTTP requests (seconds)
 REQUEST_TIMEOUT = 10
 
+# Maximum number of links checked at the same time
+MAX_WORKERS = 16
+
+# Maximum number of in-flight requests against a single host
+PER_HOST_LIMIT = 4
+
+# Maximum request rate per platform (requests per second); others are unlimited
+HOST_RATE_LIMITS = {
+    'youtube.com': 2.0,
+    'youtu.be': 2.0,
+    'vimeo.com': 2.0,
+}
+
+# Consecutive timeouts or connection errors that open a host's circuit (0 disables)
+CIRCUIT_THRESHOLD = 3
+
+# Seconds an open circuit waits before letting one trial request through
+CIRCUIT_COOLDOWN = 60.0
+
+# Prefix of error_message for links that were not probed because their host's circuit was open
+CIRCUIT_OPEN = "Circuit open"
+
+# Status codes that mean "try again later" rather than "broken"
+RETRY_STATUSES = (429, 503)
+
+# Retries of a rate-limited link, and the longest Retry-After that is waited for (seconds)
+MAX_RETRIES = 2
+MAX_RETRY_AFTER = 120.0
+
+# Delay before the first retry when the server sends no Retry-After (doubles per attempt)
+RETRY_BACKOFF = 5.0
+
+USER_AGENT = "awesome-sora2-prompts-link-checker/1.0"
+
+# Version of the --results file format
+RESULTS_VERSION = 1
+
 # Supported video hosting platforms
 SUPPORTED_PLATFORMS = [
     'youtube.com',
@@ -41,6 +121,25 @@ SUPPORTED_PLATFORMS = [
     'twitch.tv',
 ]
 
+# oEmbed endpoints of platforms probed by OEmbedProbe instead of HEAD/GET
+OEMBED_ENDPOINTS = {
+    'youtube.com': 'https://www.youtube.com/oembed',
+    'youtu.be': 'https://www.youtube.com/oembed',
+    'vimeo.com': 'https://vimeo.com/api/oembed.json',
+}
+
+# Query parameters that never change which video a link points at
+TRACKING_PARAMS = {'fbclid', 'gclid', 'si', 'feature', 'ref', 'ab_channel', 'pp'}
+
+# YouTube paths whose second segment is the video id
+YOUTUBE_PATH_PREFIXES = ('/shorts/', '/embed/', '/live/', '/v/')
+
+# Platforms whose video links canonicalize_url() reduces to a video id
+VIDEO_ID_PLATFORMS = ('youtube.com', 'youtu.be', 'vimeo.com')
+
+# Canonical form of a Vimeo video link
+VIMEO_VIDEO = re.compile(r'^https://vimeo\.com/[0-9]+$')
+
 
 @dataclass
 class LinkCheckResult:
@@ -54,11 +153,32 @@ class LinkCheckResult:
     platform: Optional[str]
 
 
+@dataclass
+class LinkProbe:
+    """Raw outcome of probing a URL, including cache validators."""
+    accessible: bool
+    status_code: Optional[int]
+    error_message: Optional[str]
+    final_url: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+    # Timeout or connection error: no answer from the host at all
+    unreachable: bool = False
+    # Seconds requested by a 429/503 Retry-After header
+    retry_after: Optional[float] = None
+    # Not probed because the host's circuit was open
+    circuit_open: bool = False
+
+    def outcome(self) -> Tuple[bool, Optional[int], Optional[str]]:
+        """Return the (accessible, status_code, error_message) tuple."""
+        return self.accessible, self.status_code, self.error_message
+
+
 def load_prompt(file_path: Path) -> Optional[Dict]:
     """Load and parse a YAML prompt file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        return load_document(file_path)
     except Exception as e:
         print(f"⚠️  Error loading {file_path}: {e}", file=sys.stderr)
         return None
@@ -84,38 +204,341 @@ def extract_platform(url: str) -> Optional[str]:
         return None
 
 
-def check_link(url: str, timeout: int = REQUEST_TIMEOUT) -> Tuple[bool, Optional[int], Optional[str]]:
+def extract_host(url: str) -> str:
+    """Extract the lowercase network location used for per-host limits."""
+    try:
+        return urlparse(url).netloc.lower()
+    except Exception:
+        return ""
+
+
+def create_session(pool_size: int = MAX_WORKERS) -> requests.Session:
+    """
+    Create an HTTP session shared by all link checks.
+
+    The session keeps connections alive between requests, and its connection
+    pool is sized so every worker can hold a connection to the same host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
     """
-    Check if a URL is accessible.
+    Tracks consecutive transport failures per host.
 
-    Returns:
-        Tuple of (accessible, status_code, error_message)
+    After ``threshold`` timeouts or connection errors in a row, the host's
+    circuit opens and its remaining links fail fast instead of each waiting
+    out the request timeout. Once ``cooldown`` seconds have passed, one trial
+    request is let through: an answer closes the circuit, another failure
+    keeps it open for a further cooldown.
+    """
+
+    def __init__(self, threshold: int = CIRCUIT_THRESHOLD, cooldown: float = CIRCUIT_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: Dict[str, bool] = {}
+
+    def allow(self, host: str) -> bool:
+        """Whether a request to the host may be sent now."""
+        if self.threshold <= 0:
+            return True
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return True
+            if self._trial.get(host) or time.monotonic() - opened_at < self.cooldown:
+                return False
+            self._trial[host] = True
+            return True
+
+    def record(self, host: str, probe: LinkProbe) -> None:
+        """Update the host's health with the outcome of a request."""
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            self._trial.pop(host, None)
+            if not probe.unreachable:
+                self._failures.pop(host, None)
+                self._opened_at.pop(host, None)
+                return
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._failures[host] >= self.threshold:
+                self._opened_at[host] = time.monotonic()
+
+    def open_probe(self, host: str) -> LinkProbe:
+        """The result reported for a link skipped because the host's circuit is open."""
+        with self._lock:
+            failures = self._failures.get(host, 0)
+        return LinkProbe(False, None, f"{CIRCUIT_OPEN} - not checked after {failures} consecutive "
+                                      f"timeouts or connection errors on {host}", circuit_open=True)
+
+
+class HostLimiter:
+    """Caps concurrent requests per host and spaces them to a per-platform rate."""
+
+    def __init__(self, per_host: int = PER_HOST_LIMIT, rates: Optional[Dict[str, float]] = None):
+        self.per_host = max(1, per_host)
+        self.rates = rates or {}
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+        self._paused_until: Dict[str, float] = {}
+
+    def _semaphore(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Hold one of the host's request slots for the duration of the block."""
+        host = extract_host(url)
+        with self._semaphore(host):
+            with self._lock:
+                delay = self._paused_until.get(host, 0.0) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._wait_for_rate(url)
+            yield
+
+    def pause(self, url: str, seconds: float) -> None:
+        """Hold back every request to the URL's host for ``seconds`` (e.g. after a 429)."""
+        host = extract_host(url)
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._paused_until[host] = max(until, self._paused_until.get(host, 0.0))
+
+    def _wait_for_rate(self, url: str) -> None:
+        """Sleep until the platform's rate limit allows another request."""
+        platform = extract_platform(url)
+        rate = self.rates.get(platform)
+        if not rate:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(platform, now))
+            self._next_start[platform] = start + 1.0 / rate
+
+        if start > now:
+            time.sleep(start - now)
+
+
+def retry_later_probe(response: requests.Response) -> LinkProbe:
+    """Probe for a 429/503 answer, carrying its Retry-After delay."""
+    reason = "Rate limited" if response.status_code == 429 else "Service unavailable"
+    return LinkProbe(
+        accessible=False,
+        status_code=response.status_code,
+        error_message=f"{reason} (HTTP {response.status_code})",
+        final_url=response.url,
+        retry_after=parse_retry_after(response.headers.get('Retry-After')),
+    )
+
+
+def probe_link(url: str, timeout: int = REQUEST_TIMEOUT,
+               session: Optional[requests.Session] = None,
+               validators: Optional[Dict[str, str]] = None) -> LinkProbe:
+    """
+    Probe a URL and capture its status, final URL and cache validators.
+
+    When ``validators`` (If-None-Match / If-Modified-Since headers) are given,
+    the HEAD request is conditional and a 304 answer is reported as
+    ``not_modified``. A 429 or 503 answer is returned as is, with its
+    Retry-After delay, rather than hitting the host again with a GET.
     """
+    http = session or requests
     try:
         # Use HEAD request first (faster, less bandwidth)
-        response = requests.head(url, timeout=timeout, allow_redirects=True)
+        response = http.head(url, timeout=timeout, allow_redirects=True, headers=validators or None)
+
+        if response.status_code == 304 and validators:
+            return LinkProbe(
+                accessible=True,
+                status_code=response.status_code,
+                error_message=None,
+                final_url=response.url,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+                not_modified=True,
+            )
+
+        if response.status_code in RETRY_STATUSES:
+            return retry_later_probe(response)
 
         # If HEAD fails, try GET (some servers don't support HEAD)
         if response.status_code >= 400:
-            response = requests.get(url, timeout=timeout, allow_redirects=True, stream=True)
+            response = http.get(url, timeout=timeout, allow_redirects=True, stream=True)
+            # Release the connection back to the pool without reading the body
+            response.close()
+            if response.status_code in RETRY_STATUSES:
+                return retry_later_probe(response)
 
         # Consider 2xx and 3xx as successful
-        accessible = response.status_code < 400
-        return accessible, response.status_code, None
+        return LinkProbe(
+            accessible=response.status_code < 400,
+            status_code=response.status_code,
+            error_message=None,
+            final_url=response.url,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+        )
 
     except requests.exceptions.Timeout:
-        return False, None, f"Timeout after {timeout}s"
+        return LinkProbe(False, None, f"Timeout after {timeout}s", unreachable=True)
     except requests.exceptions.ConnectionError:
-        return False, None, "Connection error - host unreachable"
+        return LinkProbe(False, None, "Connection error - host unreachable", unreachable=True)
     except requests.exceptions.TooManyRedirects:
-        return False, None, "Too many redirects"
+        return LinkProbe(False, None, "Too many redirects")
     except requests.exceptions.RequestException as e:
-        return False, None, str(e)
+        return LinkProbe(False, None, str(e))
     except Exception as e:
-        return False, None, f"Unexpected error: {str(e)}"
+        return LinkProbe(False, None, f"Unexpected error: {str(e)}")
+
+
+class OEmbedProbe:
+    """
+    Probes a video link through its platform's oEmbed endpoint.
+
+    Called like probe_link(). The endpoint answers 200 with a few hundred
+    bytes of JSON for a playable video, 404 for a removed one and 401/403
+    for a private or non-embeddable one, so no watch page is downloaded.
+    oEmbed has no conditional requests, so ``validators`` are ignored.
+    """
+
+    MESSAGES = {
+        400: "Not a valid video link",
+        401: "Video is private or cannot be embedded",
+        403: "Video is private or cannot be embedded",
+        404: "Video not found (removed or never published)",
+    }
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+
+    def __call__(self, url: str, timeout: int = REQUEST_TIMEOUT,
+                 session: Optional[requests.Session] = None,
+                 validators: Optional[Dict[str, str]] = None) -> LinkProbe:
+        http = session or requests
+        try:
+            response = http.get(self.endpoint, params={'url': url, 'format': 'json'},
+                                timeout=timeout, allow_redirects=True)
+
+            if response.status_code in RETRY_STATUSES:
+                return retry_later_probe(response)
+            if response.status_code >= 400:
+                message = self.MESSAGES.get(response.status_code,
+                                            f"oEmbed lookup failed (HTTP {response.status_code})")
+                return LinkProbe(False, response.status_code, message, final_url=url)
+            return LinkProbe(True, response.status_code, None, final_url=url)
+
+        except requests.exceptions.Timeout:
+            return LinkProbe(False, None, f"Timeout after {timeout}s", unreachable=True)
+        except requests.exceptions.ConnectionError:
+            return LinkProbe(False, None, "Connection error - host unreachable", unreachable=True)
+        except requests.exceptions.RequestException as e:
+            return LinkProbe(False, None, str(e))
+        except Exception as e:
+            return LinkProbe(False, None, f"Unexpected error: {str(e)}")
+
+
+def platform_probes(endpoints: Optional[Dict[str, str]] = None) -> Dict[str, Callable[..., LinkProbe]]:
+    """Probe per platform (as returned by extract_platform) for the given oEmbed endpoints."""
+    return {platform: OEmbedProbe(endpoint)
+            for platform, endpoint in (OEMBED_ENDPOINTS if endpoints is None else endpoints).items()}
+
+
+def is_video_link(url: str) -> bool:
+    """Whether a YouTube or Vimeo URL points at a single video (not a channel, playlist, ...)."""
+    canonical = canonicalize_url(url)
+    return canonical.startswith('https://youtube.com/watch?v=') or bool(VIMEO_VIDEO.match(canonical))
+
 
+def select_probe(url: str, probes: Optional[Dict[str, Callable[..., LinkProbe]]] = None) -> Callable[..., LinkProbe]:
+    """
+    The platform's probe for a URL, or probe_link() for hosts without one.
+
+    YouTube and Vimeo pages that are not a single video (channels,
+    playlists, user pages) have no oEmbed answer, so they get probe_link()
+    as well.
+    """
+    probes = PLATFORM_PROBES if probes is None else probes
+    platform = extract_platform(url)
+    probe = probes.get(platform)
+    if probe is None or (platform in VIDEO_ID_PLATFORMS and not is_video_link(url)):
+        return probe_link
+    return probe
+
+
+def check_link(url: str, timeout: int = REQUEST_TIMEOUT,
+               session: Optional[requests.Session] = None,
+               probes: Optional[Dict[str, Callable[..., LinkProbe]]] = None
+               ) -> Tuple[bool, Optional[int], Optional[str]]:
+    """
+    Check if a URL is accessible.
+
+    Args:
+        url: Link to check
+        timeout: Per-request timeout in seconds
+        session: Optional pooled session; falls back to one-off requests
+        probes: Probe per platform (default: PLATFORM_PROBES; {} for HEAD/GET only)
+
+    Returns:
+        Tuple of (accessible, status_code, error_message)
+    """
+    return select_probe(url, probes)(url, timeout=timeout, session=session).outcome()
+
+
+# Probes used for every link whose platform has an entry; probe_link() for the rest
+PLATFORM_PROBES = platform_probes()
 
-def check_prompt_link(file_path: Path) -> Optional[LinkCheckResult]:
+
+def build_result(file_path: Path, prompt_data: Dict,
+                 outcome: Tuple[bool, Optional[int], Optional[str]]) -> LinkCheckResult:
+    """Combine a prompt's metadata with the outcome of checking its demo link."""
+    accessible, status_code, error_message = outcome
+    demo_link = prompt_data['demo_link']
+
+    return LinkCheckResult(
+        file_path=file_path,
+        prompt_title=prompt_data.get('title', 'Untitled'),
+        demo_link=demo_link,
+        accessible=accessible,
+        status_code=status_code,
+        error_message=error_message,
+        platform=extract_platform(demo_link)
+    )
+
+
+def check_prompt_link(file_path: Path,
+                      session: Optional[requests.Session] = None) -> Optional[LinkCheckResult]:
     """Check the demo link in a prompt file."""
     prompt_data = load_prompt(file_path)
     if not prompt_data:
@@ -128,30 +551,321 @@ def check_prompt_link(file_path: Path) -> Optional[LinkCheckResult]:
         return None
 
     # Check link accessibility
-    accessible, status_code, error_message = check_link(demo_link)
+    return build_result(file_path, prompt_data, check_link(demo_link, session=session))
 
-    # Extract platform
-    platform = extract_platform(demo_link)
 
-    return LinkCheckResult(
-        file_path=file_path,
-        prompt_title=prompt_data.get('title', 'Untitled'),
-        demo_link=demo_link,
-        accessible=accessible,
-        status_code=status_code,
-        error_message=error_message,
-        platform=platform
+def known_platform(url: str) -> Optional[str]:
+    """The SUPPORTED_PLATFORMS entry whose host (or a subdomain of it) serves the URL."""
+    host = (urlsplit(url).hostname or '').lower()
+    for platform in SUPPORTED_PLATFORMS:
+        if host == platform or host.endswith('.' + platform):
+            return platform
+    return None
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce a demo link to the key used to group duplicate links.
+
+    YouTube links (youtu.be, m.youtube.com, /shorts/, /embed/) collapse to
+    ``https://youtube.com/watch?v=<id>`` and Vimeo links to
+    ``https://vimeo.com/<id>``. Other links on a SUPPORTED_PLATFORMS host
+    lose their ``www.`` and tracking parameters, and the remaining query is
+    sorted. Links to any other host are only normalized (see normalize_url),
+    since their query parameters may well select the page.
+
+    The key is never requested; the plan probes one of the links as written.
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    platform = known_platform(url)
+    if platform is None:
+        return normalize_url(url)
+
+    path = parts.path.rstrip('/')
+    if platform in ('youtube.com', 'youtu.be'):
+        video_id = None
+        if platform == 'youtu.be':
+            video_id = path.lstrip('/').split('/')[0]
+        elif path == '/watch':
+            video_id = (parse_qs(parts.query).get('v') or [None])[0]
+        elif path.startswith(YOUTUBE_PATH_PREFIXES):
+            video_id = path.split('/')[2] if path.count('/') >= 2 else None
+        if video_id:
+            return f"https://youtube.com/watch?v={video_id}"
+
+    if platform == 'vimeo.com':
+        segments = [segment for segment in path.split('/') if segment]
+        if segments and segments[-1].isdigit():
+            return f"https://vimeo.com/{segments[-1]}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')
     )
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    netloc = f"{host}:{parts.port}" if parts.port else host
 
+    return normalize_url(urlunsplit((parts.scheme, netloc, parts.path, urlencode(query), '')))
 
-def find_prompt_files(path: Path) -> List[Path]:
-    """Find all YAML prompt files in the given path."""
-    if path.is_file():
-        return [path] if path.suffix == '.yaml' else []
-    elif path.is_dir():
-        return list(path.glob('**/*.yaml'))
-    else:
-        return []
+
+@dataclass
+class LinkCheckPlan:
+    """
+    Unique demo links to probe and the prompt files that reference each one.
+
+    ``references`` and ``links`` are keyed by canonicalize_url(); ``links``
+    holds the first demo_link seen for each key, exactly as written in the
+    YAML, which is the URL that gets probed.
+    """
+    references: Dict[str, List[Tuple[Path, Dict]]]
+    file_order: List[Path]
+    skipped: List[Path]
+    links: Dict[str, str] = field(default_factory=dict)
+
+    def add(self, file_path: Path, prompt_data: Optional[Dict]) -> None:
+        """Add a loaded prompt (None if it failed to load) to the plan."""
+        if not prompt_data or not prompt_data.get('demo_link'):
+            self.skipped.append(file_path)
+            return
+
+        demo_link = str(prompt_data['demo_link']).strip()
+        key = canonicalize_url(demo_link)
+        self.links.setdefault(key, demo_link)
+        self.references.setdefault(key, []).append((file_path, prompt_data))
+        self.file_order.append(file_path)
+
+    def shard(self, index: int, count: int) -> 'LinkCheckPlan':
+        """
+        The part of the plan whose unique URLs fall in shard ``index`` (1-based) of ``count``.
+
+        URLs are assigned by hash, so every runner computes the same split
+        from the same prompt files. Files without a demo link stay in shard 1.
+        """
+        references = {key: refs for key, refs in self.references.items() if shard_of(key, count) == index - 1}
+        files = {file_path for refs in references.values() for file_path, _ in refs}
+        return LinkCheckPlan(
+            references=references,
+            file_order=[file_path for file_path in self.file_order if file_path in files],
+            skipped=list(self.skipped) if index == 1 else [],
+            links={key: self.links[key] for key in references},
+        )
+
+    def by_host(self) -> Dict[str, List[str]]:
+        """Group the unique link keys by the host of the URL that is probed for them."""
+        groups: Dict[str, List[str]] = {}
+        for key, url in self.links.items():
+            groups.setdefault(extract_host(url), []).append(key)
+        return groups
+
+
+def shard_of(key: str, count: int) -> int:
+    """Zero-based shard of a canonical link key; stable across runs and machines."""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse an ``i/N`` shard spec (1 <= i <= N)."""
+    index, _, count = value.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard: {value} (expected i/N, e.g. 1/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard: {value} (need 1 <= i <= N)")
+    return index, count
+
+
+def plan_link_checks(prompt_files: List[Path]) -> LinkCheckPlan:
+    """
+    Load prompt files and collapse their demo links to unique canonical keys.
+
+    Files that fail to load or have no demo link are listed in ``skipped``.
+    """
+    plan = LinkCheckPlan(references={}, file_order=[], skipped=[])
+    for file_path in prompt_files:
+        plan.add(file_path, load_prompt(file_path))
+    return plan
+
+
+def interleave_by_host(by_host: Dict[str, List[str]]) -> List[str]:
+    """
+    Order link keys round-robin across hosts.
+
+    Workers that are waiting on a busy host's slot sit idle, so spreading each
+    host's links through the queue keeps the pool busy with other hosts.
+    """
+    queues = list(by_host.values())
+    ordered = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        for queue in queues:
+            if i < len(queue):
+                ordered.append(queue[i])
+    return ordered
+
+
+def check_plan(plan: LinkCheckPlan,
+               max_workers: int = MAX_WORKERS,
+               per_host_limit: int = PER_HOST_LIMIT,
+               host_rates: Optional[Dict[str, float]] = None,
+               timeout: int = REQUEST_TIMEOUT,
+               session: Optional[requests.Session] = None,
+               cache: Optional[LinkCache] = None,
+               on_result: Optional[Callable[[Path, Optional[LinkCheckResult]], None]] = None,
+               circuit_threshold: int = CIRCUIT_THRESHOLD,
+               circuit_cooldown: float = CIRCUIT_COOLDOWN,
+               max_retries: int = MAX_RETRIES,
+               max_retry_after: float = MAX_RETRY_AFTER,
+               probes: Optional[Dict[str, Callable[..., LinkProbe]]] = None
+               ) -> List[LinkCheckResult]:
+    """
+    Probe every unique link in a plan once and fan the outcome out to each
+    prompt file that references it.
+
+    At most ``max_workers`` requests are in flight overall and at most
+    ``per_host_limit`` against any single host, spaced according to
+    ``host_rates`` (requests per second, keyed by platform). All workers share
+    one pooled session. When a ``cache`` is given, fresh entries are reused
+    without a request, stale ones are revalidated, and every probe is stored
+    back under the probed URL. ``on_result`` is called once per file as soon as it is done (with
+    None for files without a demo link).
+
+    After ``circuit_threshold`` consecutive timeouts or connection errors on
+    a host, its remaining links are reported as "Circuit open" without a
+    request (see CircuitBreaker). A 429/503 answer pauses the host and puts
+    the link on a delayed retry queue, up to ``max_retries`` times and only
+    for Retry-After delays up to ``max_retry_after`` seconds. Neither
+    outcome is cached, so the next run checks those links again.
+
+    Each link is probed by ``probes[platform]`` when there is one (default:
+    PLATFORM_PROBES, oEmbed for YouTube and Vimeo) and by probe_link()
+    otherwise.
+
+    Returns:
+        LinkCheckResult objects in plan file order
+    """
+    results: Dict[Path, LinkCheckResult] = {}
+
+    def fan_out(key: str, outcome: Tuple[bool, Optional[int], Optional[str]]) -> None:
+        for file_path, prompt_data in plan.references[key]:
+            result = build_result(file_path, prompt_data, outcome)
+            results[file_path] = result
+            if on_result:
+                on_result(file_path, result)
+
+    if on_result:
+        for file_path in plan.skipped:
+            on_result(file_path, None)
+
+    pending: Dict[str, List[str]] = {}
+    for host, keys in plan.by_host().items():
+        for key in keys:
+            entry = cache.fresh(plan.links[key]) if cache else None
+            if entry:
+                fan_out(key, (entry.accessible, entry.status_code, entry.error_message))
+            else:
+                pending.setdefault(host, []).append(key)
+
+    if not pending:
+        return [results[file_path] for file_path in plan.file_order]
+
+    owns_session = session is None
+    if owns_session:
+        session = create_session(max_workers)
+    limiter = HostLimiter(per_host_limit, HOST_RATE_LIMITS if host_rates is None else host_rates)
+    breaker = CircuitBreaker(circuit_threshold, circuit_cooldown)
+    profiler = get_profiler()
+
+    def run(key: str, validators: Dict[str, str]) -> Tuple[str, LinkProbe]:
+        url = plan.links[key]
+        host = extract_host(url)
+        with limiter.slot(url):
+            # Checked inside the slot: the circuit may have opened while this link waited
+            if not breaker.allow(host):
+                return key, breaker.open_probe(host)
+            # Measured inside the slot, so rate-limit waits are not counted as latency
+            start = time.perf_counter()
+            probe = select_probe(url, probes)(url, timeout=timeout, session=session, validators=validators)
+            profiler.observe('http_request_seconds', time.perf_counter() - start, host=host)
+        breaker.record(host, probe)
+        return key, probe
+
+    def retry_delay(key: str, probe: LinkProbe) -> Optional[float]:
+        """Seconds until a rate-limited link is retried, or None to report it now."""
+        attempt = attempts.get(key, 0)
+        if probe.status_code not in RETRY_STATUSES or attempt >= max_retries:
+            return None
+        delay = probe.retry_after if probe.retry_after is not None else RETRY_BACKOFF * 2 ** attempt
+        return delay if delay <= max_retry_after else None
+
+    attempts: Dict[str, int] = {}
+    # (monotonic time the retry is due, link key)
+    delayed: List[Tuple[float, str]] = []
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            def submit(key: str):
+                # Cache lookups stay on this thread; SQLite connections are not shared
+                return executor.submit(run, key, cache.validators(plan.links[key]) if cache else {})
+
+            in_flight = {submit(key) for key in interleave_by_host(pending)}
+            while in_flight or delayed:
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    in_flight.add(submit(heapq.heappop(delayed)[1]))
+                if not in_flight:
+                    time.sleep(delayed[0][0] - now)
+                    continue
+
+                done, in_flight = wait(in_flight, timeout=delayed[0][0] - now if delayed else None,
+                                       return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, probe = future.result()
+                    delay = retry_delay(key, probe)
+                    if delay is not None:
+                        attempts[key] = attempts.get(key, 0) + 1
+                        limiter.pause(plan.links[key], delay)
+                        heapq.heappush(delayed, (time.monotonic() + delay, key))
+                        continue
+
+                    outcome = probe.outcome()
+                    if probe.status_code in RETRY_STATUSES and attempts.get(key):
+                        outcome = (False, probe.status_code, f"{probe.error_message} after {attempts[key]} retries")
+                    if cache and not probe.circuit_open and probe.status_code not in RETRY_STATUSES:
+                        entry = cache.store(
+                            plan.links[key],
+                            accessible=probe.accessible,
+                            status_code=probe.status_code,
+                            error_message=probe.error_message,
+                            final_url=probe.final_url,
+                            etag=probe.etag,
+                            last_modified=probe.last_modified,
+                            not_modified=probe.not_modified,
+                        )
+                        outcome = (entry.accessible, entry.status_code, entry.error_message)
+                    fan_out(key, outcome)
+    finally:
+        if owns_session:
+            session.close()
+        if cache:
+            cache.flush()
+
+    return [results[file_path] for file_path in plan.file_order]
+
+
+def check_prompt_links(prompt_files: List[Path], **kwargs) -> List[LinkCheckResult]:
+    """
+    Check the demo links of many prompt files concurrently.
+
+    Duplicate links are probed once; see check_plan() for the options.
+
+    Returns:
+        LinkCheckResult objects in the same order as ``prompt_files``
+    """
+    return check_plan(plan_link_checks(prompt_files), **kwargs)
 
 
 def format_result(result: LinkCheckResult) -> str:
@@ -179,11 +893,18 @@ def format_result(result: LinkCheckResult) -> str:
     return "\n".join(lines)
 
 
-def generate_summary(results: List[LinkCheckResult]) -> str:
+def is_circuit_open(result: LinkCheckResult) -> bool:
+    """Whether a link was skipped because its host's circuit was open."""
+    return not result.accessible and (result.error_message or '').startswith(CIRCUIT_OPEN)
+
+
+def generate_summary(results: List[LinkCheckResult],
+                     cache_stats: Optional[Dict[str, int]] = None) -> str:
     """Generate summary report of link checks."""
     total = len(results)
     accessible = sum(1 for r in results if r.accessible)
     broken = total - accessible
+    not_checked = sum(1 for r in results if is_circuit_open(r))
 
     lines = [
         "=" * 80,
@@ -191,8 +912,17 @@ def generate_summary(results: List[LinkCheckResult]) -> str:
         "=" * 80,
         f"Total Links Checked: {total}",
         f"✅ Accessible: {accessible}",
-        f"❌ Broken: {broken}",
+        f"❌ Broken: {broken - not_checked}",
     ]
+    if not_checked:
+        lines.append(f"⚡ Not checked (circuit open): {not_checked}")
+
+    if cache_stats is not None:
+        lines.append(
+            f"🗄️  Cache: {cache_stats['hits']} hits | "
+            f"{cache_stats['revalidated']} revalidated | "
+            f"{cache_stats['misses']} misses"
+        )
 
     if broken > 0:
         lines.append("")
@@ -219,13 +949,172 @@ def generate_summary(results: List[LinkCheckResult]) -> str:
     return "\n".join(lines)
 
 
-def main():
+def save_results(path: Path, results: List[LinkCheckResult], shard: Tuple[int, int] = (1, 1),
+                 cache_stats: Optional[Dict[str, int]] = None) -> None:
+    """Write results to a JSON file for `merge`, replacing it atomically."""
+    document = {
+        'version': RESULTS_VERSION,
+        'shard': list(shard),
+        'cache_stats': cache_stats,
+        'results': [dict(asdict(result), file_path=str(result.file_path)) for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def load_results(path: Path) -> Tuple[Tuple[int, int], List[LinkCheckResult], Optional[Dict[str, int]]]:
+    """Read a results file written by save_results()."""
+    with open(path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    if document.get('version') != RESULTS_VERSION:
+        raise ValueError(f"unsupported results version: {document.get('version')}")
+    results = [LinkCheckResult(**dict(entry, file_path=Path(entry['file_path']))) for entry in document['results']]
+    return tuple(document['shard']), results, document.get('cache_stats')
+
+
+def merge_results(paths: List[Path]) -> Tuple[List[LinkCheckResult], Optional[Dict[str, int]], List[str]]:
+    """
+    Combine shard result files.
+
+    Returns the results in file path order, the summed cache statistics
+    (None if no shard used the cache) and a list of problems: unreadable
+    files, shards with different counts, and missing or repeated shards.
+    """
+    results: Dict[Path, LinkCheckResult] = {}
+    cache_stats: Optional[Dict[str, int]] = None
+    problems = []
+    seen: Dict[int, Path] = {}
+    counts = set()
+
+    for path in paths:
+        try:
+            (index, count), shard_results, stats = load_results(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            problems.append(f"{path}: {e}")
+            continue
+        counts.add(count)
+        if index in seen:
+            problems.append(f"{path}: shard {index}/{count} already read from {seen[index]}")
+            continue
+        seen[index] = path
+        for result in shard_results:
+            results[result.file_path] = result
+        if stats:
+            cache_stats = cache_stats or {key: 0 for key in stats}
+            for key, value in stats.items():
+                cache_stats[key] = cache_stats.get(key, 0) + value
+
+    if len(counts) > 1:
+        problems.append(f"result files come from different shard counts: {', '.join(map(str, sorted(counts)))}")
+    elif counts:
+        missing = sorted(set(range(1, counts.pop() + 1)) - set(seen))
+        if missing:
+            problems.append(f"missing shard(s): {', '.join(map(str, missing))}")
+
+    return [results[file_path] for file_path in sorted(results)], cache_stats, problems
+
+
+def merge_main(argv: List[str]):
+    """`check_links.py merge`: report on the combined results of every shard."""
+    parser = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])} merge",
+                                     description="Combine --results files from sharded link checks.")
+    parser.add_argument('results', nargs='+', type=Path, help="Result files written with --results")
+    args = parser.parse_args(argv)
+
+    results, cache_stats, problems = merge_results(args.results)
+    print(f"🔗 Merged {len(args.results)} result files ({len(results)} links)\n")
+    print(generate_summary(results, cache_stats))
+
+    for problem in problems:
+        print(f"❌ {problem}", file=sys.stderr)
+    broken_count = sum(1 for r in results if not r.accessible)
+    if broken_count > 0:
+        print(f"\n❌ {broken_count} broken link(s) found", file=sys.stderr)
+    if problems or broken_count:
+        sys.exit(1)
+    print("\n✨ All demo links are accessible!")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Validate demo_link URLs in prompt files.")
+    parser.add_argument('path', nargs='?', type=Path,
+                        help="Prompt file or directory (default: prompts/)")
+    parser.add_argument('--jobs', '-j', type=int, default=MAX_WORKERS,
+                        help=f"Maximum concurrent link checks (default: {MAX_WORKERS})")
+    parser.add_argument('--per-host', type=int, default=PER_HOST_LIMIT,
+                        help=f"Maximum concurrent requests per host (default: {PER_HOST_LIMIT})")
+    parser.add_argument('--host-rate', action='append', default=[], metavar='HOST=RPS',
+                        help="Override a host's request rate, e.g. youtube.com=1 (repeatable)")
+    parser.add_argument('--timeout', type=int, default=REQUEST_TIMEOUT,
+                        help=f"Per-request timeout in seconds (default: {REQUEST_TIMEOUT})")
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE_PATH,
+                        help="SQLite result cache (default: .cache/link_cache.sqlite)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Check every link without reading or writing the cache")
+    parser.add_argument('--circuit-threshold', type=int, default=CIRCUIT_THRESHOLD,
+                        help=f"Consecutive timeouts/connection errors before a host is skipped "
+                             f"(default: {CIRCUIT_THRESHOLD}, 0 disables)")
+    parser.add_argument('--circuit-cooldown', type=float, default=CIRCUIT_COOLDOWN,
+                        help=f"Seconds before a skipped host gets a trial request (default: {CIRCUIT_COOLDOWN:g})")
+    parser.add_argument('--max-retries', type=int, default=MAX_RETRIES,
+                        help=f"Retries of a 429/503 link after its Retry-After delay (default: {MAX_RETRIES})")
+    parser.add_argument('--max-retry-after', type=float, default=MAX_RETRY_AFTER,
+                        help=f"Longest Retry-After delay to wait for, in seconds (default: {MAX_RETRY_AFTER:g})")
+    parser.add_argument('--oembed', action='append', default=[], metavar='PLATFORM=URL',
+                        help="Override a platform's oEmbed endpoint, e.g. youtube.com=http://localhost:8000/oembed "
+                             "(repeatable)")
+    parser.add_argument('--no-platform-probes', action='store_true',
+                        help="Check every link with HEAD/GET instead of oEmbed lookups")
+    parser.add_argument('--shard', type=parse_shard, default=(1, 1), metavar='i/N',
+                        help="Only check shard i of N of the unique links (default: 1/1)")
+    parser.add_argument('--results', type=Path, default=None,
+                        help="Write the results as JSON for `merge`")
+    parser.add_argument('--healthy-ttl', type=float, default=HEALTHY_TTL / 3600,
+                        help=f"Hours before a healthy link is revalidated (default: {HEALTHY_TTL // 3600})")
+    parser.add_argument('--broken-ttl', type=float, default=BROKEN_TTL / 3600,
+                        help=f"Hours before a broken link is rechecked (default: {BROKEN_TTL // 3600})")
+    add_profile_arguments(parser)
+    add_discovery_arguments(parser)
+    args = parser.parse_args(argv)
+
+    args.host_rates = dict(HOST_RATE_LIMITS)
+    for override in args.host_rate:
+        host, _, rate = override.partition('=')
+        try:
+            args.host_rates[host.lower()] = float(rate)
+        except ValueError:
+            parser.error(f"Invalid --host-rate value: {override} (expected HOST=RPS)")
+
+    args.oembed_endpoints = {} if args.no_platform_probes else dict(OEMBED_ENDPOINTS)
+    for override in args.oembed:
+        platform, _, endpoint = override.partition('=')
+        if not endpoint:
+            parser.error(f"Invalid --oembed value: {override} (expected PLATFORM=URL)")
+        args.oembed_endpoints[platform.lower()] = endpoint
+
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
     """Main execution function."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['merge']:
+        merge_main(argv[1:])
+        return
+
+    args = parse_args(argv)
+    profiler = profiler_from_args('check_links', args)
+    discovery_from_args(args)
+
     print("🔗 Checking demo video links...\n")
 
     # Determine path to check
-    if len(sys.argv) > 1:
-        check_path = Path(sys.argv[1])
+    if args.path:
+        check_path = args.path
     else:
         # Default to prompts directory
         script_dir = Path(__file__).parent
@@ -236,32 +1125,74 @@ def main():
         sys.exit(1)
 
     # Find all prompt files
-    prompt_files = find_prompt_files(check_path)
+    with profiler.stage('discover'):
+        prompt_files = find_prompt_files(check_path)
 
     if not prompt_files:
         print(f"⚠️  No YAML files found in: {check_path}")
+        if args.results:
+            save_results(args.results, [], args.shard)
         sys.exit(0)
 
-    print(f"Found {len(prompt_files)} prompt files\n")
+    # Collapse duplicate links so each unique URL is probed once
+    with profiler.stage('plan'):
+        plan = plan_link_checks(prompt_files)
+    print(f"Found {len(prompt_files)} prompt files "
+          f"({len(plan.references)} unique demo links across {len(plan.by_host())} hosts)")
+    if args.shard != (1, 1):
+        total_links = len(plan.references)
+        plan = plan.shard(*args.shard)
+        print(f"Shard {args.shard[0]}/{args.shard[1]}: checking {len(plan.references)} of {total_links} unique links")
+    print()
+    file_count = len(plan.file_order) + len(plan.skipped)
 
-    # Check each prompt's demo link
-    results = []
-    for i, prompt_file in enumerate(prompt_files, 1):
-        # Show progress
-        print(f"[{i}/{len(prompt_files)}] Checking {prompt_file.name}...", end=" ")
-        sys.stdout.flush()
+    # Check every prompt's demo link concurrently, reporting as each finishes
+    done = 0
 
-        result = check_prompt_link(prompt_file)
-        if result:
-            results.append(result)
+    def report(prompt_file: Path, result: Optional[LinkCheckResult]) -> None:
+        nonlocal done
+        done += 1
+        if result and is_circuit_open(result):
+            status = "⚡ (circuit open)"
+        elif result:
             status = "✅" if result.accessible else "❌"
-            print(status)
         else:
-            print("⏭️  (no demo link)")
+            status = "⏭️  (no demo link)"
+        print(f"[{done}/{file_count}] Checked {prompt_file.name}... {status}")
+        sys.stdout.flush()
+
+    cache = None
+    if not args.no_cache:
+        cache = LinkCache(args.cache, healthy_ttl=args.healthy_ttl * 3600, broken_ttl=args.broken_ttl * 3600)
+
+    cache_stats = None
+    try:
+        with profiler.stage('check'):
+            results = check_plan(
+                plan,
+                max_workers=args.jobs,
+                per_host_limit=args.per_host,
+                host_rates=args.host_rates,
+                timeout=args.timeout,
+                cache=cache,
+                on_result=report,
+                circuit_threshold=args.circuit_threshold,
+                circuit_cooldown=args.circuit_cooldown,
+                max_retries=args.max_retries,
+                max_retry_after=args.max_retry_after,
+                probes=platform_probes(args.oembed_endpoints),
+            )
+    finally:
+        if cache:
+            cache_stats = cache.stats()
+            cache.close()
+
+    if args.results:
+        save_results(args.results, results, args.shard, cache_stats)
 
     # Generate and display summary
     print()
-    print(generate_summary(results))
+    print(generate_summary(results, cache_stats))
 
     # Exit with error code if any links are broken
     broken_count = sum(1 for r in results if not r.accessible)
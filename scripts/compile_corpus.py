@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Compile Corpus - Packed Prompt Bundle for Downstream Tools
+
+Writes every valid prompt into one binary file that consumers can mmap and
+read without YAML parsing, instead of shipping and parsing thousands of
+YAML files.
+
+Usage:
+    python scripts/compile_corpus.py                      # dist/prompts.bundle
+    python scripts/compile_corpus.py --output corpus.bundle
+    python scripts/compile_corpus.py --force              # re-parse every file
+
+Reading a bundle:
+    from compile_corpus import CorpusBundle
+
+    with CorpusBundle("dist/prompts.bundle") as bundle:
+        noir = bundle.get("noir-detective", "cinematic")
+        for prompt in bundle.category("hyperrealism"):
+            ...
+
+Bundle layout (little-endian):
+    header   8s magic b"SORABNDL", u32 format version, u32 record count,
+             u64 index offset, u64 index length
+    records  u32 length + compact UTF-8 JSON document, one per prompt
+    index    JSON: schema hash plus one entry per record
+             [category, slug, offset, mtime_ns, size], sorted by category/slug
+
+Discovery and loading match build_index.py: the prompt files directly in
+each prompts/<category>/ (see prompt_discovery.py), read with
+load_prompt(). Each file is validated against prompt.schema.json and
+invalid files are left out. On rebuild, records of files whose mtime and
+size are unchanged are copied from the previous bundle byte for byte; a
+schema change revalidates everything.
+
+Exit Codes:
+    0 - Bundle written (or already up to date)
+    1 - Some prompts were invalid and left out, or the build failed
+"""
+
+import os
+import sys
+import mmap
+import json
+import struct
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from build_index import load_prompt
+from validate_prompts import PromptValidator
+from prompt_discovery import add_discovery_arguments, discovery_from_args, iter_categories
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULT_OUTPUT_PATH = PROJECT_ROOT / "dist" / "prompts.bundle"
+
+MAGIC = b"SORABNDL"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<8sIIQQ')
+RECORD_LENGTH = struct.Struct('<I')
+
+
+def encode_record(prompt_data: Dict) -> bytes:
+    """Serialize a prompt document as a length-prefixed record."""
+    # YAML may yield dates; store them as ISO strings
+    payload = json.dumps(prompt_data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    return RECORD_LENGTH.pack(len(payload)) + payload
+
+
+class CorpusBundle:
+    """Memory-mapped, read-only view of a compiled prompt bundle."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, index_offset, index_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} prompt bundle")
+
+        index = json.loads(self._map[index_offset:index_offset + index_length].decode('utf-8'))
+        self.schema_hash: str = index['schema_hash']
+        self.entries: List[Tuple[str, str, int, int, int]] = [tuple(entry) for entry in index['entries']]
+        self._offsets: Dict[Tuple[str, str], int] = {
+            (category, slug): offset for category, slug, offset, _, _ in self.entries
+        }
+        self._slugs: Dict[str, List[str]] = {}
+        for category, slug, _, _, _ in self.entries:
+            self._slugs.setdefault(slug, []).append(category)
+
+    def __enter__(self) -> 'CorpusBundle':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for _, _, offset, _, _ in self.entries:
+            yield self.record_at(offset)
+
+    def raw_record(self, offset: int) -> bytes:
+        """Length-prefixed record bytes stored at an offset."""
+        (length,) = RECORD_LENGTH.unpack_from(self._map, offset)
+        return self._map[offset:offset + RECORD_LENGTH.size + length]
+
+    def record_at(self, offset: int) -> Dict:
+        (length,) = RECORD_LENGTH.unpack_from(self._map, offset)
+        start = offset + RECORD_LENGTH.size
+        return json.loads(self._map[start:start + length].decode('utf-8'))
+
+    def categories(self) -> List[str]:
+        return sorted({category for category, _, _, _, _ in self.entries})
+
+    def category(self, category: str) -> Iterator[Dict]:
+        """Prompts of one category, in slug order."""
+        for entry_category, _, offset, _, _ in self.entries:
+            if entry_category == category:
+                yield self.record_at(offset)
+
+    def get(self, slug: str, category: Optional[str] = None) -> Optional[Dict]:
+        """
+        Look up a prompt by slug (file name without .yaml).
+
+        Pass ``category`` when the same slug exists in several categories.
+        """
+        if category is None:
+            categories = self._slugs.get(slug, [])
+            if len(categories) > 1:
+                raise KeyError(f"slug '{slug}' is ambiguous; specify one of: {', '.join(categories)}")
+            if not categories:
+                return None
+            category = categories[0]
+        offset = self._offsets.get((category, slug))
+        return self.record_at(offset) if offset is not None else None
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def find_prompt_files(prompts_dir: Path) -> Iterator[Tuple[str, str, Path, os.stat_result]]:
+    """(category, slug, path, stat) for every prompt, discovered like build_index.py."""
+    for category, prompt_files in iter_categories(prompts_dir):
+        for prompt_file in prompt_files:
+            yield category, prompt_file.path.stem, prompt_file.path, prompt_file.stat
+
+
+def open_previous(output_path: Path, schema_hash: str) -> Optional[CorpusBundle]:
+    """Previous bundle whose records can be reused, if any."""
+    try:
+        bundle = CorpusBundle(output_path)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+    if bundle.schema_hash != schema_hash:
+        bundle.close()
+        return None
+    return bundle
+
+
+def compile_corpus(prompts_dir: Path, output_path: Path, validator: PromptValidator,
+                   force: bool = False) -> Dict[str, Any]:
+    """
+    Build the bundle, reusing unchanged records of the previous one.
+
+    Returns build statistics: counts of compiled, reused and invalid
+    prompts, the invalid files' errors, and whether the bundle was written.
+    """
+    previous = None if force else open_previous(output_path, validator.schema_hash)
+    reusable: Dict[Tuple[str, str], Tuple[int, int, int]] = {}
+    if previous:
+        reusable = {(category, slug): (offset, mtime_ns, size)
+                    for category, slug, offset, mtime_ns, size in previous.entries}
+
+    stats: Dict[str, Any] = {'compiled': 0, 'reused': 0, 'invalid': 0, 'errors': [], 'written': False}
+    entries = []
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0, 0))
+
+            for category, slug, yaml_file, stat in find_prompt_files(prompts_dir):
+                cached = reusable.get((category, slug))
+
+                if cached and cached[1:] == (stat.st_mtime_ns, stat.st_size):
+                    record = previous.raw_record(cached[0])
+                    stats['reused'] += 1
+                else:
+                    is_valid, errors = validator.validate_file(yaml_file)
+                    prompt_data = load_prompt(yaml_file) if is_valid else None
+                    if not prompt_data:
+                        stats['invalid'] += 1
+                        stats['errors'].extend(errors)
+                        continue
+                    record = encode_record(prompt_data)
+                    stats['compiled'] += 1
+
+                entries.append([category, slug, f.tell(), stat.st_mtime_ns, stat.st_size])
+                f.write(record)
+
+            index = json.dumps({'schema_hash': validator.schema_hash, 'entries': entries},
+                               separators=(',', ':')).encode('utf-8')
+            index_offset = f.tell()
+            f.write(index)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(entries), index_offset, len(index)))
+    except BaseException:
+        if previous:
+            previous.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    # Nothing re-parsed and the same files: keep the existing bundle untouched
+    unchanged = previous is not None and not stats['compiled'] and len(entries) == len(previous)
+    if previous:
+        previous.close()
+    if unchanged:
+        tmp_path.unlink()
+    else:
+        os.replace(tmp_path, output_path)
+        stats['written'] = True
+    stats['count'] = len(entries)
+    return stats
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Compile validated prompts into a packed, mmap-able bundle.")
+    parser.add_argument('--prompts', type=Path, default=PROJECT_ROOT / "prompts",
+                        help="Prompt directory (default: prompts/)")
+    parser.add_argument('--output', '-o', type=Path, default=DEFAULT_OUTPUT_PATH,
+                        help="Bundle to write (default: dist/prompts.bundle)")
+    parser.add_argument('--force', action='store_true', help="Re-parse and revalidate every prompt")
+    add_discovery_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+    discovery_from_args(args)
+
+    if not args.prompts.is_dir():
+        print(f"❌ Prompts directory not found: {args.prompts}", file=sys.stderr)
+        sys.exit(1)
+
+    print("📦 Compiling prompt corpus...\n")
+    validator = PromptValidator(PROJECT_ROOT / "prompt.schema.json")
+    try:
+        stats = compile_corpus(args.prompts, args.output, validator, force=args.force)
+    except OSError as e:
+        print(f"❌ Error writing {args.output}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for error in stats['errors']:
+        print(error)
+        print()
+
+    if stats['written']:
+        size_kb = args.output.stat().st_size / 1024
+        print(f"✅ Wrote {args.output} ({stats['count']} prompts, {size_kb:.1f} KB)")
+    else:
+        print(f"✔️  {args.output} already up to date ({stats['count']} prompts)")
+    print(f"   {stats['compiled']} compiled, {stats['reused']} reused, {stats['invalid']} invalid skipped")
+
+    if stats['invalid']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
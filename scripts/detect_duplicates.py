@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection - MinHash/LSH Check for New Prompts
+
+Flags prompt files whose `prompt` and `summary` text is a light rewording of
+a prompt already in the library. Runs next to validate_prompts.py in CI.
+
+Usage:
+    python scripts/detect_duplicates.py prompts/
+    python scripts/detect_duplicates.py --threshold 0.7 prompts/
+    python scripts/detect_duplicates.py --all prompts/       # re-check every file
+    python scripts/detect_duplicates.py --changed-since origin/main prompts/
+
+How it works:
+    Text is lowercased and split into word 3-gram shingles. Each file gets a
+    MinHash signature (NUM_PERM hash minimums) whose slot-wise agreement with
+    another signature estimates their Jaccard similarity. Signatures are cut
+    into LSH bands; files sharing any band bucket become candidates, and only
+    candidates are compared. Checking a file is therefore a handful of index
+    lookups, independent of corpus size.
+
+Index:
+    .cache/duplicate_index.sqlite keeps each file's signature, band buckets
+    and mtime/size. Only new or modified files are shingled and checked;
+    deleted files are dropped. Without a saved index every file is checked
+    against the ones indexed before it, so each pair is reported once.
+
+    --changed-since <git-ref> (used by CI) indexes the whole library but
+    only reports the files that differ from the ref, checked against every
+    other file. Near-duplicates that are already in the library then do not
+    fail unrelated pull requests.
+
+Exit Codes:
+    0 - No near-duplicates found
+    1 - Near-duplicates found
+"""
+
+import os
+import re
+import sys
+import zlib
+import random
+import sqlite3
+import hashlib
+import subprocess
+import argparse
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass
+
+from prompt_corpus import load_document
+from prompt_discovery import add_discovery_arguments, discovery_from_args, find_prompt_files
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Default index location (ignored by git)
+DEFAULT_INDEX_PATH = Path(__file__).parent.parent / ".cache" / "duplicate_index.sqlite"
+
+# Estimated Jaccard similarity at or above which a pair is flagged
+DEFAULT_THRESHOLD = 0.8
+
+# Signature size and LSH banding (BANDS * ROWS_PER_BAND == NUM_PERM).
+# 16 bands of 4 rows make pairs at 0.8 similarity candidates with
+# probability > 0.999 while pairs below 0.3 rarely collide.
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+SHINGLE_SIZE = 3
+
+# Mersenne prime for the universal hash family; seeds fixed for stable signatures
+MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20251014)
+PERMUTATIONS = [(_rng.randrange(1, 1 << 31), _rng.randrange(0, 1 << 31)) for _ in range(NUM_PERM)]
+
+# Bump when shingling, hashing or banding changes; the index is rebuilt
+INDEX_VERSION = 1
+
+# Number of indexed files between commits
+COMMIT_EVERY = 500
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    signature BLOB
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket);
+CREATE INDEX IF NOT EXISTS bands_doc ON bands (doc);
+"""
+
+
+@dataclass
+class DuplicateMatch:
+    """A file whose text closely matches an already indexed prompt."""
+    file_path: Path
+    original: Path
+    similarity: float
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Word n-grams of lowercased text (the whole text if it is shorter)."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) <= size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(shingle_set: Set[str]) -> Optional[array]:
+    """MinHash signature of a shingle set, or None if the set is empty."""
+    if not shingle_set:
+        return None
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingle_set]
+
+    if np is not None:
+        values = np.array(hashes, dtype=np.uint64)
+        a = np.array([a for a, _ in PERMUTATIONS], dtype=np.uint64)[:, None]
+        b = np.array([b for _, b in PERMUTATIONS], dtype=np.uint64)[:, None]
+        return array('q', ((a * values + b) % MERSENNE_PRIME).min(axis=1).tolist())
+
+    return array('q', (min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS))
+
+
+def band_buckets(signature: array) -> List[int]:
+    """Hash each LSH band of a signature to a signed 64-bit bucket id."""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'little', signed=True))
+    return buckets
+
+
+def estimate_similarity(first: array, second: array) -> float:
+    """Estimated Jaccard similarity: fraction of agreeing signature slots."""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+def prompt_signature(prompt_data: Dict) -> Optional[array]:
+    """MinHash signature of a prompt's `prompt` and `summary` text."""
+    text = ' '.join(str(prompt_data.get(field) or '') for field in ('summary', 'prompt'))
+    return minhash(shingles(text))
+
+
+class DuplicateIndex:
+    """Persistent MinHash/LSH index of prompt files."""
+
+    def __init__(self, path: Path = DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS bands; DROP TABLE IF EXISTS docs;")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.conn.commit()
+
+    def known_files(self) -> Dict[str, Tuple[int, int, int]]:
+        """Indexed paths mapped to (id, mtime_ns, size)."""
+        return {
+            path: (doc_id, mtime_ns, size)
+            for doc_id, path, mtime_ns, size in self.conn.execute("SELECT id, path, mtime_ns, size FROM docs")
+        }
+
+    def signature(self, doc_id: int) -> Optional[array]:
+        row = self.conn.execute("SELECT signature FROM docs WHERE id = ?", (doc_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        signature = array('q')
+        signature.frombytes(row[0])
+        return signature
+
+    def find_similar(self, signature: array, threshold: float = DEFAULT_THRESHOLD,
+                     exclude: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Indexed files whose estimated similarity reaches the threshold, best first."""
+        candidates: Set[int] = set()
+        for band, bucket in enumerate(band_buckets(signature)):
+            candidates.update(doc for (doc,) in self.conn.execute(
+                "SELECT doc FROM bands WHERE band = ? AND bucket = ?", (band, bucket)))
+        candidates.discard(exclude)
+
+        matches = []
+        for doc_id in candidates:
+            row = self.conn.execute("SELECT path, signature FROM docs WHERE id = ?", (doc_id,)).fetchone()
+            other = array('q')
+            other.frombytes(row[1])
+            similarity = estimate_similarity(signature, other)
+            if similarity >= threshold:
+                matches.append((row[0], similarity))
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def add(self, path: str, stat: os.stat_result, signature: Optional[array]) -> int:
+        """Index a file (files without text are remembered but never match)."""
+        cursor = self.conn.execute(
+            "INSERT INTO docs (path, mtime_ns, size, signature) VALUES (?, ?, ?, ?)",
+            (path, stat.st_mtime_ns, stat.st_size, signature.tobytes() if signature else None)
+        )
+        doc_id = cursor.lastrowid
+        if signature:
+            self.conn.executemany(
+                "INSERT INTO bands (band, bucket, doc) VALUES (?, ?, ?)",
+                [(band, bucket, doc_id) for band, bucket in enumerate(band_buckets(signature))]
+            )
+        return doc_id
+
+    def remove(self, doc_id: int) -> None:
+        self.conn.execute("DELETE FROM bands WHERE doc = ?", (doc_id,))
+        self.conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def close(self) -> None:
+        """Commit pending changes and close the database connection."""
+        self.conn.commit()
+        self.conn.close()
+
+
+def check_files(index: DuplicateIndex, prompt_files: Iterable[Path],
+                threshold: float = DEFAULT_THRESHOLD, recheck_all: bool = False,
+                only: Optional[Set[Path]] = None) -> Tuple[List[DuplicateMatch], int]:
+    """
+    Check new and modified files against the index, then index them.
+
+    With ``recheck_all`` unchanged files are checked too (against every
+    other indexed file). With ``only`` (resolved paths), every other file is
+    indexed first without being reported, then the files in ``only`` are
+    checked against the whole library whether or not they changed.
+    Returns the matches and the number of files checked.
+    """
+    known = index.known_files()
+    seen = set()
+    reported = set()
+    matches = []
+    checked = 0
+    pending = 0
+
+    ordered = [(file_path, True) for file_path in sorted(prompt_files)]
+    if only is not None:
+        selected = {file_path: file_path.resolve() in only for file_path, _ in ordered}
+        ordered = ([(file_path, False) for file_path, _ in ordered if not selected[file_path]]
+                   + [(file_path, True) for file_path, _ in ordered if selected[file_path]])
+
+    for file_path, report in ordered:
+        key = os.path.abspath(file_path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            continue
+        seen.add(key)
+        if report:
+            reported.add(key)
+
+        existing = known.get(key)
+        if existing and existing[1:] == (stat.st_mtime_ns, stat.st_size):
+            if report and (recheck_all or only is not None):
+                signature = index.signature(existing[0])
+                if signature:
+                    checked += 1
+                    # Each pair is seen from both sides; report it once
+                    matches.extend(DuplicateMatch(file_path, Path(other), similarity)
+                                   for other, similarity in index.find_similar(signature, threshold, existing[0])
+                                   if other not in reported)
+            continue
+
+        try:
+            prompt_data = load_document(file_path, remember=False)
+        except Exception as e:
+            print(f"⚠️  Error loading {file_path}: {e}", file=sys.stderr)
+            continue
+
+        if existing:
+            index.remove(existing[0])
+
+        signature = prompt_signature(prompt_data) if isinstance(prompt_data, dict) else None
+        if signature and report:
+            checked += 1
+            matches.extend(DuplicateMatch(file_path, Path(other), similarity)
+                           for other, similarity in index.find_similar(signature, threshold))
+        index.add(key, stat, signature)
+
+        pending += 1
+        if pending >= COMMIT_EVERY:
+            index.conn.commit()
+            pending = 0
+
+    for path, (doc_id, _, _) in known.items():
+        if path not in seen:
+            index.remove(doc_id)
+
+    index.conn.commit()
+    return matches, checked
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Flag near-duplicate prompts with MinHash/LSH.")
+    parser.add_argument('path', type=Path, help="Prompt directory")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Estimated Jaccard similarity to flag (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--index', type=Path, default=DEFAULT_INDEX_PATH,
+                        help=f"Duplicate index location (default: {DEFAULT_INDEX_PATH})")
+    parser.add_argument('--all', dest='recheck_all', action='store_true',
+                        help="Also re-check files that have not changed")
+    parser.add_argument('--changed-since', metavar='REF',
+                        help="Only report files that differ from this git ref (the whole library is still indexed)")
+    add_discovery_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    discovery_from_args(args)
+    if not args.path.is_dir():
+        print(f"❌ Error: Not a directory: {args.path}")
+        sys.exit(1)
+
+    only = None
+    if args.changed_since:
+        from validate_prompts import git_changed_files
+
+        try:
+            only = git_changed_files(args.changed_since, [args.path])
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"❌ Error: could not diff against {args.changed_since}: {e}")
+            sys.exit(1)
+
+    prompt_files = find_prompt_files(args.path)
+    index = DuplicateIndex(args.index)
+    try:
+        matches, checked = check_files(index, prompt_files, args.threshold, args.recheck_all, only)
+    finally:
+        index.close()
+
+    print(f"🔍 Checked {checked} prompts for near-duplicates (threshold {args.threshold:.0%})\n")
+    if not matches:
+        print("✓ No near-duplicates found")
+        sys.exit(0)
+
+    root = args.path.resolve().parent
+    for match in matches:
+        file_path, original = match.file_path.resolve(), match.original
+        if file_path.is_relative_to(root) and original.is_relative_to(root):
+            file_path, original = file_path.relative_to(root), original.relative_to(root)
+        print(f"✗ {file_path} ~ {original} ({match.similarity:.0%} similar)")
+    print(f"\nSummary: {len(matches)} near-duplicate pairs found")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
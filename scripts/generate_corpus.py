@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Generate Corpus - Synthetic, Schema-Valid Prompt Libraries for Benchmarks
+
+Emits any number of prompt files shaped like templates/PROMPT_TEMPLATE.yaml
+and constrained by prompt.schema.json, with text and tags drawn from the
+real library so parsing and rendering costs are realistic. The library is
+read through prompt_discovery.py, so --exclude leaves files out of the
+vocabulary as it does for every other script.
+
+Usage:
+    python scripts/generate_corpus.py /tmp/corpus --count 10000
+    python scripts/generate_corpus.py /tmp/corpus --count 1000000 --seed 7
+    python scripts/generate_corpus.py /tmp/corpus --count 1000 --demo-base http://127.0.0.1:8765/v/
+
+Output:
+    <target>/prompts/<category>/synthetic-NNNNNNN.yaml
+
+Distributions:
+    - Categories: skewed toward cinematic, as in most prompt libraries
+      (weights in CATEGORY_WEIGHTS), limited to the schema's enum
+    - Tags: Zipf-distributed over the library's tag vocabulary, so a few
+      tags are very common and most are rare
+    - Performance: present on PERFORMANCE_SHARE of prompts; 3s retention is
+      beta-distributed and later metrics decay from it, within the schema's
+      0-100 bounds
+    - Demo links: mostly unique, DUPLICATE_LINK_SHARE reuse an earlier link
+
+The same --seed always produces the same corpus.
+"""
+
+import sys
+import random
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from prompt_discovery import add_discovery_arguments, discovery_from_args, find_prompt_files
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+
+class PromptDumper(SafeDumper):
+    """Writes multi-line text as literal blocks, like hand-written prompts."""
+
+
+def _represent_str(dumper: PromptDumper, data: str):
+    style = '|' if '\n' in data else None
+    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style=style)
+
+
+PromptDumper.add_representer(str, _represent_str)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+TEMPLATE_PATH = PROJECT_ROOT / "templates" / "PROMPT_TEMPLATE.yaml"
+SCHEMA_PATH = PROJECT_ROOT / "prompt.schema.json"
+
+# Relative frequency of each category
+CATEGORY_WEIGHTS = {
+    'cinematic': 0.4,
+    'hyperrealism': 0.3,
+    'animation': 0.2,
+    'experimental': 0.1,
+}
+
+PERFORMANCE_SHARE = 0.35
+DEMO_LINK_SHARE = 0.9
+DUPLICATE_LINK_SHARE = 0.1
+PHYSICS_SHARE = 0.5
+
+SORA_VERSIONS = ['2.0', '2.0', '2.0', '2.1']
+AUTHORS = 200
+
+DEFAULT_DEMO_BASE = "https://youtube.com/watch?v=synthetic-"
+
+
+class CorpusGenerator:
+    """Builds synthetic prompt documents from the template, schema and library."""
+
+    def __init__(self, seed: int = 0, demo_base: str = DEFAULT_DEMO_BASE):
+        self.rng = random.Random(seed)
+        self.demo_base = demo_base
+
+        # The template ends with a document marker, so take its first document
+        with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+            self.template: Dict[str, Any] = next(doc for doc in yaml.safe_load_all(f) if doc)
+        with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+            schema = yaml.safe_load(f)
+        properties = schema['properties']
+
+        self.categories = [c for c in properties['category']['enum'] if c in CATEGORY_WEIGHTS]
+        self.category_weights = [CATEGORY_WEIGHTS[c] for c in self.categories]
+        self.max_tags = properties['tags']['maxItems']
+        self.title_max = properties['title']['maxLength']
+        self.summary_limits = (properties['summary']['minLength'], properties['summary']['maxLength'])
+        self.metric_max = properties['performance']['properties']['retention_3s']['maximum']
+
+        self._load_vocabulary()
+
+    def _load_vocabulary(self) -> None:
+        """Collect text, tags and camera details from the template and library."""
+        documents = [self.template]
+        for path in find_prompt_files(PROJECT_ROOT / "prompts"):
+            with open(path, 'r', encoding='utf-8') as f:
+                documents.append(yaml.safe_load(f))
+
+        tag_counts: Dict[str, int] = {}
+        for doc in documents:
+            for tag in doc.get('tags', []):
+                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+
+        # Most used tags first, so the Zipf weights favour them
+        self.tags = sorted(tag_counts, key=lambda tag: (-tag_counts[tag], tag))
+        self.tag_weights = [1.0 / rank for rank in range(1, len(self.tags) + 1)]
+
+        low, high = self.summary_limits
+        self.titles = [doc['title'] for doc in documents if 'title' in doc]
+        self.summaries = [doc['summary'].strip() for doc in documents
+                          if low <= len(doc.get('summary', '').strip()) <= high]
+        self.prompts = [doc['prompt'] for doc in documents if 'prompt' in doc]
+        self.cameras = [doc['camera'] for doc in documents if 'camera' in doc]
+        self.physics = [doc['physics'] for doc in documents if 'physics' in doc]
+        self.audio_notes = [doc['audio_notes'] for doc in documents if 'audio_notes' in doc]
+        self.durations = [doc['expected_duration'] for doc in documents if 'expected_duration' in doc]
+
+    def _tags(self) -> List[str]:
+        count = self.rng.randint(3, min(self.max_tags, len(self.tags)))
+        tags: List[str] = []
+        while len(tags) < count:
+            tag = self.rng.choices(self.tags, weights=self.tag_weights)[0]
+            if tag not in tags:
+                tags.append(tag)
+        return tags
+
+    def _metric(self, value: float) -> float:
+        return round(min(max(value, 0.0), self.metric_max), 1)
+
+    def _performance(self) -> Dict[str, Any]:
+        retention_3s = self._metric(self.rng.betavariate(5, 2) * self.metric_max)
+        retention_5s = self._metric(retention_3s * self.rng.uniform(0.6, 0.95))
+        completion_rate = self._metric(retention_5s * self.rng.uniform(0.5, 0.95))
+        return {
+            'retention_3s': retention_3s,
+            'retention_5s': retention_5s,
+            'completion_rate': completion_rate,
+            'replays': int(self.rng.expovariate(1 / 8)),
+        }
+
+    def generate(self, index: int) -> Dict[str, Any]:
+        """Build the document for synthetic prompt number ``index``."""
+        rng = self.rng
+        category = rng.choices(self.categories, weights=self.category_weights)[0]
+        suffix = f" #{index}"
+        title = rng.choice(self.titles)[:self.title_max - len(suffix)] + suffix
+
+        # Follow the template's key order; optional fields are sometimes left out
+        document: Dict[str, Any] = {}
+        for key in self.template:
+            if key == 'title':
+                document[key] = title
+            elif key == 'category':
+                document[key] = category
+            elif key == 'tags':
+                document[key] = self._tags()
+            elif key == 'summary':
+                document[key] = rng.choice(self.summaries)
+            elif key == 'prompt':
+                document[key] = rng.choice(self.prompts)
+            elif key == 'camera':
+                document[key] = dict(rng.choice(self.cameras))
+            elif key == 'physics':
+                if self.physics and (category == 'hyperrealism' or rng.random() < PHYSICS_SHARE):
+                    document[key] = rng.choice(self.physics)
+            elif key == 'audio_notes':
+                if self.audio_notes:
+                    document[key] = rng.choice(self.audio_notes)
+            elif key == 'expected_duration':
+                if self.durations:
+                    document[key] = rng.choice(self.durations)
+            elif key == 'author':
+                document[key] = f"contributor-{rng.randrange(AUTHORS):03d}"
+            elif key == 'created':
+                document[key] = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            elif key == 'sora_version':
+                document[key] = rng.choice(SORA_VERSIONS)
+            elif key == 'demo_link':
+                if rng.random() < DEMO_LINK_SHARE:
+                    link_id = rng.randrange(index) if index and rng.random() < DUPLICATE_LINK_SHARE else index
+                    document[key] = f"{self.demo_base}{link_id}"
+            elif key == 'performance':
+                if rng.random() < PERFORMANCE_SHARE:
+                    document[key] = self._performance()
+            elif key == 'nsfw':
+                document[key] = False
+            else:
+                document[key] = self.template[key]
+
+        # The template comments out performance; add it when sampled
+        if 'performance' not in self.template and rng.random() < PERFORMANCE_SHARE:
+            document['performance'] = self._performance()
+        return document
+
+
+def write_corpus(target: Path, count: int, seed: int = 0,
+                 demo_base: str = DEFAULT_DEMO_BASE, progress: bool = False) -> Path:
+    """
+    Write ``count`` synthetic prompts under ``target``/prompts.
+
+    Returns the prompts directory.
+    """
+    generator = CorpusGenerator(seed=seed, demo_base=demo_base)
+    prompts_dir = target / "prompts"
+    for category in generator.categories:
+        (prompts_dir / category).mkdir(parents=True, exist_ok=True)
+
+    for index in range(count):
+        document = generator.generate(index)
+        path = prompts_dir / document['category'] / f"synthetic-{index:07d}.yaml"
+        with open(path, 'w', encoding='utf-8') as f:
+            yaml.dump(document, f, Dumper=PromptDumper, sort_keys=False, allow_unicode=True, width=100)
+        if progress and (index + 1) % 10000 == 0:
+            print(f"   {index + 1}/{count} prompts written", flush=True)
+
+    return prompts_dir
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic, schema-valid prompt corpus.")
+    parser.add_argument('target', type=Path, help="Directory to write <target>/prompts/ into")
+    parser.add_argument('--count', '-n', type=int, default=1000, help="Number of prompts (default: 1000)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--demo-base', default=DEFAULT_DEMO_BASE,
+                        help="Prefix for generated demo links (default: %(default)s)")
+    add_discovery_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    discovery_from_args(args)
+    print(f"🏗️  Generating {args.count} synthetic prompts in {args.target}...")
+    prompts_dir = write_corpus(args.target, args.count, args.seed, args.demo_base, progress=True)
+    print(f"✅ Wrote {args.count} prompts to {prompts_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ Uses weighted scoring algorithm emphasizing early retention metrics.
 
 Usage:
     python scripts/identify_top_performers.py
+    python scripts/identify_top_performers.py --no-store   # stream YAML directly
+    python scripts/identify_top_performers.py --profile    # print per-stage timings
+    python scripts/identify_top_performers.py --rank-by window --window 28
 
 Output:
     - Ranked list of top performing prompts
@@ -18,14 +21,57 @@ Scoring Formula:
     weighted_score = retention_3s * 0.4 + retention_5s * 0.3 + completion_rate * 0.3
 
     Emphasizes 3-second retention (40% weight) as primary indicator of hook quality.
+
+Ranking:
+    Prompts are streamed from disk one at a time into a StreamingRanker, which
+    keeps bounded heaps for the overall top-K and each category's top 3. The
+    top-percent cutoff is the score of the last prompt in the top-K heap. A
+    pass runs in O(n log k) time with memory bounded by k, not by corpus size.
+
+    By default the metrics come from the columnar store in metrics_store.py
+    (.cache/metrics.bin), which is refreshed incrementally so only changed
+    YAML files are parsed; scores and category averages are then computed
+    over whole columns.
+
+History Ranking:
+    With --rank-by latest|window|trend|decay, scores come from the
+    performance history (performance_history.py) instead of the YAML
+    snapshot: the latest measurement, the mean over the last --window days,
+    the weekly trend over that window, or a mean decayed with --half-life.
+    SQLite aggregates each prompt's history to one score, so histories are
+    never loaded into Python. Prompts without history keep their snapshot
+    score, except with trend, which needs two or more measurements. Trend
+    scores are in points per week and may be negative; the report and the
+    README output label scores with their mode and unit.
+
+    Each measurement is scored with the formula above, then:
+
+        latest  score of the most recent measurement
+        window  mean score of the measurements in the last --window days
+        trend   7 * least-squares slope of score against day over the window
+        decay   sum(score * w) / sum(w), w = 0.5 ** (age in days / --half-life)
 """
 
-import yaml
 import sys
+import argparse
+import copy
+import heapq
+import itertools
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
-from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from prompt_corpus import load_document
+from metrics_store import MetricsStore, DEFAULT_STORE_PATH
+from instrumentation import add_profile_arguments, profiler_from_args
+from prompt_discovery import add_discovery_arguments, discovery_from_args, iter_prompt_files
+from performance_history import (PerformanceHistory, DEFAULT_HISTORY_PATH, DEFAULT_WINDOW_DAYS,
+                                 DEFAULT_HALF_LIFE_DAYS, LEGACY_CATEGORY, MODES as HISTORY_MODES,
+                                 half_life, parse_day, prompt_key)
+
+# Ranking sources: the YAML snapshot, or one of the history aggregates
+RANK_MODES = ('snapshot',) + HISTORY_MODES
 
 
 @dataclass
@@ -53,11 +99,102 @@ class PromptPerformance:
             self.weighted_score = 0.0
 
 
+# Prompts listed per category in the breakdown
+CATEGORY_TOP_N = 3
+
+
+class TopKHeap:
+    """
+    Keeps the k highest-scoring items seen so far in a bounded min-heap.
+
+    Ties are broken by arrival order, so the result matches a stable
+    descending sort of the whole input truncated to k.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, PromptPerformance]] = []
+        self._counter = itertools.count()
+
+    def push(self, perf: PromptPerformance) -> None:
+        """Offer an item; it is kept only if it ranks in the current top k."""
+        if self.k <= 0:
+            return
+        # Later arrivals compare lower on equal score, so they are evicted first
+        item = (perf.weighted_score, -next(self._counter), perf)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def ranked(self, limit: Optional[int] = None) -> List[PromptPerformance]:
+        """Return kept items, best first."""
+        ordered = sorted(self._heap, key=lambda item: item[:2], reverse=True)
+        return [item[2] for item in ordered[:limit]]
+
+
+@dataclass
+class CategoryStats:
+    """Running aggregates for one category."""
+    count: int = 0
+    total_score: float = 0.0
+    top: TopKHeap = field(default_factory=lambda: TopKHeap(CATEGORY_TOP_N))
+
+    @property
+    def average_score(self) -> float:
+        return self.total_score / self.count if self.count else 0.0
+
+
+class StreamingRanker:
+    """
+    Single-pass ranking over a stream of PromptPerformance objects.
+
+    ``capacity`` is an upper bound on the number of top performers that
+    will be requested (e.g. top_percent times the number of prompt files).
+    Because the heap keeps that many items, the final top-percent list is
+    exact while memory stays bounded by the capacity.
+    """
+
+    def __init__(self, capacity: int, top_percent: float = 0.10):
+        self.top_percent = top_percent
+        self.heap = TopKHeap(max(1, capacity))
+        self.count = 0
+        self.categories: Dict[str, CategoryStats] = {}
+
+    def add(self, perf: PromptPerformance) -> None:
+        self.heap.push(perf)
+        self.count += 1
+
+        stats = self.categories.setdefault(perf.category, CategoryStats())
+        stats.count += 1
+        stats.total_score += perf.weighted_score
+        stats.top.push(perf)
+
+    def consume(self, performances: Iterable[PromptPerformance]) -> 'StreamingRanker':
+        for perf in performances:
+            self.add(perf)
+        return self
+
+    def top_count(self) -> int:
+        """Number of top performers for the configured percentage (minimum 1)."""
+        if not self.count:
+            return 0
+        return max(1, int(self.count * self.top_percent))
+
+    def top_performers(self) -> List[PromptPerformance]:
+        return self.heap.ranked(self.top_count())
+
+    def cutoff_score(self) -> Optional[float]:
+        """Score of the last prompt in the top percentage (None if nothing was ranked)."""
+        top = self.top_performers()
+        return top[-1].weighted_score if top else None
+
+
 def load_prompt(file_path: Path) -> Optional[Dict]:
     """Load and parse a YAML prompt file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        # Each file is visited once; don't hold every document in memory
+        return load_document(file_path, remember=False)
     except Exception as e:
         print(f"⚠️  Error loading {file_path}: {e}", file=sys.stderr)
         return None
@@ -96,19 +233,14 @@ def extract_performance(prompt_data: Dict, file_path: Path) -> Optional[PromptPe
     )
 
 
-def find_all_prompts(prompts_dir: Path) -> List[Path]:
-    """Recursively find all YAML prompt files."""
-    return list(prompts_dir.glob("**/*.yaml"))
-
-
-def analyze_performance(prompts_dir: Path) -> List[PromptPerformance]:
-    """Analyze all prompts with performance data."""
-    prompt_files = find_all_prompts(prompts_dir)
-    performances = []
+def find_all_prompts(prompts_dir: Path) -> Iterator[Path]:
+    """Find all prompt files, yielding them as each category is listed."""
+    return (prompt_file.path for prompt_file in iter_prompt_files(prompts_dir))
 
-    print(f"📊 Analyzing {len(prompt_files)} prompt files...\n")
 
-    for prompt_file in prompt_files:
+def iter_performances(prompts_dir: Path) -> Iterator[PromptPerformance]:
+    """Stream PromptPerformance objects for prompts with performance data."""
+    for prompt_file in find_all_prompts(prompts_dir):
         # Skip README files
         if prompt_file.name == "README.md":
             continue
@@ -119,26 +251,114 @@ def analyze_performance(prompts_dir: Path) -> List[PromptPerformance]:
 
         perf = extract_performance(prompt_data, prompt_file)
         if perf:
-            performances.append(perf)
+            yield perf
 
-    return performances
 
+def analyze_performance(prompts_dir: Path) -> List[PromptPerformance]:
+    """Analyze all prompts with performance data."""
+    file_count = sum(1 for _ in find_all_prompts(prompts_dir))
+    print(f"📊 Analyzing {file_count} prompt files...\n")
+
+    return list(iter_performances(prompts_dir))
 
-def calculate_top_performers(performances: List[PromptPerformance], top_percent: float = 0.10) -> List[PromptPerformance]:
-    """Calculate top N% of performers based on weighted score."""
-    if not performances:
-        return []
 
-    # Sort by weighted score (descending)
-    sorted_performances = sorted(performances, key=lambda p: p.weighted_score, reverse=True)
+def apply_history_scores(performances: Iterable[PromptPerformance], scores: Dict[Tuple[str, str], float],
+                         require: bool = False) -> Iterator[PromptPerformance]:
+    """
+    Replace each prompt's weighted score with its history score, keyed by
+    (category directory, slug) like the other stores.
+
+    Measurements recorded before histories had categories apply to every
+    prompt with that slug. Prompts without a history score keep their
+    snapshot score, or are dropped when ``require`` is set. Inputs are not
+    modified.
+    """
+    for perf in performances:
+        category, slug = prompt_key(perf.file_path)
+        score = scores.get((category, slug))
+        if score is None:
+            score = scores.get((LEGACY_CATEGORY, slug))
+        if score is None:
+            if not require:
+                yield perf
+            continue
+        ranked = copy.copy(perf)
+        ranked.weighted_score = score
+        yield ranked
+
+
+def calculate_top_performers(performances: Iterable[PromptPerformance], top_percent: float = 0.10,
+                             max_count: Optional[int] = None,
+                             history: Optional[PerformanceHistory] = None, rank_by: str = 'snapshot',
+                             window_days: int = DEFAULT_WINDOW_DAYS,
+                             half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+                             as_of: Optional[int] = None) -> List[PromptPerformance]:
+    """
+    Calculate top N% of performers based on weighted score.
+
+    Accepts a list or any iterable. For a one-shot iterator, pass
+    ``max_count`` (an upper bound on its length, such as the number of prompt
+    files) to rank in bounded memory; otherwise the iterator is buffered.
+
+    With a ``history`` and ``rank_by`` other than 'snapshot', prompts are
+    ranked by that history aggregate instead (see apply_history_scores()).
+    """
+    if history is not None and rank_by != 'snapshot':
+        scores = history.scores(rank_by, as_of=as_of, window_days=window_days, half_life_days=half_life_days)
+        performances = apply_history_scores(performances, scores, require=rank_by == 'trend')
+
+    if max_count is None:
+        performances = list(performances)
+        max_count = len(performances)
+
+    if not max_count:
+        return []
 
     # Calculate number of top performers (minimum 1, maximum all)
-    num_top = max(1, int(len(sorted_performances) * top_percent))
+    ranker = StreamingRanker(capacity=max(1, int(max_count * top_percent)), top_percent=top_percent)
+    return ranker.consume(performances).top_performers()
+
+
+def performance_from_store(store: MetricsStore, row: int) -> PromptPerformance:
+    """Materialize one row of the metrics store as a PromptPerformance."""
+    return PromptPerformance(
+        file_path=Path(store.string('path', row)),
+        title=store.string('title', row),
+        category=store.category_name(row),
+        retention_3s=store.metric('retention_3s', row),
+        retention_5s=store.metric('retention_5s', row),
+        completion_rate=store.metric('completion_rate', row),
+        replays=store.metric('replays', row),
+        weighted_score=0.0,  # Will be calculated in __post_init__
+        created=store.string('created', row)
+    )
+
+
+def ranker_from_store(store: MetricsStore, top_percent: float = 0.10) -> StreamingRanker:
+    """
+    Build a StreamingRanker from the columnar store.
+
+    Scores, rankings and category aggregates are computed over the columns;
+    only the rows that end up in a report are turned into PromptPerformance
+    objects.
+    """
+    rows = store.rankable_rows()
+    scores = store.weighted_scores()
+
+    ranker = StreamingRanker(capacity=max(1, int(len(rows) * top_percent)), top_percent=top_percent)
+    ranker.count = len(rows)
+    for row in store.top_rows(ranker.heap.k, rows, scores):
+        ranker.heap.push(performance_from_store(store, row))
 
-    return sorted_performances[:num_top]
+    for category, (count, average, top_rows) in store.category_summary(CATEGORY_TOP_N).items():
+        stats = ranker.categories[category] = CategoryStats(count=count, total_score=average * count)
+        for row in top_rows:
+            stats.top.push(performance_from_store(store, row))
 
+    return ranker
 
-def format_performance_report(performances: List[PromptPerformance]) -> str:
+
+def format_performance_report(performances: List[PromptPerformance], score_label: str = "Weighted Score") -> str:
     """Format performance data as readable report."""
     if not performances:
         return "No prompts with performance data found."
@@ -153,7 +373,7 @@ def format_performance_report(performances: List[PromptPerformance]) -> str:
         lines.append(f"#{i} - {perf.title}")
         lines.append(f"    Category: {perf.category}")
         lines.append(f"    File: {perf.file_path.relative_to(perf.file_path.parents[2])}")
-        lines.append(f"    Weighted Score: {perf.weighted_score:.2f}")
+        lines.append(f"    {score_label}: {perf.weighted_score:.2f}")
         lines.append(f"    Metrics:")
         if perf.retention_3s is not None:
             lines.append(f"      - 3s Retention: {perf.retention_3s:.1f}%")
@@ -168,8 +388,14 @@ def format_performance_report(performances: List[PromptPerformance]) -> str:
     return "\n".join(lines)
 
 
-def format_for_readme(performances: List[PromptPerformance]) -> str:
-    """Format top performers for README inclusion."""
+def format_for_readme(performances: List[PromptPerformance], score_label: str = "weighted score",
+                      score_basis: Optional[str] = None) -> str:
+    """
+    Format top performers for README inclusion.
+
+    ``score_label`` names the ranked score (see SCORE_LABELS); history
+    rankings pass ``score_basis``, the aggregate the score was taken from.
+    """
     if not performances:
         return "No featured prompts available yet."
 
@@ -191,47 +417,102 @@ def format_for_readme(performances: List[PromptPerformance]) -> str:
         relative_path = perf.file_path.relative_to(perf.file_path.parents[2])
 
         lines.append(f"- {badge}**[{perf.title}]({relative_path})** ({perf.category})")
-        lines.append(f"  - 3s retention: {perf.retention_3s:.1f}% | Weighted score: {perf.weighted_score:.2f}")
+        lines.append(f"  - 3s retention: {perf.retention_3s:.1f}% | "
+                     f"{score_label[0].upper() + score_label[1:]}: {perf.weighted_score:.2f}")
 
     lines.append("")
-    lines.append("*Scores based on: retention_3s × 0.4 + retention_5s × 0.3 + completion_rate × 0.3*")
+    if score_basis:
+        lines.append(f"*Scores: {score_basis} from the performance history, each measurement scored "
+                     f"retention_3s × 0.4 + retention_5s × 0.3 + completion_rate × 0.3*")
+    else:
+        lines.append("*Scores based on: retention_3s × 0.4 + retention_5s × 0.3 + completion_rate × 0.3*")
     lines.append("")
 
     return "\n".join(lines)
 
 
-def generate_category_breakdown(performances: List[PromptPerformance]) -> str:
+def generate_category_breakdown(performances: Iterable[PromptPerformance]) -> str:
     """Generate performance breakdown by category."""
-    if not performances:
-        return "No data available."
+    ranker = StreamingRanker(capacity=1).consume(performances)
+    return format_category_breakdown(ranker.categories)
 
-    # Group by category
-    by_category = {}
-    for perf in performances:
-        if perf.category not in by_category:
-            by_category[perf.category] = []
-        by_category[perf.category].append(perf)
+
+def format_category_breakdown(categories: Dict[str, CategoryStats]) -> str:
+    """Format per-category aggregates collected by a StreamingRanker."""
+    if not categories:
+        return "No data available."
 
     lines = []
     lines.append("PERFORMANCE BY CATEGORY")
     lines.append("-" * 80)
     lines.append("")
 
-    for category, perfs in sorted(by_category.items()):
-        avg_score = sum(p.weighted_score for p in perfs) / len(perfs)
-        lines.append(f"{category.upper()}: {len(perfs)} prompts | Avg Score: {avg_score:.2f}")
+    for category, stats in sorted(categories.items()):
+        lines.append(f"{category.upper()}: {stats.count} prompts | Avg Score: {stats.average_score:.2f}")
 
         # Top 3 in category
-        top_3 = sorted(perfs, key=lambda p: p.weighted_score, reverse=True)[:3]
-        for i, perf in enumerate(top_3, 1):
+        for i, perf in enumerate(stats.top.ranked(), 1):
             lines.append(f"  {i}. {perf.title} (Score: {perf.weighted_score:.2f})")
         lines.append("")
 
     return "\n".join(lines)
 
 
-def main():
+# What the ranked score is in each mode, for report labels
+SCORE_LABELS = {
+    'snapshot': "weighted score",
+    'latest': "latest weighted score",
+    'window': "mean weighted score",
+    'trend': "trend (points/week)",
+    'decay': "decayed weighted score",
+}
+
+
+def describe_rank_mode(args) -> str:
+    """Human-readable description of a history ranking mode."""
+    if args.rank_by == 'latest':
+        return "latest measured score"
+    if args.rank_by == 'window':
+        return f"mean score over the last {args.window} days"
+    if args.rank_by == 'trend':
+        return f"score trend over the last {args.window} days (points per week)"
+    return f"decayed score (half-life {args.half_life:g} days)"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Identify top performing prompts.")
+    parser.add_argument('--store', type=Path, default=DEFAULT_STORE_PATH,
+                        help=f"Columnar metrics store (default: {DEFAULT_STORE_PATH})")
+    parser.add_argument('--no-store', action='store_true',
+                        help="Stream YAML files directly instead of using the metrics store")
+    parser.add_argument('--rank-by', choices=RANK_MODES, default='snapshot',
+                        help="Score source: YAML snapshot (default) or a performance history aggregate")
+    parser.add_argument('--history', type=Path, default=DEFAULT_HISTORY_PATH,
+                        help="Performance history database (default: data/performance_history.sqlite)")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW_DAYS,
+                        help=f"Days covered by window and trend ranking (default: {DEFAULT_WINDOW_DAYS})")
+    parser.add_argument('--half-life', type=half_life, default=DEFAULT_HALF_LIFE_DAYS,
+                        help=f"Half-life in days for decay ranking (default: {DEFAULT_HALF_LIFE_DAYS})")
+    parser.add_argument('--as-of', default=None, metavar='YYYY-MM-DD',
+                        help="Rank history as of this date (default: today)")
+    add_profile_arguments(parser)
+    add_discovery_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.as_of:
+        try:
+            args.as_of = parse_day(args.as_of)
+        except ValueError:
+            parser.error(f"invalid --as-of date: {args.as_of} (expected YYYY-MM-DD)")
+    return args
+
+
+def main(argv=None):
     """Main execution function."""
+    args = parse_args(argv)
+    profiler = profiler_from_args('identify_top_performers', args)
+    discovery_from_args(args)
+
     print("🔍 Identifying Top Performing Prompts...\n")
 
     # Get project root
@@ -243,10 +524,40 @@ def main():
         print(f"❌ Prompts directory not found: {prompts_dir}", file=sys.stderr)
         sys.exit(1)
 
-    # Analyze all prompts
-    performances = analyze_performance(prompts_dir)
-
-    if not performances:
+    # Count files up front so the top-K heap can be sized before streaming
+    with profiler.stage('discover'):
+        file_count = sum(1 for _ in find_all_prompts(prompts_dir))
+    print(f"📊 Analyzing {file_count} prompt files...\n")
+
+    top_percent = 0.10
+    if args.rank_by != 'snapshot':
+        if not args.history.exists():
+            print(f"❌ No performance history at {args.history}", file=sys.stderr)
+            print("   Record measurements with: python scripts/performance_history.py snapshot", file=sys.stderr)
+            sys.exit(1)
+        if args.no_store:
+            performances = iter_performances(prompts_dir)
+        else:
+            with profiler.stage('refresh_store'):
+                store = MetricsStore.refresh(find_all_prompts(prompts_dir), args.store)
+            performances = (performance_from_store(store, row) for row in store.rankable_rows())
+        with profiler.stage('rank'), PerformanceHistory(args.history) as history:
+            scores = history.scores(args.rank_by, as_of=args.as_of, window_days=args.window,
+                                    half_life_days=args.half_life)
+            ranker = StreamingRanker(capacity=max(1, int(file_count * top_percent)), top_percent=top_percent)
+            ranker.consume(apply_history_scores(performances, scores, require=args.rank_by == 'trend'))
+        print(f"📈 Ranking by {describe_rank_mode(args)} ({len(scores)} prompts with history)\n")
+    elif args.no_store:
+        with profiler.stage('rank'):
+            ranker = StreamingRanker(capacity=max(1, int(file_count * top_percent)), top_percent=top_percent)
+            ranker.consume(iter_performances(prompts_dir))
+    else:
+        with profiler.stage('refresh_store'):
+            store = MetricsStore.refresh(find_all_prompts(prompts_dir), args.store)
+        with profiler.stage('rank'):
+            ranker = ranker_from_store(store, top_percent)
+
+    if not ranker.count:
         print("⚠️  No prompts with performance data found.")
         print("\nTo add performance data, include a 'performance' section in your YAML:")
         print("performance:")
@@ -256,26 +567,30 @@ def main():
         print("  replays: 12")
         return
 
-    print(f"✅ Found {len(performances)} prompts with performance data\n")
+    print(f"✅ Found {ranker.count} prompts with performance data\n")
 
-    # Calculate top 10%
-    top_performers = calculate_top_performers(performances, top_percent=0.10)
+    # Top 10%
+    top_performers = ranker.top_performers()
+    score_label = SCORE_LABELS[args.rank_by]
+    score_basis = describe_rank_mode(args) if args.rank_by != 'snapshot' else None
+    print(f"Top {top_percent:.0%} cutoff: {score_label} ≥ {ranker.cutoff_score():.2f}\n")
 
     # Generate reports
-    print(format_performance_report(top_performers))
-    print("\n")
-    print(generate_category_breakdown(performances))
-    print("\n")
-    print("=" * 80)
-    print("README FORMAT OUTPUT")
-    print("=" * 80)
-    print(format_for_readme(top_performers))
+    with profiler.stage('report'):
+        print(format_performance_report(top_performers, score_label[0].upper() + score_label[1:]))
+        print("\n")
+        print(format_category_breakdown(ranker.categories))
+        print("\n")
+        print("=" * 80)
+        print("README FORMAT OUTPUT")
+        print("=" * 80)
+        print(format_for_readme(top_performers, score_label, score_basis))
 
     # Save README format to file for easy inclusion
     readme_output_path = project_root / "featured_prompts.md"
     try:
         with open(readme_output_path, 'w', encoding='utf-8') as f:
-            f.write(format_for_readme(top_performers))
+            f.write(format_for_readme(top_performers, score_label, score_basis))
         print(f"\n💾 Saved README format to: {readme_output_path}")
     except Exception as e:
         print(f"\n⚠️  Could not save README format: {e}", file=sys.stderr)
@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+"""
+Ingest Metrics - Bulk Performance Updates from Analytics Exports
+
+Reads a CSV or JSONL export of retention numbers, matches every row to a
+prompt file and rewrites that file's `performance` block (the block
+identify_top_performers.extract_performance() reads), so thousands of
+prompts can be updated without hand-editing YAML.
+
+Usage:
+    python scripts/ingest_metrics.py export.csv
+    python scripts/ingest_metrics.py export.jsonl --jobs 8
+    python scripts/ingest_metrics.py export.csv --dry-run       # report what would change
+    python scripts/ingest_metrics.py export.csv --record-history --date 2025-10-20
+    cat export.jsonl | python scripts/ingest_metrics.py - --format jsonl
+
+Input columns (CSV header or JSONL keys):
+    path | slug | title   Which prompt a row belongs to, tried in that order;
+                          slug is the file name without extension, titles are
+                          matched case-insensitively. Add `category` when a
+                          slug or title exists in several categories.
+    retention_3s, retention_5s, completion_rate, replays
+                          Metrics to set; empty or missing cells leave the
+                          current value alone. Later rows for the same
+                          prompt override earlier ones.
+    date                  Measurement date for --record-history (optional)
+
+Matching:
+    Slugs and titles come from a prompt index cached in
+    .cache/prompt_index.pickle. Titles are read from the top-level `title:`
+    line; only files whose mtime or size changed are read again.
+
+Rewriting:
+    Only the lines of the `performance` block change. Existing metric
+    values are replaced in place (keeping inline comments, comment lines and
+    key order; a value equal to the new one keeps its spelling), missing
+    metrics are added after the block's last entry, and a block is appended
+    when the file has none. Only keys at the block's own indent are matched,
+    column-0 comments do not end the block, and added lines use the file's
+    own line ending (LF or CRLF). Every rewritten file is re-parsed and must
+    equal the original document with the new metrics, or it is reported as
+    failed and left alone. Files are rewritten by a process pool, each
+    through a temp file renamed into place, and only when their text changed.
+
+Exit Codes:
+    0 - Every row was applied
+    1 - Some rows were invalid or unmatched, or a file could not be written
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import pickle
+import argparse
+from datetime import date
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from prompt_discovery import add_discovery_arguments, discovery_from_args, iter_prompt_files
+from performance_history import parse_day, prompt_key
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULT_INDEX_PATH = PROJECT_ROOT / ".cache" / "prompt_index.pickle"
+
+INDEX_VERSION = 1
+
+METRICS = ('retention_3s', 'retention_5s', 'completion_rate', 'replays')
+PERCENT_METRICS = ('retention_3s', 'retention_5s', 'completion_rate')
+
+# Files handed to a worker process at once
+CHUNK_SIZE = 256
+
+TITLE_PATTERN = re.compile(r'^title:[ \t]*(.*?)[ \t]*$', re.MULTILINE)
+PERFORMANCE_PATTERN = re.compile(r'^performance:[ \t]*(?P<inline>[^#\r\n]*?)[ \t]*(?P<comment>#[^\r\n]*)?\r?$',
+                                 re.MULTILINE)
+# First line of the next top-level key; column-0 comments stay inside the block
+TOP_LEVEL_LINE = re.compile(r'^[^\s#]', re.MULTILINE)
+# A `key: value  # comment` line; only lines at the block's own indent are matched
+KEY_LINE = re.compile(r'^(?P<indent> *)(?P<key>[A-Za-z0-9_]+):(?P<space>[ \t]*)(?P<value>[^#\n]*?)'
+                      r'(?P<suffix>[ \t]*(?:#[^\n]*)?)(?P<eol>\r?\n?)$')
+# Existing values written like this are kept when they equal the new value
+PLAIN_NUMBER = re.compile(r'^-?[0-9]+(?:\.[0-9]*)?$')
+
+DEFAULT_INDENT = "  "
+
+
+def normalize_title(title: str) -> str:
+    return ' '.join(str(title).casefold().split())
+
+
+def read_title(file_path: Path) -> str:
+    """
+    A prompt's title, read from its top-level `title:` line.
+
+    Falls back to parsing the document for quoted, folded or multi-line titles.
+    """
+    text = file_path.read_text(encoding='utf-8')
+    match = TITLE_PATTERN.search(text)
+    if match:
+        value = match.group(1)
+        if len(value) >= 2 and value[0] == value[-1] == '"' and not set('"\\') & set(value[1:-1]):
+            return value[1:-1]
+        if len(value) >= 2 and value[0] == value[-1] == "'" and "'" not in value[1:-1].replace("''", ""):
+            return value[1:-1].replace("''", "'")
+        if value and value[0] not in '"\'>|&*!{[%@`' and ' #' not in value:
+            return value
+    from prompt_corpus import parse_yaml
+
+    try:
+        prompt_data = parse_yaml(text, str(file_path))
+    except Exception:
+        return ''
+    return str(prompt_data.get('title', '')) if isinstance(prompt_data, dict) else ''
+
+
+def row_text(row: Dict[str, Any], field: str) -> str:
+    """A row's cell as stripped text (JSONL values may be numbers)."""
+    value = row.get(field)
+    return '' if value is None else str(value).strip()
+
+
+class PromptIndex:
+    """Slug and title lookup over every prompt file, cached by file stat."""
+
+    def __init__(self, prompts_dir: Path, cache_path: Optional[Path] = DEFAULT_INDEX_PATH):
+        self.prompts_dir = prompts_dir.resolve()
+        self.cache_path = cache_path
+        # path -> (mtime_ns, size, category, slug, title)
+        self.files: Dict[str, Tuple[int, int, str, str, str]] = {}
+        self.by_slug: Dict[str, List[str]] = {}
+        self.by_title: Dict[str, List[str]] = {}
+
+    def refresh(self) -> 'PromptIndex':
+        """Re-read titles of new or changed files and rebuild the lookups."""
+        previous = {}
+        if self.cache_path:
+            try:
+                with open(self.cache_path, 'rb') as f:
+                    version, prompts_dir, files = pickle.load(f)
+                if version == INDEX_VERSION and prompts_dir == str(self.prompts_dir):
+                    previous = files
+            except (OSError, pickle.PickleError, EOFError, ValueError, TypeError):
+                pass
+
+        changed = False
+        for prompt_file in iter_prompt_files(self.prompts_dir):
+            path, stat = str(prompt_file.path), prompt_file.stat
+            cached = previous.get(path)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                self.files[path] = cached
+                continue
+            self.files[path] = (stat.st_mtime_ns, stat.st_size, prompt_file.category or '',
+                                prompt_file.path.stem, read_title(prompt_file.path))
+            changed = True
+
+        if self.cache_path and (changed or len(self.files) != len(previous)):
+            self.save()
+
+        for path, (_, _, _, slug, title) in self.files.items():
+            self.by_slug.setdefault(slug, []).append(path)
+            if title:
+                self.by_title.setdefault(normalize_title(title), []).append(path)
+        return self
+
+    def update_stats(self, paths: List[str]) -> None:
+        """Record new stats for files whose title did not change (e.g. after a metrics rewrite)."""
+        for path in paths:
+            stat = os.stat(path)
+            self.files[path] = (stat.st_mtime_ns, stat.st_size, *self.files[path][2:])
+        if self.cache_path and paths:
+            self.save()
+
+    def save(self) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((INDEX_VERSION, str(self.prompts_dir), self.files), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path)
+
+    def resolve(self, row: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """Prompt file for a row as (path, None), or (None, reason)."""
+        category = row_text(row, 'category')
+
+        path = row_text(row, 'path')
+        if path:
+            for candidate in (Path(path), PROJECT_ROOT / path, self.prompts_dir / path):
+                key = os.path.abspath(candidate)
+                if key in self.files:
+                    return key, None
+            return None, f"unknown path '{path}'"
+
+        for field, lookup, key in (('slug', self.by_slug, row_text(row, 'slug')),
+                                   ('title', self.by_title, normalize_title(row_text(row, 'title')))):
+            if not key:
+                continue
+            matches = lookup.get(key, [])
+            if category:
+                matches = [match for match in matches if self.files[match][2] == category]
+            if len(matches) == 1:
+                return matches[0], None
+            if not matches:
+                return None, f"no prompt with {field} '{row.get(field)}'"
+            return None, f"{field} '{row.get(field)}' is ambiguous; add a category column"
+
+        return None, "row has no path, slug or title"
+
+
+def parse_metrics(row: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Metrics present in a row, checked against the schema's bounds."""
+    metrics: Dict[str, Any] = {}
+    for name in METRICS:
+        raw = row.get(name)
+        if raw is None or (isinstance(raw, str) and not raw.strip()):
+            continue
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            return {}, f"{name} is not a number: {raw!r}"
+        if name == 'replays':
+            if not value.is_integer() or value < 0:
+                return {}, f"replays must be a non-negative integer: {raw!r}"
+            metrics[name] = int(value)
+        elif not 0 <= value <= 100:
+            return {}, f"{name} must be between 0 and 100: {raw!r}"
+        else:
+            metrics[name] = value
+    if not metrics:
+        return {}, "row has no metrics"
+    return metrics, None
+
+
+def read_rows(source, input_format: str) -> Iterator[Dict[str, Any]]:
+    """Stream rows from an open CSV or JSONL file."""
+    if input_format == 'csv':
+        yield from csv.DictReader(source)
+        return
+    for line in source:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def format_metric(name: str, value: Any) -> str:
+    return str(int(value)) if name == 'replays' else repr(float(value))
+
+
+def replace_value(current: str, name: str, value: Any) -> str:
+    """New text for a metric's value, keeping the current text when it already equals the value."""
+    current = current.strip()
+    if PLAIN_NUMBER.match(current) and float(current) == float(value):
+        return current
+    return format_metric(name, value)
+
+
+def indent_of(line: str) -> int:
+    return len(line) - len(line.lstrip(' '))
+
+
+def rewrite_performance(text: str, metrics: Dict[str, Any]) -> str:
+    """
+    Return the YAML text with its top-level `performance` block updated.
+
+    Everything outside the block, and every line inside it that does not
+    hold one of the updated metrics, is left as it was. Only keys at the
+    block's own indent are touched, so nested mappings and block scalars
+    that happen to contain a metric name are not. New lines use the file's
+    own line ending.
+    """
+    newline = "\r\n" if "\r\n" in text else "\n"
+    match = PERFORMANCE_PATTERN.search(text)
+    if not match:
+        lines = "".join(f"{DEFAULT_INDENT}{name}: {format_metric(name, metrics[name])}{newline}"
+                        for name in METRICS if name in metrics)
+        if text and not text.endswith("\n"):
+            text += newline
+        return f"{text}{newline}performance:{newline}{lines}" if text.strip() else f"performance:{newline}{lines}"
+
+    body_start = min(match.end() + 1, len(text))
+    next_key = TOP_LEVEL_LINE.search(text, body_start)
+    body_end = next_key.start() if next_key else len(text)
+
+    if match.group('inline'):
+        # Flow mapping or null on the key line: merge with its values and write a block
+        from prompt_corpus import parse_yaml
+
+        try:
+            current = parse_yaml(text[match.start():body_end]).get('performance')
+        except Exception:
+            current = None
+        merged = {**(current if isinstance(current, dict) else {}), **metrics}
+        comment = f" {match.group('comment')}" if match.group('comment') else ""
+        lines = "".join(f"{DEFAULT_INDENT}{name}: {value if name not in METRICS else format_metric(name, value)}{newline}"
+                        for name, value in merged.items())
+        return f"{text[:match.start()]}performance:{comment}{newline}{lines}{text[body_end:]}"
+
+    lines = text[body_start:body_end].splitlines(keepends=True)
+    # The block's indent is that of its first key; deeper lines belong to that key's value
+    indent = next((indent_of(line) for line in lines
+                   if line.strip() and not line.lstrip().startswith('#') and indent_of(line) > 0), None)
+
+    pending = {name: metrics[name] for name in METRICS if name in metrics}
+    last_content = -1
+    for number, line in enumerate(lines):
+        if line.strip() and indent_of(line) > 0:
+            last_content = number
+        if indent is None or indent_of(line) != indent:
+            continue
+        key_match = KEY_LINE.match(line)
+        if not key_match or key_match.group('key') not in pending:
+            continue
+        name = key_match.group('key')
+        value = replace_value(key_match.group('value'), name, pending.pop(name))
+        lines[number] = (f"{key_match.group('indent')}{name}:{key_match.group('space') or ' '}{value}"
+                         f"{key_match.group('suffix')}{key_match.group('eol')}")
+
+    if pending:
+        prefix = " " * indent if indent else DEFAULT_INDENT
+        added = [f"{prefix}{name}: {format_metric(name, value)}{newline}" for name, value in pending.items()]
+        if last_content >= 0 and not lines[last_content].endswith("\n"):
+            lines[last_content] += newline
+        lines[last_content + 1:last_content + 1] = added
+        if body_start == len(text) and not text.endswith("\n"):
+            lines.insert(0, newline)
+
+    return text[:body_start] + "".join(lines) + text[body_end:]
+
+
+def check_round_trip(original: str, updated: str, metrics: Dict[str, Any], name: str) -> Optional[str]:
+    """
+    Why the rewritten text does not parse to the original document with the
+    metrics applied, or None if it does.
+    """
+    from prompt_corpus import parse_yaml
+
+    before = parse_yaml(original, name)
+    after = parse_yaml(updated, name)
+    if not isinstance(before, dict) or not isinstance(after, dict):
+        return "document is not a mapping"
+    performance = before.get('performance')
+    expected = dict(before, performance={**(performance if isinstance(performance, dict) else {}), **metrics})
+    if after == expected:
+        return None
+    wrong = sorted(key for key in set(expected) | set(after) if expected.get(key) != after.get(key))
+    if wrong == ['performance']:
+        actual = after.get('performance') if isinstance(after.get('performance'), dict) else {}
+        wrong = sorted(key for key in set(expected['performance']) | set(actual)
+                       if expected['performance'].get(key) != actual.get(key))
+    return f"rewritten file does not round-trip ({', '.join(map(str, wrong))})"
+
+
+def write_atomic(file_path: Path, text: str) -> None:
+    """Replace a file's contents through a temp file in the same directory."""
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        os.chmod(tmp_path, os.stat(file_path).st_mode & 0o7777)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def apply_update(path: str, metrics: Dict[str, Any], dry_run: bool = False) -> Tuple[str, str, Optional[str]]:
+    """
+    Rewrite one file; returns (path, 'updated' | 'unchanged' | 'error', error).
+
+    The new text is re-parsed before it is written, and the file is left
+    alone if anything besides the updated metrics would change.
+    """
+    file_path = Path(path)
+    try:
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            text = f.read()
+        updated = rewrite_performance(text, metrics)
+        if updated == text:
+            return path, 'unchanged', None
+        error = check_round_trip(text, updated, metrics, path)
+        if error:
+            return path, 'error', error
+        if not dry_run:
+            write_atomic(file_path, updated)
+        return path, 'updated', None
+    except Exception as e:
+        return path, 'error', str(e)
+
+
+def _apply_in_worker(job: Tuple[str, Dict[str, Any], bool]) -> Tuple[str, str, Optional[str]]:
+    return apply_update(*job)
+
+
+def apply_updates(updates: Dict[str, Dict[str, Any]], jobs: int = 1,
+                  dry_run: bool = False) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """Rewrite every file, in a process pool when ``jobs`` > 1."""
+    work = [(path, metrics, dry_run) for path, metrics in sorted(updates.items())]
+    if jobs <= 1 or len(work) < CHUNK_SIZE:
+        for job in work:
+            yield _apply_in_worker(job)
+        return
+    chunk_size = max(1, min(CHUNK_SIZE, len(work) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_apply_in_worker, work, chunksize=chunk_size)
+
+
+def measurement_day(value: str) -> int:
+    """argparse type for --date: a YYYY-MM-DD date as a day number."""
+    try:
+        return parse_day(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r} (expected YYYY-MM-DD)")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Write performance metrics from an analytics export into prompt YAML files.")
+    parser.add_argument('export', help="CSV or JSONL export ('-' for stdin)")
+    parser.add_argument('--format', choices=('csv', 'jsonl'),
+                        help="Input format (default: from the file extension)")
+    parser.add_argument('--prompts', type=Path, default=PROJECT_ROOT / "prompts",
+                        help="Prompt directory (default: prompts/)")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Worker processes for rewriting (default: one per CPU)")
+    parser.add_argument('--dry-run', action='store_true', help="Report changes without writing files")
+    parser.add_argument('--record-history', action='store_true',
+                        help="Also append the metrics of every updated file to the performance history")
+    parser.add_argument('--date', type=measurement_day, default=None, metavar='YYYY-MM-DD',
+                        help="Measurement date for rows without a date column (default: today)")
+    parser.add_argument('--history', type=Path, default=None,
+                        help="Performance history database (default: data/performance_history.sqlite)")
+    add_discovery_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not args.format:
+        suffix = Path(args.export).suffix.lower()
+        if suffix == '.csv':
+            args.format = 'csv'
+        elif suffix in ('.jsonl', '.ndjson', '.json'):
+            args.format = 'jsonl'
+        else:
+            parser.error("cannot tell the input format; pass --format csv or --format jsonl")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+    discovery_from_args(args)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if not args.prompts.is_dir():
+        print(f"❌ Prompts directory not found: {args.prompts}", file=sys.stderr)
+        sys.exit(1)
+
+    print("📥 Ingesting performance metrics...\n")
+    index = PromptIndex(args.prompts).refresh()
+    print(f"🗂️  Indexed {len(index.files)} prompts")
+
+    default_day = args.date if args.date is not None else date.today().toordinal()
+    updates: Dict[str, Dict[str, Any]] = {}
+    history_rows = []
+    problems = []
+    row_count = 0
+
+    source = sys.stdin if args.export == '-' else open(args.export, 'r', encoding='utf-8', newline='')
+    try:
+        for line_number, row in enumerate(read_rows(source, args.format), start=2 if args.format == 'csv' else 1):
+            row_count += 1
+            if not isinstance(row, dict):
+                problems.append(f"row {line_number}: not an object")
+                continue
+            metrics, error = parse_metrics(row)
+            path = None
+            if not error:
+                path, error = index.resolve(row)
+            if error:
+                problems.append(f"row {line_number}: {error}")
+                continue
+            updates.setdefault(path, {}).update(metrics)
+            if args.record_history:
+                try:
+                    day = date.fromisoformat(str(row['date']).strip()).toordinal() if row.get('date') else default_day
+                except ValueError:
+                    problems.append(f"row {line_number}: invalid date {row['date']!r}")
+                    continue
+                history_rows.append((path, (*prompt_key(Path(path)), day, *(metrics.get(name) for name in METRICS))))
+    except (json.JSONDecodeError, csv.Error, UnicodeDecodeError) as e:
+        print(f"❌ Could not read {args.export}: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    print(f"📄 Read {row_count} rows for {len(updates)} prompts ({len(problems)} skipped)\n")
+
+    counts = {'updated': 0, 'unchanged': 0, 'error': 0}
+    rewritten = []
+    failed = set()
+    for path, status, error in apply_updates(updates, jobs=jobs, dry_run=args.dry_run):
+        counts[status] += 1
+        if error:
+            failed.add(path)
+            problems.append(f"{os.path.relpath(path)}: {error}")
+        elif status == 'updated' and not args.dry_run:
+            rewritten.append(path)
+    index.update_stats(rewritten)
+
+    # Only files that now hold the new metrics get history, so the two never disagree
+    history_rows = [row for path, row in history_rows if path not in failed]
+    if args.record_history and history_rows and not args.dry_run:
+        from performance_history import PerformanceHistory, DEFAULT_HISTORY_PATH
+
+        with PerformanceHistory(args.history or DEFAULT_HISTORY_PATH) as history:
+            added = history.record_many(history_rows)
+        print(f"📈 Recorded {added} new history measurements")
+
+    for problem in problems[:50]:
+        print(f"⚠️  {problem}")
+    if len(problems) > 50:
+        print(f"⚠️  ... and {len(problems) - 50} more")
+
+    verb = "Would update" if args.dry_run else "Updated"
+    print(f"\n✨ {verb} {counts['updated']} prompt files "
+          f"({counts['unchanged']} already current, {counts['error']} failed)")
+
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Instrumentation - Per-Stage Profiling Shared by All Scripts
+
+Records where a run spends its time so a slow nightly job can be traced to
+file discovery, YAML parsing, schema validation, markdown rendering or HTTP.
+validate_prompts.py, build_index.py, identify_top_performers.py and
+check_links.py all accept the same flags:
+
+    --profile                     Collect and print metrics when the run ends
+    --profile-format json|prometheus
+    --profile-output PATH         Write metrics to a file instead of stderr
+    --cprofile PATH               Also dump cProfile stats of the run (pstats format)
+
+Collected metrics:
+    - Wall and CPU time, and call count, per named stage
+    - Latency histograms: YAML parse time per file, schema validation per
+      file, README rendering per category, HTTP request time per host
+    - Peak traced memory (tracemalloc) and peak RSS
+
+Usage in a script:
+    profiler = get_profiler()
+    with profiler.stage('discover'):
+        files = ...
+    with profiler.stage('render', histogram='readme_render_seconds', category=category):
+        ...
+    profiler.observe('http_request_seconds', elapsed, host='youtube.com')
+
+When profiling is off, get_profiler() returns a disabled profiler whose
+methods return immediately, so instrumented code costs almost nothing.
+Metrics are collected in the current process only; with validate_prompts.py
+--jobs, per-file histograms cover files validated in the parent process.
+"""
+
+import sys
+import json
+import time
+import atexit
+import cProfile
+import threading
+import contextlib
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Histogram bucket upper bounds in seconds (Prometheus defaults, plus sub-millisecond)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "sora"
+
+FORMATS = ('json', 'prometheus')
+
+# Descriptions for the histograms recorded by the scripts
+HISTOGRAM_HELP = {
+    'yaml_parse_seconds': "Time to parse one prompt YAML file",
+    'schema_validation_seconds': "Time to validate one prompt against the schema",
+    'readme_render_seconds': "Time to render one category README",
+    'http_request_seconds': "Time for one demo link request",
+}
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (at most the max seen)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        """(le, cumulative count) pairs, ending with +Inf."""
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            yield repr(bound), seen
+        yield '+Inf', self.count
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': dict(self.cumulative()),
+        }
+
+
+class Profiler:
+    """Collects stage timings, latency histograms and memory for one run."""
+
+    def __init__(self, script: str, enabled: bool = False, output_format: str = 'json',
+                 output: Optional[Path] = None, cprofile_path: Optional[Path] = None):
+        self.script = script
+        self.enabled = enabled
+        self.output_format = output_format
+        self.output = output
+        self.cprofile_path = cprofile_path
+
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._lock = threading.Lock()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+        self._finished = False
+
+    def start(self) -> None:
+        """Begin memory tracing (and cProfile) and report when the process exits."""
+        if not self.enabled:
+            return
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        # Scripts leave through sys.exit() on many paths; report on all of them
+        atexit.register(self.finish)
+
+    @contextlib.contextmanager
+    def stage(self, name: str, histogram: Optional[str] = None, **labels: str):
+        """
+        Time a block as a named stage (stages may repeat and nest).
+
+        With ``histogram``, each run of the block is also observed as one
+        latency sample of that histogram, with the given labels.
+        """
+        if not self.enabled:
+            yield
+            return
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            with self._lock:
+                stats = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+                stats['wall_seconds'] += wall
+                stats['cpu_seconds'] += cpu
+                stats['calls'] += 1
+            if histogram:
+                self.observe(histogram, wall, **labels)
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Add a latency sample to a histogram (thread-safe)."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def memory(self) -> Dict[str, Optional[int]]:
+        peak_traced = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        peak_rss = None
+        if resource is not None:
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak_rss *= 1 if sys.platform == 'darwin' else 1024
+        return {'peak_traced_bytes': peak_traced, 'peak_rss_bytes': peak_rss}
+
+    def report(self) -> Dict:
+        """All metrics as a JSON-serializable dict."""
+        histograms: Dict[str, List[Dict]] = {}
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            histograms.setdefault(name, []).append({'labels': dict(labels), **histogram.to_dict()})
+        return {
+            'script': self.script,
+            'wall_seconds': round(time.perf_counter() - self._started, 6),
+            'cpu_seconds': round(time.process_time() - self._started_cpu, 6),
+            'stages': {
+                name: {key: round(value, 6) if isinstance(value, float) else value for key, value in stats.items()}
+                for name, stats in self.stages.items()
+            },
+            'histograms': histograms,
+            'memory': self.memory(),
+        }
+
+    def to_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        report = self.report()
+        script = self.script
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str) -> str:
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            return full_name
+
+        def label_text(labels: Dict[str, str]) -> str:
+            escaped = {key: str(value).replace('\\', '\\\\').replace('"', '\\"') for key, value in labels.items()}
+            return ','.join(f'{key}="{value}"' for key, value in escaped.items())
+
+        name = metric('run_wall_seconds', 'gauge', "Wall time of the whole run")
+        lines.append(f'{name}{{script="{script}"}} {report["wall_seconds"]}')
+        name = metric('run_cpu_seconds', 'gauge', "CPU time of the whole run")
+        lines.append(f'{name}{{script="{script}"}} {report["cpu_seconds"]}')
+
+        for field, kind, help_text in (('wall_seconds', 'gauge', "Wall time per stage"),
+                                       ('cpu_seconds', 'gauge', "CPU time per stage"),
+                                       ('calls', 'counter', "Times each stage ran")):
+            name = metric(f"stage_{field}" if field != 'calls' else 'stage_calls_total', kind, help_text)
+            for stage, stats in report['stages'].items():
+                lines.append(f'{name}{{script="{script}",stage="{stage}"}} {stats[field]}')
+
+        for histogram_name, series in report['histograms'].items():
+            name = metric(histogram_name, 'histogram', HISTOGRAM_HELP.get(histogram_name, histogram_name))
+            for entry in series:
+                labels = label_text({'script': script, **entry['labels']})
+                for bound, count in entry['buckets'].items():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{name}_sum{{{labels}}} {entry["sum"]}')
+                lines.append(f'{name}_count{{{labels}}} {entry["count"]}')
+
+        for field, value in report['memory'].items():
+            if value is not None:
+                name = metric(field.replace('_bytes', '_memory_bytes'), 'gauge', f"Peak memory ({field})")
+                lines.append(f'{name}{{script="{script}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+    def finish(self) -> None:
+        """Stop tracing and write the metrics (once)."""
+        if not self.enabled or self._finished:
+            return
+        self._finished = True
+
+        if self._cprofile:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(str(self.cprofile_path))
+
+        text = (self.to_prometheus() if self.output_format == 'prometheus'
+                else json.dumps(self.report(), indent=2) + "\n")
+        tracemalloc.stop()
+
+        if self.output:
+            self.output.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"\n📊 Profile written to: {self.output}", file=sys.stderr)
+        else:
+            print(f"\n📊 Profile ({self.script}):", file=sys.stderr)
+            sys.stderr.write(text)
+        if self._cprofile:
+            print(f"📊 cProfile stats written to: {self.cprofile_path}", file=sys.stderr)
+
+
+_profiler = Profiler(script=Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else 'python')
+
+
+def get_profiler() -> Profiler:
+    """Return the process-wide profiler (disabled unless configured)."""
+    return _profiler
+
+
+def configure_profiler(script: str, enabled: bool, output_format: str = 'json',
+                       output: Optional[Path] = None, cprofile_path: Optional[Path] = None) -> Profiler:
+    """Replace the process-wide profiler and start it if enabled."""
+    global _profiler
+    _profiler = Profiler(script, enabled, output_format, output, cprofile_path)
+    _profiler.start()
+    return _profiler
+
+
+def add_profile_arguments(parser) -> None:
+    """Add the shared --profile options to a script's argument parser."""
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true',
+                       help="Record per-stage timings, latency histograms and peak memory")
+    group.add_argument('--profile-format', choices=FORMATS, default='json',
+                       help="Metrics format (default: json)")
+    group.add_argument('--profile-output', type=Path, metavar='PATH',
+                       help="Write metrics to a file instead of stderr")
+    group.add_argument('--cprofile', type=Path, metavar='PATH',
+                       help="Also dump cProfile stats of the run to PATH (implies --profile)")
+
+
+def profiler_from_args(script: str, args) -> Profiler:
+    """Configure the process-wide profiler from parsed --profile options."""
+    enabled = args.profile or bool(args.cprofile) or bool(args.profile_output)
+    return configure_profiler(script, enabled, args.profile_format, args.profile_output, args.cprofile)
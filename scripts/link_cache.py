@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Link Cache - Persistent Results for check_links.py
+
+Stores the outcome of every demo_link check in a SQLite database keyed by
+normalized URL, so repeat runs only touch links whose entry has gone stale.
+
+Each entry records:
+    - HTTP status code and accessibility
+    - Final URL after redirects
+    - ETag / Last-Modified validators
+    - Time of the last check
+
+Healthy and broken links expire after separate TTLs. Stale healthy entries
+that carry a validator are revalidated with If-None-Match / If-Modified-Since
+instead of a full re-check.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+from dataclasses import dataclass
+
+# Default cache location (ignored by git)
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / ".cache" / "link_cache.sqlite"
+
+# How long a healthy link is trusted before it is revalidated (seconds)
+HEALTHY_TTL = 7 * 24 * 3600
+
+# How long a broken link is trusted before it is checked again (seconds)
+BROKEN_TTL = 24 * 3600
+
+# Number of stored results between commits
+COMMIT_EVERY = 200
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS link_checks (
+    url TEXT PRIMARY KEY,
+    accessible INTEGER NOT NULL,
+    status_code INTEGER,
+    error_message TEXT,
+    final_url TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    checked_at REAL NOT NULL
+)
+"""
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for use as a cache key.
+
+    Lowercases the scheme and host, drops default ports and fragments,
+    and removes an empty path so equivalent spellings share one entry.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+
+    path = parts.path or '/'
+    return urlunsplit((scheme, netloc, path, parts.query, ''))
+
+
+@dataclass
+class CacheEntry:
+    """Cached outcome of a single link check."""
+    url: str
+    accessible: bool
+    status_code: Optional[int]
+    error_message: Optional[str]
+    final_url: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    checked_at: float
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class LinkCache:
+    """SQLite-backed cache of link check results with TTL expiry."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH,
+                 healthy_ttl: float = HEALTHY_TTL,
+                 broken_ttl: float = BROKEN_TTL):
+        self.path = Path(path)
+        self.healthy_ttl = healthy_ttl
+        self.broken_ttl = broken_ttl
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+        # Counters reported in the link check summary
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._pending = 0
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for a URL, fresh or not."""
+        key = normalize_url(url)
+        row = self.conn.execute(
+            "SELECT accessible, status_code, error_message, final_url, etag, last_modified, checked_at "
+            "FROM link_checks WHERE url = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        return CacheEntry(
+            url=key,
+            accessible=bool(row[0]),
+            status_code=row[1],
+            error_message=row[2],
+            final_url=row[3],
+            etag=row[4],
+            last_modified=row[5],
+            checked_at=row[6],
+        )
+
+    def is_fresh(self, entry: CacheEntry, now: Optional[float] = None) -> bool:
+        """Check whether an entry is still within its TTL."""
+        now = time.time() if now is None else now
+        ttl = self.healthy_ttl if entry.accessible else self.broken_ttl
+        return now - entry.checked_at < ttl
+
+    def fresh(self, url: str) -> Optional[CacheEntry]:
+        """Return the entry for a URL if it can be reused without a request."""
+        entry = self.get(url)
+        if entry and self.is_fresh(entry):
+            self.hits += 1
+            return entry
+        return None
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """
+        Conditional headers for a stale entry.
+
+        Only healthy entries are revalidated: a 304 confirms the resource
+        still exists, which says nothing useful about a broken link.
+        """
+        entry = self.get(url)
+        if entry and entry.accessible:
+            return entry.validators()
+        return {}
+
+    def store(self, url: str, accessible: bool, status_code: Optional[int],
+              error_message: Optional[str], final_url: Optional[str] = None,
+              etag: Optional[str] = None, last_modified: Optional[str] = None,
+              not_modified: bool = False) -> CacheEntry:
+        """
+        Record the outcome of a check.
+
+        When ``not_modified`` is set (the server answered 304), the previous
+        entry is kept and only its check time is refreshed.
+        """
+        previous = self.get(url) if not_modified else None
+        if previous:
+            self.revalidated += 1
+            entry = CacheEntry(
+                url=previous.url,
+                accessible=previous.accessible,
+                status_code=previous.status_code,
+                error_message=previous.error_message,
+                final_url=previous.final_url,
+                etag=etag or previous.etag,
+                last_modified=last_modified or previous.last_modified,
+                checked_at=time.time(),
+            )
+        else:
+            self.misses += 1
+            entry = CacheEntry(
+                url=normalize_url(url),
+                accessible=accessible,
+                status_code=status_code,
+                error_message=error_message,
+                final_url=final_url,
+                etag=etag,
+                last_modified=last_modified,
+                checked_at=time.time(),
+            )
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO link_checks "
+            "(url, accessible, status_code, error_message, final_url, etag, last_modified, checked_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry.url, int(entry.accessible), entry.status_code, entry.error_message,
+             entry.final_url, entry.etag, entry.last_modified, entry.checked_at)
+        )
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.flush()
+        return entry
+
+    def flush(self) -> None:
+        """Commit stored results to disk."""
+        self.conn.commit()
+        self._pending = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for the current run (kept in memory, so also valid after close())."""
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+        }
+
+    def close(self) -> None:
+        """Commit pending results and close the database connection."""
+        self.flush()
+        self.conn.close()
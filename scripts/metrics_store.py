@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Metrics Store - Columnar Performance Data for Analytics
+
+Keeps the `performance` block of every prompt (retention_3s, retention_5s,
+completion_rate, replays) together with its category, title, created date
+and path in a compact columnar file, so rankings and per-category averages
+are computed over whole columns instead of re-parsing YAML into
+PromptPerformance objects.
+
+Features:
+    - One contiguous array per column, persisted to .cache/metrics.bin
+    - Loading memory-maps the file; numeric columns are zero-copy views
+    - Vectorized with NumPy when it is installed, plain array loops otherwise
+    - Incremental refresh: only files whose mtime or size changed are parsed,
+      and the file is not rewritten when none did
+
+File layout (native byte order, recorded in the header):
+    8 bytes    magic b"SORAMET1"
+    4 bytes    header length (little-endian uint32)
+    N bytes    JSON header: row count, category names, column table
+    columns    raw arrays, each starting on an 8-byte boundary
+
+Missing metrics are stored as NaN (floats) or -1 (replays); booleans and
+non-integral replay counts, which the schema rejects, count as missing. A
+row is rankable when retention_3s is present, matching extract_performance().
+"""
+
+import os
+import sys
+import json
+import mmap
+import heapq
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from prompt_corpus import load_document
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"SORAMET1"
+FORMAT_VERSION = 1
+
+# Default store location (ignored by git)
+DEFAULT_STORE_PATH = Path(__file__).parent.parent / ".cache" / "metrics.bin"
+
+# Same weights as PromptPerformance.weighted_score
+WEIGHTS = {
+    'retention_3s': 0.4,
+    'retention_5s': 0.3,
+    'completion_rate': 0.3,
+}
+
+# Numeric columns and their array type codes
+NUMERIC_COLUMNS = {
+    'retention_3s': 'd',
+    'retention_5s': 'd',
+    'completion_rate': 'd',
+    'replays': 'q',
+    'category': 'q',
+    'mtime_ns': 'q',
+    'size': 'q',
+}
+
+# Text columns, stored as uint64 offsets into a UTF-8 blob
+STRING_COLUMNS = ('path', 'title', 'created')
+
+NAN = float('nan')
+MISSING_REPLAYS = -1
+
+
+def _metric(value) -> float:
+    """Convert a YAML metric to float, NaN when missing or malformed (booleans are not numbers)."""
+    if value is None or isinstance(value, bool):
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _replays(value) -> int:
+    """Replay count as stored, MISSING_REPLAYS unless it is an integer as the schema defines one."""
+    if isinstance(value, bool):
+        return MISSING_REPLAYS
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return MISSING_REPLAYS
+
+
+class MetricsStore:
+    """Columnar table with one row per prompt file."""
+
+    def __init__(self, columns: Dict[str, Sequence], strings: Dict[str, Tuple[Sequence[int], bytes]],
+                 categories: List[str], rows: int, mapping: Optional[mmap.mmap] = None,
+                 views: Sequence[memoryview] = ()):
+        self.columns = columns
+        self.strings = strings
+        self.categories = categories
+        self.rows = rows
+        self._mapping = mapping
+        self._views = list(views)
+        self._row_by_path: Optional[Dict[str, int]] = None
+        # Rows build() copied unchanged from the previous store
+        self.reused_rows = 0
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, prompt_files: Iterable[Path], previous: Optional['MetricsStore'] = None) -> 'MetricsStore':
+        """
+        Build a store from prompt files.
+
+        Rows of ``previous`` whose file still has the same mtime and size are
+        copied without parsing the YAML again.
+        """
+        columns = {name: array(code) for name, code in NUMERIC_COLUMNS.items()}
+        texts: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+        categories: List[str] = []
+        category_ids: Dict[str, int] = {}
+        reused = 0
+
+        def category_id(name: str) -> int:
+            if name not in category_ids:
+                category_ids[name] = len(categories)
+                categories.append(name)
+            return category_ids[name]
+
+        for file_path in sorted(prompt_files):
+            key = os.path.abspath(file_path)
+            try:
+                stat = os.stat(key)
+            except OSError:
+                continue
+
+            row = previous.row_for_path(key) if previous else None
+            if (row is not None and previous.columns['mtime_ns'][row] == stat.st_mtime_ns
+                    and previous.columns['size'][row] == stat.st_size):
+                values = {name: previous.columns[name][row] for name in ('retention_3s', 'retention_5s',
+                                                                         'completion_rate', 'replays')}
+                values['category'] = category_id(previous.categories[previous.columns['category'][row]])
+                title = previous.string('title', row)
+                created = previous.string('created', row)
+                reused += 1
+            else:
+                try:
+                    prompt_data = load_document(file_path, remember=False)
+                except Exception as e:
+                    print(f"⚠️  Error loading {file_path}: {e}", file=sys.stderr)
+                    continue
+                if not isinstance(prompt_data, dict):
+                    continue
+
+                performance = prompt_data.get('performance')
+                performance = performance if isinstance(performance, dict) else {}
+                values = {
+                    'retention_3s': _metric(performance.get('retention_3s')),
+                    'retention_5s': _metric(performance.get('retention_5s')),
+                    'completion_rate': _metric(performance.get('completion_rate')),
+                    'replays': _replays(performance.get('replays')),
+                    'category': category_id(str(prompt_data.get('category', 'unknown'))),
+                }
+                title = str(prompt_data.get('title', 'Untitled'))
+                created = str(prompt_data.get('created', ''))
+
+            for name, value in values.items():
+                columns[name].append(value)
+            columns['mtime_ns'].append(stat.st_mtime_ns)
+            columns['size'].append(stat.st_size)
+            texts['path'].append(key)
+            texts['title'].append(title)
+            texts['created'].append(created)
+
+        strings = {}
+        for name, values in texts.items():
+            offsets = array('Q', [0])
+            blob = bytearray()
+            for value in values:
+                blob.extend(value.encode('utf-8'))
+                offsets.append(len(blob))
+            strings[name] = (offsets, bytes(blob))
+
+        store = cls(columns, strings, categories, len(texts['path']))
+        store.reused_rows = reused
+        return store
+
+    @classmethod
+    def refresh(cls, prompt_files: Iterable[Path], store_path: Path = DEFAULT_STORE_PATH) -> 'MetricsStore':
+        """
+        Load the saved store, rebuild it incrementally and save the result.
+
+        Nothing is written when every file's mtime and size match the saved
+        store and no file was added or removed.
+        """
+        previous = cls.load(store_path)
+        store = cls.build(prompt_files, previous)
+        unchanged = previous is not None and store.rows == previous.rows == store.reused_rows
+        if previous:
+            previous.close()
+        if not unchanged:
+            store.save(store_path)
+        return store
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, store_path: Path) -> None:
+        """Write the store atomically."""
+        store_path = Path(store_path)
+        blocks = []
+        for name, code in NUMERIC_COLUMNS.items():
+            blocks.append((name, code, memoryview(self.columns[name]).cast('B')))
+        for name in STRING_COLUMNS:
+            offsets, blob = self.strings[name]
+            blocks.append((f"{name}.offsets", 'Q', memoryview(offsets).cast('B')))
+            blocks.append((f"{name}.blob", 'B', memoryview(blob).cast('B')))
+
+        # Lay out columns after the header, each aligned to 8 bytes
+        table = []
+        position = 0
+        for name, code, data in blocks:
+            table.append({'name': name, 'type': code, 'offset': position, 'length': len(data)})
+            position += (len(data) + 7) // 8 * 8
+
+        header = json.dumps({
+            'version': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'rows': self.rows,
+            'categories': self.categories,
+            'columns': table,
+        }).encode('utf-8')
+        data_start = (len(MAGIC) + 4 + len(header) + 7) // 8 * 8
+
+        store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = store_path.with_name(f"{store_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for (name, code, data), entry in zip(blocks, table):
+                f.seek(data_start + entry['offset'])
+                f.write(data)
+            f.truncate(data_start + position)
+        os.replace(tmp_path, store_path)
+
+    @classmethod
+    def load(cls, store_path: Path) -> Optional['MetricsStore']:
+        """
+        Memory-map a saved store; returns None if missing, incompatible or damaged.
+
+        A store whose columns are truncated, missing or do not match the
+        row count (e.g. written by another version) counts as damaged, so
+        callers rebuild it.
+        """
+        mapping = None
+        views = []
+        try:
+            with open(store_path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+                (header_length,) = struct.unpack('<I', f.read(4))
+                header = json.loads(f.read(header_length).decode('utf-8'))
+                if header.get('version') != FORMAT_VERSION or header.get('byteorder') != sys.byteorder:
+                    return None
+                data_start = (len(MAGIC) + 4 + header_length + 7) // 8 * 8
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            view = memoryview(mapping)
+            views.append(view)
+            rows = header['rows']
+            blocks = {}
+            for entry in header['columns']:
+                start = data_start + entry['offset']
+                if start + entry['length'] > len(mapping):
+                    raise ValueError(f"column {entry['name']} is truncated")
+                block = view[start:start + entry['length']].cast(entry['type'])
+                views.append(block)
+                blocks[entry['name']] = block
+
+            columns = {name: blocks[name] for name in NUMERIC_COLUMNS}
+            strings = {name: (blocks[f"{name}.offsets"], blocks[f"{name}.blob"]) for name in STRING_COLUMNS}
+            if any(len(column) != rows for column in columns.values()) or \
+                    any(len(offsets) != rows + 1 for offsets, _ in strings.values()):
+                raise ValueError("column lengths do not match the row count")
+            return cls(columns, strings, header['categories'], rows, mapping, views)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError, struct.error):
+            for view in reversed(views):
+                view.release()
+            if mapping is not None:
+                mapping.close()
+            return None
+
+    def close(self) -> None:
+        """
+        Release the memory map of a loaded store.
+
+        Columns are copied into memory first, so the store stays usable.
+        """
+        if self._mapping is None:
+            return
+        for name in list(self.columns):
+            self.columns[name] = array(NUMERIC_COLUMNS[name], self.columns[name])
+        for name, (offsets, blob) in list(self.strings.items()):
+            self.strings[name] = (array('Q', offsets), bytes(blob))
+        # Views must be released before the map can be closed
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mapping.close()
+        self._mapping = None
+
+    # ------------------------------------------------------------------
+    # Row access
+    # ------------------------------------------------------------------
+
+    def string(self, name: str, row: int) -> str:
+        offsets, blob = self.strings[name]
+        return bytes(blob[offsets[row]:offsets[row + 1]]).decode('utf-8')
+
+    def row_for_path(self, path: str) -> Optional[int]:
+        if self._row_by_path is None:
+            self._row_by_path = {self.string('path', row): row for row in range(self.rows)}
+        return self._row_by_path.get(path)
+
+    def category_name(self, row: int) -> str:
+        return self.categories[self.columns['category'][row]]
+
+    def metric(self, name: str, row: int) -> Optional[float]:
+        """Return a metric value, or None when it was missing."""
+        value = self.columns[name][row]
+        if name == 'replays':
+            return None if value == MISSING_REPLAYS else value
+        return None if value != value else value
+
+    # ------------------------------------------------------------------
+    # Analytics
+    # ------------------------------------------------------------------
+
+    def rankable_rows(self) -> List[int]:
+        """Rows with retention_3s present, in file order."""
+        if np is not None:
+            return np.flatnonzero(~np.isnan(np.asarray(self.columns['retention_3s']))).tolist()
+        return [row for row, value in enumerate(self.columns['retention_3s']) if value == value]
+
+    def weighted_scores(self) -> Sequence[float]:
+        """
+        Weighted score for every row.
+
+        Matches PromptPerformance: 0.0 unless all three retention metrics
+        are present.
+        """
+        if np is not None:
+            scores = sum(np.asarray(self.columns[name]) * weight for name, weight in WEIGHTS.items())
+            return np.nan_to_num(scores, nan=0.0)
+
+        r3, r5, completion = (self.columns[name] for name in WEIGHTS)
+        scores = array('d')
+        for a, b, c in zip(r3, r5, completion):
+            score = a * WEIGHTS['retention_3s'] + b * WEIGHTS['retention_5s'] + c * WEIGHTS['completion_rate']
+            scores.append(score if score == score else 0.0)
+        return scores
+
+    def top_rows(self, k: int, rows: Optional[List[int]] = None,
+                 scores: Optional[Sequence[float]] = None) -> List[int]:
+        """Return up to k rows by descending weighted score (ties keep file order)."""
+        rows = self.rankable_rows() if rows is None else rows
+        scores = self.weighted_scores() if scores is None else scores
+        if np is not None and rows:
+            candidates = np.asarray(rows)
+            order = np.argsort(-np.asarray(scores)[candidates], kind='stable')
+            return candidates[order[:k]].tolist()
+        return heapq.nlargest(k, rows, key=lambda row: scores[row])
+
+    def category_summary(self, top_n: int = 3) -> Dict[str, Tuple[int, float, List[int]]]:
+        """
+        Per-category (count, average score, top rows) over rankable rows.
+        """
+        rows = self.rankable_rows()
+        scores = self.weighted_scores()
+        categories = self.columns['category']
+
+        if np is not None and rows:
+            row_index = np.asarray(rows)
+            ids = np.asarray(categories)[row_index]
+            counts = np.bincount(ids, minlength=len(self.categories))
+            totals = np.bincount(ids, weights=np.asarray(scores)[row_index], minlength=len(self.categories))
+            members = {cid: row_index[ids == cid].tolist() for cid in np.flatnonzero(counts).tolist()}
+        else:
+            counts = [0] * len(self.categories)
+            totals = [0.0] * len(self.categories)
+            members = {}
+            for row in rows:
+                cid = categories[row]
+                counts[cid] += 1
+                totals[cid] += scores[row]
+                members.setdefault(cid, []).append(row)
+
+        return {
+            self.categories[cid]: (
+                int(counts[cid]),
+                float(totals[cid]) / int(counts[cid]),
+                self.top_rows(top_n, category_rows, scores),
+            )
+            for cid, category_rows in members.items()
+        }
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Performance History - Append-Only Time Series of Prompt Metrics
+
+The `performance` block in each YAML file is a single snapshot. This store
+keeps every measurement, keyed by prompt (category directory and slug, the
+file name without extension) and measurement date, so rankings can use
+recent averages, trends or decayed scores instead of whatever value was
+last edited in.
+
+Usage:
+    python scripts/performance_history.py snapshot               # record every YAML block as of today
+    python scripts/performance_history.py snapshot --date 2025-10-20
+    python scripts/performance_history.py add cinematic/noir-detective --date 2025-10-20 \\
+        --retention-3s 81.5 --retention-5s 70 --completion-rate 64.2 --replays 9
+    python scripts/performance_history.py show noir-detective    # category looked up in prompts/
+
+    python scripts/identify_top_performers.py --rank-by window --window 28
+    python scripts/identify_top_performers.py --rank-by decay --half-life 14
+    python scripts/identify_top_performers.py --rank-by trend
+
+Storage:
+    SQLite table `measurements` (WITHOUT ROWID, clustered by category, slug
+    and day), one row per prompt per day, with the weighted score stored
+    alongside the raw metrics. Rows are only ever inserted; recording the
+    same prompt and day twice keeps the first measurement. Prompts with the
+    same slug in different categories have separate histories. Rows from a
+    version 1 database, which had no category, are kept with an empty
+    category and count for every prompt with that slug.
+
+Scores (computed by SQLite, one row per prompt):
+    latest   weighted score of the most recent measurement
+    window   mean weighted score over the last N days
+    trend    least-squares slope of the weighted score over the last N days,
+             in points per week (needs two or more measurements)
+    decay    mean weighted score with each measurement weighted by
+             0.5 ** (age in days / half-life)
+
+Default location: data/performance_history.sqlite. Unlike the caches in
+.cache/, the history cannot be rebuilt from the YAML files.
+"""
+
+import sys
+import sqlite3
+import argparse
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metrics_store import WEIGHTS
+from prompt_discovery import add_discovery_arguments, discovery_from_args, find_prompt_files
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULT_HISTORY_PATH = PROJECT_ROOT / "data" / "performance_history.sqlite"
+
+MODES = ('latest', 'window', 'trend', 'decay')
+
+# Defaults for the window/trend length and the decay half-life (days)
+DEFAULT_WINDOW_DAYS = 28
+DEFAULT_HALF_LIFE_DAYS = 14
+
+METRICS = ('retention_3s', 'retention_5s', 'completion_rate', 'replays')
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS measurements (
+    category TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    retention_3s REAL,
+    retention_5s REAL,
+    completion_rate REAL,
+    replays INTEGER,
+    score REAL,
+    PRIMARY KEY (category, slug, day)
+) WITHOUT ROWID
+"""
+
+# Version 1 rows had no category; they keep an empty one
+MIGRATE_FROM_V1 = """
+ALTER TABLE measurements RENAME TO measurements_v1;
+{schema};
+INSERT INTO measurements
+    SELECT '', slug, day, retention_3s, retention_5s, completion_rate, replays, score FROM measurements_v1;
+DROP TABLE measurements_v1;
+""".format(schema=SCHEMA.strip())
+
+# Category of measurements recorded before histories were keyed by category
+LEGACY_CATEGORY = ''
+
+
+def prompt_key(file_path: Path) -> Tuple[str, str]:
+    """(category, slug) of a prompt file: its directory name and file name without extension."""
+    return file_path.parent.name, file_path.stem
+
+
+def resolve_prompt(value: str, prompts_dir: Path) -> Tuple[str, str]:
+    """
+    (category, slug) for a ``category/slug`` argument, or for a bare slug
+    that names exactly one prompt file under ``prompts_dir``.
+    """
+    category, _, slug = value.rpartition('/')
+    if category:
+        return category, slug
+    from prompt_discovery import iter_prompt_files
+
+    matches = [prompt_key(prompt_file.path) for prompt_file in iter_prompt_files(prompts_dir)
+               if prompt_file.path.stem == slug]
+    if len(matches) == 1:
+        return matches[0]
+    if not matches:
+        raise ValueError(f"no prompt named {slug} in {prompts_dir}; use CATEGORY/SLUG")
+    raise ValueError(f"{slug} exists in several categories ({', '.join(c for c, _ in matches)}); use CATEGORY/SLUG")
+
+
+def parse_day(value: str) -> int:
+    """Day number (proleptic ordinal) of a YYYY-MM-DD date."""
+    return date.fromisoformat(str(value)).toordinal()
+
+
+def half_life(value: str) -> float:
+    """argparse type for a decay half-life: a positive number of days."""
+    try:
+        days = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid half-life {value!r} (expected a number of days)")
+    if not days > 0:
+        raise argparse.ArgumentTypeError(f"half-life must be a positive number of days, not {value}")
+    return days
+
+
+def as_number(value) -> Optional[float]:
+    """A YAML metric as a number, or None if it is missing or not numeric."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def weighted_score(retention_3s: Optional[float], retention_5s: Optional[float],
+                   completion_rate: Optional[float]) -> Optional[float]:
+    """Same formula as PromptPerformance.weighted_score; None unless all three metrics are present."""
+    values = {'retention_3s': retention_3s, 'retention_5s': retention_5s, 'completion_rate': completion_rate}
+    if any(value is None for value in values.values()):
+        return None
+    return sum(values[name] * weight for name, weight in WEIGHTS.items())
+
+
+class PerformanceHistory:
+    """SQLite-backed, append-only history of prompt performance measurements."""
+
+    def __init__(self, path: Path = DEFAULT_HISTORY_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            if version == 1:
+                self.conn.executescript(MIGRATE_FROM_V1)
+            else:
+                self.conn.execute(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.commit()
+
+    def __enter__(self) -> 'PerformanceHistory':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(self, category: str, slug: str, day: int, retention_3s: Optional[float] = None,
+               retention_5s: Optional[float] = None, completion_rate: Optional[float] = None,
+               replays: Optional[int] = None) -> bool:
+        """Add one measurement; returns False if the prompt already has one for that day."""
+        return self.record_many([(category, slug, day, retention_3s, retention_5s, completion_rate, replays)]) == 1
+
+    def record_many(self, rows: Iterable[Tuple]) -> int:
+        """
+        Add (category, slug, day, retention_3s, retention_5s, completion_rate, replays) rows.
+
+        Returns the number of new measurements.
+        """
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO measurements VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            ((category, slug, day, r3, r5, cr, replays, weighted_score(r3, r5, cr))
+             for category, slug, day, r3, r5, cr, replays in rows)
+        )
+        self.conn.commit()
+        return self.conn.total_changes - before
+
+    def snapshot(self, prompt_files: Iterable[Path], day: int) -> int:
+        """Record the `performance` block of every prompt file as measured on ``day``."""
+        from prompt_corpus import load_document
+
+        def rows():
+            for file_path in prompt_files:
+                try:
+                    prompt_data = load_document(file_path, remember=False)
+                except Exception as e:
+                    print(f"⚠️  Error loading {file_path}: {e}", file=sys.stderr)
+                    continue
+                performance = prompt_data.get('performance') if isinstance(prompt_data, dict) else None
+                if not isinstance(performance, dict) or all(as_number(performance.get(m)) is None for m in METRICS):
+                    continue
+                yield (*prompt_key(file_path), day, *(as_number(performance.get(metric)) for metric in METRICS))
+
+        return self.record_many(rows())
+
+    def measurements(self, category: str, slug: str) -> List[Tuple]:
+        """(day, retention_3s, retention_5s, completion_rate, replays, score) rows of one prompt, oldest first."""
+        return self.conn.execute(
+            "SELECT day, retention_3s, retention_5s, completion_rate, replays, score "
+            "FROM measurements WHERE category = ? AND slug = ? ORDER BY day", (category, slug)
+        ).fetchall()
+
+    def scores(self, mode: str, as_of: Optional[int] = None, window_days: int = DEFAULT_WINDOW_DAYS,
+               half_life_days: float = DEFAULT_HALF_LIFE_DAYS) -> Dict[Tuple[str, str], float]:
+        """
+        One score per (category, slug), aggregated inside SQLite.
+
+        Only measurements on or before ``as_of`` (default: today) with a
+        weighted score are used; prompts without enough data are left out.
+        """
+        as_of = as_of if as_of is not None else date.today().toordinal()
+        start = as_of - window_days
+
+        if mode == 'latest':
+            # SQLite returns the other columns of the row that holds MAX(day)
+            query = ("SELECT category, slug, score, MAX(day) FROM measurements "
+                     "WHERE score IS NOT NULL AND day <= ? GROUP BY category, slug")
+            params: Tuple = (as_of,)
+        elif mode == 'window':
+            query = ("SELECT category, slug, AVG(score) FROM measurements "
+                     "WHERE score IS NOT NULL AND day > ? AND day <= ? GROUP BY category, slug")
+            params = (start, as_of)
+        elif mode == 'trend':
+            # Least-squares slope with x = days before as_of, scaled to points per week
+            query = ("SELECT category, slug, 7.0 * (COUNT(*) * SUM(x * score) - SUM(x) * SUM(score)) "
+                     "/ (COUNT(*) * SUM(x * x) - SUM(x) * SUM(x)) "
+                     "FROM (SELECT category, slug, day - ? AS x, score FROM measurements "
+                     "      WHERE score IS NOT NULL AND day > ? AND day <= ?) "
+                     "GROUP BY category, slug HAVING COUNT(*) >= 2")
+            params = (as_of, start, as_of)
+        elif mode == 'decay':
+            if not half_life_days > 0:
+                raise ValueError(f"half-life must be positive, not {half_life_days}")
+            self.conn.create_function('decay_weight', 1, lambda age: 0.5 ** (age / half_life_days),
+                                      deterministic=True)
+            query = ("SELECT category, slug, SUM(score * decay_weight(? - day)) / SUM(decay_weight(? - day)) "
+                     "FROM measurements WHERE score IS NOT NULL AND day <= ? GROUP BY category, slug")
+            params = (as_of, as_of, as_of)
+        else:
+            raise ValueError(f"Unknown score mode: {mode} (choose from {', '.join(MODES)})")
+
+        return {(row[0], row[1]): row[2] for row in self.conn.execute(query, params) if row[2] is not None}
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Record and inspect prompt performance history.")
+    parser.add_argument('--history', type=Path, default=DEFAULT_HISTORY_PATH,
+                        help="History database (default: data/performance_history.sqlite)")
+    parser.add_argument('--prompts', type=Path, default=PROJECT_ROOT / "prompts",
+                        help="Prompt directory (default: prompts/)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    snapshot = commands.add_parser('snapshot', help="Record every prompt's performance block")
+    snapshot.add_argument('--date', default=date.today().isoformat(), help="Measurement date (default: today)")
+
+    add = commands.add_parser('add', help="Record one measurement")
+    add.add_argument('prompt', help="CATEGORY/SLUG, or a slug that is unique across categories")
+    add.add_argument('--date', default=date.today().isoformat(), help="Measurement date (default: today)")
+    add.add_argument('--retention-3s', type=float)
+    add.add_argument('--retention-5s', type=float)
+    add.add_argument('--completion-rate', type=float)
+    add.add_argument('--replays', type=int)
+
+    show = commands.add_parser('show', help="Print one prompt's measurements")
+    show.add_argument('prompt', help="CATEGORY/SLUG, or a slug that is unique across categories")
+
+    add_discovery_arguments(snapshot)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+
+    try:
+        day = parse_day(args.date) if hasattr(args, 'date') else None
+    except ValueError:
+        print(f"❌ Invalid date: {args.date} (expected YYYY-MM-DD)", file=sys.stderr)
+        sys.exit(1)
+
+    if hasattr(args, 'prompt'):
+        try:
+            category, slug = resolve_prompt(args.prompt, args.prompts)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        name = f"{category}/{slug}"
+
+    with PerformanceHistory(args.history) as history:
+        if args.command == 'snapshot':
+            discovery_from_args(args)
+            prompt_files = find_prompt_files(args.prompts)
+            added = history.snapshot(prompt_files, day)
+            print(f"📈 Recorded {added} measurements for {args.date} ({len(prompt_files)} prompt files)")
+
+        elif args.command == 'add':
+            if history.record(category, slug, day, args.retention_3s, args.retention_5s,
+                              args.completion_rate, args.replays):
+                print(f"📈 Recorded {name} for {args.date}")
+            else:
+                print(f"⚠️  {name} already has a measurement for {args.date}; history is append-only")
+                sys.exit(1)
+
+        elif args.command == 'show':
+            rows = history.measurements(category, slug)
+            if not rows:
+                print(f"⚠️  No measurements for {name}")
+                sys.exit(1)
+            print(f"{'date':<12}{'ret_3s':>9}{'ret_5s':>9}{'complete':>10}{'replays':>9}{'score':>9}")
+            for day_number, *values in rows:
+                cells = ''.join(f"{'-' if value is None else round(value, 2):>{width}}"
+                                for value, width in zip(values, (9, 9, 10, 9, 9)))
+                print(f"{date.fromordinal(day_number).isoformat():<12}{cells}")
+
+
+if __name__ == "__main__":
+    main()
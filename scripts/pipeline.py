@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Pipeline - Single-Pass Validation, Indexing, Ranking and Link Collection
+
+Walks prompts/ once, parses each YAML file once, and hands every parsed
+document to a list of stages, instead of running validate_prompts.py,
+build_index.py, identify_top_performers.py and check_links.py as separate
+processes that each walk and parse the library again.
+
+Usage:
+    python scripts/sora_prompts.py run-all
+    python scripts/sora_prompts.py run-all --stages validate,index
+    python scripts/sora_prompts.py run-all --check-links
+
+Stages:
+    validate      PromptValidator.validate_document() on each document
+    index         Category README entries, rendered and written as by
+                  build_index.py when a README's bytes change
+    performance   extract_performance() into a StreamingRanker, reported as
+                  by identify_top_performers.py
+    links         Demo links collected into a LinkCheckPlan; with
+                  --check-links the plan is probed as by check_links.py
+
+Each stage receives a PromptDocument (path, category, parsed data or load
+error) through add(), then finish() prints its report and returns whether
+the stage passed.
+
+Exit Codes:
+    0 - Every stage passed
+    1 - Invalid prompts or broken links found
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from prompt_corpus import load_document
+from instrumentation import add_profile_arguments, get_profiler, profiler_from_args
+from prompt_discovery import add_discovery_arguments, discovery_from_args, iter_prompt_files
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+STAGES = ('validate', 'index', 'performance', 'links')
+
+# Share of prompts ranked as top performers, as in identify_top_performers.py
+TOP_PERCENT = 0.10
+
+
+@dataclass
+class PromptDocument:
+    """One prompt file as handed to every stage."""
+    path: Path
+    category: Optional[str]
+    data: Any
+    error: Optional[Exception] = None
+
+
+class ValidationStage:
+    """Schema validation of every document."""
+
+    name = 'validate'
+
+    def __init__(self, schema_path: Path):
+        from validate_prompts import PromptValidator, format_load_error
+
+        self.validator = PromptValidator(schema_path)
+        self.format_load_error = format_load_error
+        self.valid = 0
+        self.total = 0
+        self.errors: List[str] = []
+
+    def add(self, document: PromptDocument) -> None:
+        self.total += 1
+        if document.error is not None:
+            is_valid, errors = False, [self.format_load_error(document.path, document.error)]
+        else:
+            try:
+                is_valid, errors = self.validator.validate_document(document.path, document.data)
+            except Exception as e:
+                is_valid, errors = False, [self.format_load_error(document.path, e)]
+        if is_valid:
+            self.valid += 1
+        else:
+            self.errors.extend(errors)
+
+    def finish(self) -> bool:
+        for error in self.errors:
+            print(error)
+            print()
+        if self.errors:
+            print(f"✗ Validation: {self.valid}/{self.total} prompts valid ({len(self.errors)} errors)")
+        else:
+            print(f"✓ Validation: {self.valid}/{self.total} prompts valid")
+        return not self.errors
+
+
+class IndexStage:
+    """Category README rendering."""
+
+    name = 'index'
+
+    def __init__(self, prompts_dir: Path):
+        import build_index
+
+        self.build_index = build_index
+        self.prompts_dir = prompts_dir
+        # category -> [(created, rendered README entry)] in file name order
+        self.entries: Dict[str, List[Tuple[str, str]]] = {}
+        self.failed = 0
+
+    def add(self, document: PromptDocument) -> None:
+        if not document.category:
+            return
+        if not isinstance(document.data, dict):
+            self.failed += 1
+            return
+        try:
+            entry = self.build_index.generate_prompt_entry(document.data, document.path.name)
+            created = self.build_index.created_key(document.data)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self.failed += 1  # Incomplete prompt; reported by validation
+            return
+        self.entries.setdefault(document.category, []).append((created, entry))
+
+    def finish(self) -> bool:
+        updated = unchanged = 0
+        for category, entries in sorted(self.entries.items()):
+            if category not in self.build_index.CATEGORY_DESCRIPTIONS:
+                print(f"⚠️  Unknown category: {category}", file=sys.stderr)
+                continue
+            content = self.build_index.render_category_readme(category, entries)
+            readme_path = self.prompts_dir / category / "README.md"
+            current = readme_path.read_text(encoding='utf-8') if readme_path.exists() else None
+            if current == content:
+                unchanged += 1
+                continue
+            with open(readme_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            print(f"✅ Updated {category}/README.md ({len(entries)} prompts)")
+            updated += 1
+        print(f"✨ Index: {updated} category READMEs updated, {unchanged} already current")
+        # Files that could not be rendered fail validation, so they do not fail this stage
+        return True
+
+
+class PerformanceStage:
+    """Top-performer ranking over documents with performance data."""
+
+    name = 'performance'
+
+    def __init__(self, file_count: int):
+        from identify_top_performers import StreamingRanker, extract_performance
+
+        self.extract_performance = extract_performance
+        self.ranker = StreamingRanker(capacity=max(1, int(file_count * TOP_PERCENT)), top_percent=TOP_PERCENT)
+
+    def add(self, document: PromptDocument) -> None:
+        if isinstance(document.data, dict):
+            perf = self.extract_performance(document.data, document.path)
+            if perf:
+                self.ranker.add(perf)
+
+    def finish(self) -> bool:
+        from identify_top_performers import format_category_breakdown, format_performance_report
+
+        if not self.ranker.count:
+            print("⚠️  Performance: no prompts with performance data found")
+            return True
+        print(format_performance_report(self.ranker.top_performers()))
+        print()
+        print(format_category_breakdown(self.ranker.categories))
+        print(f"📊 Performance: {self.ranker.count} prompts ranked, "
+              f"top {TOP_PERCENT:.0%} cutoff {self.ranker.cutoff_score():.2f}")
+        return True
+
+
+class LinkStage:
+    """Demo link collection, optionally followed by checking every unique link."""
+
+    name = 'links'
+
+    def __init__(self, check: bool = False, use_cache: bool = True):
+        from check_links import LinkCheckPlan
+
+        self.plan = LinkCheckPlan(references={}, file_order=[], skipped=[])
+        self.check = check
+        self.use_cache = use_cache
+
+    def add(self, document: PromptDocument) -> None:
+        self.plan.add(document.path, document.data if isinstance(document.data, dict) else None)
+
+    def finish(self) -> bool:
+        print(f"🔗 Links: {len(self.plan.file_order)} demo links, {len(self.plan.references)} unique "
+              f"across {len(self.plan.by_host())} hosts")
+        if not self.check:
+            return True
+
+        from check_links import check_plan, generate_summary
+        from link_cache import LinkCache, DEFAULT_CACHE_PATH
+
+        cache = LinkCache(DEFAULT_CACHE_PATH) if self.use_cache else None
+        try:
+            results = check_plan(self.plan, cache=cache)
+            print(generate_summary(results, cache.stats() if cache else None))
+        finally:
+            if cache:
+                cache.close()
+        return all(result.accessible for result in results)
+
+
+def run_pipeline(prompts_dir: Path, stages: List[str], check_links: bool = False,
+                 use_link_cache: bool = True) -> bool:
+    """
+    Walk and parse the library once, feeding every document to the selected stages.
+
+    Returns True if every stage passed.
+    """
+    profiler = get_profiler()
+    with profiler.stage('discover'):
+        prompt_files = list(iter_prompt_files(prompts_dir))
+
+    consumers = []
+    if 'validate' in stages:
+        consumers.append(ValidationStage(PROJECT_ROOT / "prompt.schema.json"))
+    if 'index' in stages:
+        consumers.append(IndexStage(prompts_dir))
+    if 'performance' in stages:
+        consumers.append(PerformanceStage(len(prompt_files)))
+    if 'links' in stages:
+        consumers.append(LinkStage(check=check_links, use_cache=use_link_cache))
+
+    print(f"🚀 Processing {len(prompt_files)} prompt files ({', '.join(c.name for c in consumers)})...\n")
+
+    for prompt_file in prompt_files:
+        with profiler.stage('parse'):
+            try:
+                document = PromptDocument(prompt_file.path, prompt_file.category,
+                                          load_document(prompt_file.path, remember=False))
+            except Exception as e:
+                document = PromptDocument(prompt_file.path, prompt_file.category, None, e)
+        for consumer in consumers:
+            with profiler.stage(consumer.name):
+                consumer.add(document)
+
+    passed = True
+    for consumer in consumers:
+        with profiler.stage(consumer.name):
+            passed = consumer.finish() and passed
+        print()
+    return passed
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Validate, index, rank and collect links in one pass.")
+    parser.add_argument('--prompts', type=Path, default=PROJECT_ROOT / "prompts",
+                        help="Prompt directory (default: prompts/)")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument('--check-links', action='store_true',
+                        help="Probe the collected demo links (network access)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="With --check-links, ignore the link result cache")
+    add_profile_arguments(parser)
+    add_discovery_arguments(parser)
+    args = parser.parse_args(argv)
+
+    args.stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}. Choose from: {', '.join(STAGES)}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+    profiler_from_args('run_all', args)
+    discovery_from_args(args)
+
+    if not args.prompts.is_dir():
+        print(f"❌ Prompts directory not found: {args.prompts}", file=sys.stderr)
+        sys.exit(1)
+
+    passed = run_pipeline(args.prompts, args.stages, check_links=args.check_links,
+                          use_link_cache=not args.no_cache)
+    if not passed:
+        print("❌ Some stages failed", file=sys.stderr)
+        sys.exit(1)
+    print("✨ All stages passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Prompt Corpus - Shared YAML Loading for All Scripts
+
+Single place where prompt YAML files are read and parsed. Every script
+(validate_prompts, build_index, identify_top_performers, check_links) loads
+prompts through this module, so each file is parsed at most once per process
+and, thanks to an on-disk cache, at most once across runs while it is
+unchanged.
+
+Features:
+    - Uses libyaml's CSafeLoader when PyYAML was built with it
+    - In-memory memo of parsed documents for the current process
+    - On-disk cache keyed by path + mtime + size + content hash
+    - Files whose mtime changed but whose content did not (e.g. after a
+      git checkout) are recognized by hash and not re-parsed
+    - The cache is sharded by directory (one shard per category) and a
+      shard is only read when a file in it is first looked up, so a
+      single-file run reads one small shard instead of the whole library
+    - Worker processes hand the documents they parsed back to the parent
+      (take_updates() / merge()), which writes them to the cache
+
+Cache location:
+    .cache/prompt_corpus/ (override with PROMPT_CORPUS_CACHE=<dir>,
+    disable with PROMPT_CORPUS_CACHE=off), one <hash>.pickle per directory
+
+Parsed documents are shared between callers and must be treated as read-only.
+"""
+
+import atexit
+import hashlib
+import io
+import os
+import pickle
+import time
+import yaml
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+from dataclasses import dataclass
+
+from instrumentation import get_profiler
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Bump when the cached document layout changes
+CACHE_VERSION = 2
+
+# Default cache directory (ignored by git)
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / ".cache" / "prompt_corpus"
+
+CACHE_ENV_VAR = "PROMPT_CORPUS_CACHE"
+CACHE_DISABLED_VALUES = {"", "0", "off", "false", "no"}
+
+
+@dataclass
+class CachedDocument:
+    """A parsed YAML document and the file fingerprint it was parsed from."""
+    mtime_ns: int
+    size: int
+    digest: str
+    data: Any
+
+
+def parse_yaml(text: str, name: str = "<string>") -> Any:
+    """Parse YAML text with the fastest available safe loader."""
+    stream = io.StringIO(text)
+    # Keep the file name in parser error messages, as yaml.safe_load(f) does
+    stream.name = name
+    profiler = get_profiler()
+    if not profiler.enabled:
+        return yaml.load(stream, Loader=SafeLoader)
+    start = time.perf_counter()
+    try:
+        return yaml.load(stream, Loader=SafeLoader)
+    finally:
+        profiler.observe('yaml_parse_seconds', time.perf_counter() - start)
+
+
+class PromptCorpus:
+    """Loads prompt YAML files once and remembers the parsed documents."""
+
+    def __init__(self, cache_path: Optional[Path] = DEFAULT_CACHE_PATH):
+        self.cache_path = Path(cache_path) if cache_path else None
+        # Directory -> {file path -> document}; a directory's shard is read on first use
+        self._shards: Dict[str, Dict[str, CachedDocument]] = {}
+        self._dirty: Set[str] = set()
+        # Documents stored since the last take_updates() (sent back by worker processes)
+        self._updates: Dict[str, CachedDocument] = {}
+
+        # Counters for diagnostics
+        self.parsed = 0
+        self.reused = 0
+
+    def _shard_path(self, directory: str) -> Path:
+        name = hashlib.blake2b(directory.encode('utf-8'), digest_size=8).hexdigest()
+        return self.cache_path / f"{name}.pickle"
+
+    def _shard(self, directory: str) -> Dict[str, CachedDocument]:
+        """Cached documents of one directory, read from disk the first time."""
+        shard = self._shards.get(directory)
+        if shard is not None:
+            return shard
+        shard = self._shards[directory] = {}
+        if not self.cache_path:
+            return shard
+        try:
+            with open(self._shard_path(directory), 'rb') as f:
+                version, shard_directory, documents = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, ValueError, TypeError, AttributeError):
+            return shard
+        if version == CACHE_VERSION and shard_directory == directory:
+            shard.update(documents)
+        return shard
+
+    def preload(self, file_paths: Iterable[Path]) -> None:
+        """Read the cache shards of the given files' directories now (e.g. before forking workers)."""
+        for directory in {os.path.dirname(os.path.abspath(file_path)) for file_path in file_paths}:
+            self._shard(directory)
+
+    def load(self, file_path: Path, remember: bool = True) -> Any:
+        """
+        Return the parsed YAML document for a file.
+
+        With ``remember=False`` a freshly parsed document is not kept, so
+        single-pass consumers stay at flat memory (cached documents are
+        still reused).
+
+        Raises the same exceptions as opening and parsing the file directly
+        (OSError, UnicodeDecodeError, yaml.YAMLError).
+        """
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        directory = os.path.dirname(key)
+        shard = self._shard(directory)
+        cached = shard.get(key)
+
+        if cached and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+            self.reused += 1
+            return cached.data
+
+        with open(key, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+        if cached and cached.digest == digest:
+            data = cached.data
+            self.reused += 1
+        else:
+            data = parse_yaml(raw.decode('utf-8'), str(file_path))
+            self.parsed += 1
+            if not remember:
+                return data
+
+        shard[key] = self._updates[key] = CachedDocument(stat.st_mtime_ns, stat.st_size, digest, data)
+        self._dirty.add(directory)
+        return data
+
+    def take_updates(self) -> Dict[str, CachedDocument]:
+        """Return and forget the documents stored since the last call."""
+        updates, self._updates = self._updates, {}
+        return updates
+
+    def merge(self, updates: Dict[str, CachedDocument]) -> None:
+        """Store documents parsed by another process (see take_updates())."""
+        for key, document in updates.items():
+            directory = os.path.dirname(key)
+            self._shard(directory)[key] = document
+            self._dirty.add(directory)
+
+    def save(self) -> None:
+        """Write the cache shards that changed to disk."""
+        if not self.cache_path or not self._dirty:
+            return
+
+        try:
+            self.cache_path.mkdir(parents=True, exist_ok=True)
+            for directory in sorted(self._dirty):
+                # One listing per shard drops entries for deleted files
+                try:
+                    present = set(os.listdir(directory))
+                except OSError:
+                    present = set()
+                documents = {key: doc for key, doc in self._shards[directory].items()
+                             if os.path.basename(key) in present}
+
+                shard_path = self._shard_path(directory)
+                tmp_path = shard_path.with_name(f"{shard_path.name}.{os.getpid()}.tmp")
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump((CACHE_VERSION, directory, documents), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, shard_path)
+            self._dirty.clear()
+        except OSError:
+            # The cache is an optimization; never fail a run because of it
+            pass
+
+
+_corpus: Optional[PromptCorpus] = None
+
+
+def cache_path_from_env() -> Optional[Path]:
+    """Resolve the cache location, honoring PROMPT_CORPUS_CACHE."""
+    value = os.environ.get(CACHE_ENV_VAR)
+    if value is None:
+        return DEFAULT_CACHE_PATH
+    if value.strip().lower() in CACHE_DISABLED_VALUES:
+        return None
+    return Path(value)
+
+
+def get_corpus(persist: bool = True) -> PromptCorpus:
+    """
+    Return the process-wide corpus.
+
+    With ``persist`` the corpus is saved to disk when the process exits.
+    Worker processes pass ``persist=False`` so only the parent writes the
+    cache file.
+    """
+    global _corpus
+    if _corpus is None:
+        _corpus = PromptCorpus(cache_path_from_env())
+        if persist:
+            atexit.register(_corpus.save)
+    return _corpus
+
+
+def reset_corpus() -> None:
+    """
+    Save and forget the process-wide corpus.
+
+    The next load starts cold, as in a fresh process; used by benchmarks
+    that time several scripts in one interpreter.
+    """
+    global _corpus
+    if _corpus is not None:
+        _corpus.save()
+        atexit.unregister(_corpus.save)
+        _corpus = None
+
+
+def load_document(file_path: Path, remember: bool = True) -> Any:
+    """Load a prompt YAML file through the shared corpus."""
+    return get_corpus().load(file_path, remember=remember)
+
+
+def read_document(file_path: Path) -> Any:
+    """
+    Parse a prompt YAML file without remembering it.
+
+    For streaming consumers that visit each file once and must keep memory
+    flat; raises the same exceptions as load_document().
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return parse_yaml(f.read(), str(file_path))
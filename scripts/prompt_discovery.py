@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Prompt Discovery - Shared Prompt File Walking for All Scripts
+
+Single place that decides which files under prompts/ are prompt files.
+Every script finds its input through this module, so validation, indexing,
+ranking, link checking and the search/query indexes all see the same set
+of files in the same order.
+
+Rules:
+    - Files ending in .yaml or .yml
+    - Hidden files and directories (leading '.') are skipped, as are editor
+      backups and lock files (trailing '~', leading '#'), so temp files of
+      an in-progress write are never picked up
+    - --exclude GLOB patterns are matched against the path below the prompts
+      root, e.g. --exclude 'experimental/*' --exclude '*-draft.yaml', whether
+      the walk starts at prompts/, at prompts/experimental or at one file
+    - The prompts root is the nearest directory named `prompts` containing
+      the walked path (or the path itself); outside one, the walked
+      directory (or a file's directory) is the root
+    - A file passed directly goes through the same rules as a walked one
+
+Walking:
+    os.scandir(), keeping the stat result of each file, depth-first in name
+    order (the same order as sorted() of the paths). Top-level directories
+    (the categories) are listed concurrently by a thread pool and yielded in
+    order as each finishes, so a consumer starts on the first category while
+    later ones are still being listed.
+
+    With --git-files the file list comes from `git ls-files` (tracked files
+    plus untracked files that are not ignored) instead of a directory walk;
+    outside a git work tree the walk is used.
+
+Usage in scripts:
+    from prompt_discovery import add_discovery_arguments, discovery_from_args, find_prompt_files
+
+    add_discovery_arguments(parser)          # --exclude, --git-files
+    discovery_from_args(args)                # after parse_args()
+    for file_path in find_prompt_files(prompts_dir):
+        ...
+"""
+
+import os
+import subprocess
+from fnmatch import fnmatchcase
+from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+PROMPT_SUFFIXES = ('.yaml', '.yml')
+
+# Threads listing top-level directories at the same time
+WALK_WORKERS = 8
+
+
+@dataclass
+class PromptFile:
+    """A discovered prompt file and the stat result taken while listing it."""
+    path: Path
+    # Directory directly containing the file when that is a top-level directory
+    category: Optional[str]
+    stat: os.stat_result
+
+
+@dataclass
+class DiscoveryRules:
+    """Which files count as prompt files and how to list them."""
+    suffixes: Tuple[str, ...] = PROMPT_SUFFIXES
+    exclude: Tuple[str, ...] = ()
+    use_git: bool = False
+
+    def skips_name(self, name: str) -> bool:
+        """Hidden, backup and lock files or directories."""
+        return name.startswith(('.', '#')) or name.endswith('~')
+
+    def accepts(self, relative: str) -> bool:
+        """Whether a file, given by its '/'-separated path below the prompts root, is a prompt file."""
+        parts = relative.split('/')
+        if not parts[-1].endswith(self.suffixes) or any(self.skips_name(part) for part in parts):
+            return False
+        return not any(fnmatchcase(relative, pattern) for pattern in self.exclude)
+
+    def accepts_path(self, path: Path) -> bool:
+        """Whether a file, given by its filesystem path, is a prompt file."""
+        return self.accepts(relative_to_root(path))
+
+
+_rules = DiscoveryRules()
+
+
+def get_rules() -> DiscoveryRules:
+    """Return the process-wide discovery rules."""
+    return _rules
+
+
+def configure_discovery(exclude: Tuple[str, ...] = (), use_git: bool = False) -> DiscoveryRules:
+    """Replace the process-wide discovery rules."""
+    global _rules
+    _rules = DiscoveryRules(exclude=tuple(exclude), use_git=use_git)
+    return _rules
+
+
+def add_discovery_arguments(parser) -> None:
+    """Add the shared prompt discovery options to a script's argument parser."""
+    group = parser.add_argument_group('discovery')
+    group.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                       help="Skip prompt files whose path below the prompt directory matches GLOB (repeatable)")
+    group.add_argument('--git-files', action='store_true',
+                       help="List prompt files with `git ls-files` instead of walking the directory")
+
+
+def discovery_from_args(args) -> DiscoveryRules:
+    """Configure the process-wide discovery rules from parsed options."""
+    return configure_discovery(tuple(args.exclude), args.git_files)
+
+
+def prompts_root(path: Path) -> Path:
+    """The prompts root a file or directory belongs to (see the module docstring)."""
+    path = Path(os.path.abspath(path))
+    for candidate in (path, *path.parents):
+        if candidate.name == 'prompts':
+            return candidate
+    return path if path.is_dir() else path.parent
+
+
+def relative_to_root(path: Path) -> str:
+    """'/'-separated path below its prompts root ('' for the root itself)."""
+    path = Path(os.path.abspath(path))
+    relative = path.relative_to(prompts_root(path)).as_posix()
+    return '' if relative == '.' else relative
+
+
+def _join(prefix: str, relative: str) -> str:
+    return f"{prefix}/{relative}" if prefix else relative
+
+
+def category_of(relative: str) -> Optional[str]:
+    """Category of a file from its path below the root (None unless it sits directly in one)."""
+    parts = relative.split('/')
+    return parts[0] if len(parts) == 2 else None
+
+
+def _scan_tree(root: str, relative: str, rules: DiscoveryRules, prefix: str = '') -> List[PromptFile]:
+    """
+    Prompt files below root/relative, depth-first in name order.
+
+    ``prefix`` is root's own path below the prompts root, which the rules see.
+    """
+    directory = os.path.join(root, relative) if relative else root
+    try:
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+    found = []
+    for entry in entries:
+        if rules.skips_name(entry.name):
+            continue
+        entry_relative = f"{relative}/{entry.name}" if relative else entry.name
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                found.extend(_scan_tree(root, entry_relative, rules, prefix))
+            elif rules.accepts(_join(prefix, entry_relative)) and entry.is_file():
+                found.append(PromptFile(Path(entry.path), category_of(entry_relative), entry.stat()))
+        except OSError:
+            continue  # Removed while listing
+    return found
+
+
+def _git_files(root: Path, rules: DiscoveryRules, prefix: str = '') -> Optional[List[str]]:
+    """Prompt files below root according to git, or None outside a work tree."""
+    try:
+        result = subprocess.run(
+            ['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard', '--', '.'],
+            cwd=root, capture_output=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    names = {os.fsdecode(name) for name in result.stdout.split(b'\0') if name}
+    return sorted((name for name in names if rules.accepts(_join(prefix, name))), key=lambda name: name.split('/'))
+
+
+def iter_prompt_files(root: Path, rules: Optional[DiscoveryRules] = None,
+                      workers: int = WALK_WORKERS) -> Iterator[PromptFile]:
+    """
+    Yield the prompt files below root (or root itself if it is a prompt file).
+
+    Files come in sorted path order; see the module docstring for the rules.
+    Uses the process-wide rules unless ``rules`` is given.
+    """
+    rules = rules or get_rules()
+    root = Path(root)
+
+    if root.is_file():
+        if rules.accepts_path(root):
+            yield PromptFile(root, None, root.stat())
+        return
+    if not root.is_dir():
+        return
+    prefix = relative_to_root(root)
+
+    if rules.use_git:
+        names = _git_files(root, rules, prefix)
+        if names is not None:
+            for name in names:
+                path = root / name
+                try:
+                    yield PromptFile(path, category_of(name), path.stat())
+                except OSError:
+                    continue  # Deleted in the work tree
+            return
+
+    top = _scan_top(root, rules, prefix)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # Each top-level directory is listed by a worker; files at the top come through directly
+        pending = [executor.submit(_scan_tree, str(root), name, rules, prefix) if is_dir else prompt_file
+                   for name, is_dir, prompt_file in top]
+        for item in pending:
+            if isinstance(item, PromptFile):
+                yield item
+            else:
+                yield from item.result()
+
+
+def _scan_top(root: Path, rules: DiscoveryRules, prefix: str = '') -> List[Tuple[str, bool, Optional[PromptFile]]]:
+    """(name, is_dir, prompt file) for the entries directly in root, in name order."""
+    top = []
+    with os.scandir(root) as iterator:
+        for entry in sorted(iterator, key=lambda entry: entry.name):
+            if rules.skips_name(entry.name):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    top.append((entry.name, True, None))
+                elif rules.accepts(_join(prefix, entry.name)) and entry.is_file():
+                    top.append((entry.name, False, PromptFile(Path(entry.path), None, entry.stat())))
+            except OSError:
+                continue
+    return top
+
+
+def find_prompt_files(root: Path, rules: Optional[DiscoveryRules] = None) -> List[Path]:
+    """Paths of every prompt file below root, sorted."""
+    return [prompt_file.path for prompt_file in iter_prompt_files(root, rules)]
+
+
+def iter_categories(root: Path, rules: Optional[DiscoveryRules] = None) -> Iterator[Tuple[str, List[PromptFile]]]:
+    """
+    Yield (category, prompt files directly in it) for every top-level directory, in name order.
+
+    Directories without prompt files are yielded with an empty list.
+    """
+    rules = rules or get_rules()
+    root = Path(root)
+    categories = [name for name, is_dir, _ in _scan_top(root, rules, relative_to_root(root)) if is_dir]
+
+    index = 0
+    current, files = None, []
+    for prompt_file in iter_prompt_files(root, rules):
+        category = prompt_file.category
+        if category is None:
+            continue
+        if category != current:
+            if current is not None:
+                yield current, files
+            if category in categories[index:]:
+                # Directories before this one had no prompt files
+                while categories[index] != category:
+                    yield categories[index], []
+                    index += 1
+                index += 1
+            current, files = category, []
+        files.append(prompt_file)
+
+    if current is not None:
+        yield current, files
+    for category in categories[index:]:
+        yield category, []
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Query Prompts - Faceted Filtering over Prompt Metadata
+
+Answers compound questions such as "hyperrealism prompts tagged golden-hour
+with an 85mm lens and completion_rate > 60" from a precomputed facet index
+instead of a one-off loop over every YAML file.
+
+Usage:
+    python scripts/query_prompts.py --category hyperrealism --tag golden-hour
+    python scripts/query_prompts.py --lens 85mm --where "completion_rate>60"
+    python scripts/query_prompts.py --tag noir,neon --material water   # noir OR neon, AND water
+    python scripts/query_prompts.py --counts tag,lens --limit 0         # facet counts only
+
+Filters:
+    Repeating an option ANDs the filters; comma-separated values within one
+    option are ORed. Facet values are matched case-insensitively.
+
+    Facets:   category, tag, lens (camera.lens), material (physics.materials),
+              sora_version, nsfw, author
+    Metrics:  retention_3s, retention_5s, completion_rate, replays
+              (--where "<metric><op><number>", op one of > >= < <= =)
+
+Index:
+    .cache/facet_index.pickle holds one record per prompt, a bitmap (a
+    Python int used as a bitset) per facet value, and a sorted column per
+    performance metric. Filters are bitmap intersections, range filters are
+    binary searches, and facet counts are popcounts. Only files whose mtime
+    or size changed are parsed when the index is refreshed.
+"""
+
+import os
+import re
+import sys
+import pickle
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+
+from prompt_corpus import load_document
+from prompt_discovery import add_discovery_arguments, discovery_from_args, find_prompt_files
+
+# Default index location (ignored by git)
+DEFAULT_INDEX_PATH = Path(__file__).parent.parent / ".cache" / "facet_index.pickle"
+
+# Bump when the record layout or facet extraction changes
+INDEX_VERSION = 1
+
+# Facet name -> path into the prompt document
+FACETS = {
+    'category': ('category',),
+    'tag': ('tags',),
+    'lens': ('camera', 'lens'),
+    'material': ('physics', 'materials'),
+    'sora_version': ('sora_version',),
+    'nsfw': ('nsfw',),
+    'author': ('author',),
+}
+
+METRICS = ('retention_3s', 'retention_5s', 'completion_rate', 'replays')
+
+WHERE_PATTERN = re.compile(r"^\s*(\w+)\s*(>=|<=|==|=|>|<)\s*(-?[\d.]+)\s*$")
+
+
+def facet_value(value) -> str:
+    """Normalize a facet value for indexing and matching."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value).strip().lower()
+
+
+def extract_facets(prompt_data: Dict) -> Dict[str, Tuple[str, ...]]:
+    """Collect the facet values of one prompt document."""
+    facets = {}
+    for facet, keys in FACETS.items():
+        value = prompt_data
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is None:
+            continue
+        values = value if isinstance(value, list) else [value]
+        facets[facet] = tuple(dict.fromkeys(facet_value(item) for item in values if item is not None))
+    return facets
+
+
+def extract_metrics(prompt_data: Dict) -> Dict[str, float]:
+    """Collect the numeric performance metrics of one prompt document."""
+    performance = prompt_data.get('performance') or {}
+    metrics = {}
+    for metric in METRICS:
+        value = performance.get(metric) if isinstance(performance, dict) else None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[metric] = float(value)
+    return metrics
+
+
+def rows_to_bitmap(rows: Iterable[int]) -> int:
+    """Pack row numbers into an int bitset."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    bits = bytearray(max(rows) // 8 + 1)
+    for row in rows:
+        bits[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitmap_rows(bitmap: int) -> Iterator[int]:
+    """Yield the row numbers set in a bitset, in ascending order."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    for index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield index * 8 + low.bit_length() - 1
+            byte ^= low
+
+
+@dataclass
+class PromptRecord:
+    """Indexed metadata of one prompt file."""
+    path: str
+    mtime_ns: int
+    size: int
+    title: str
+    facets: Dict[str, Tuple[str, ...]]
+    metrics: Dict[str, float]
+
+
+@dataclass
+class QueryResult:
+    """Rows matching a query, with helpers for listing and facet counts."""
+    index: 'FacetIndex'
+    bitmap: int
+
+    @property
+    def count(self) -> int:
+        return self.bitmap.bit_count()
+
+    def records(self, limit: Optional[int] = None) -> List[PromptRecord]:
+        """Matching records in path order."""
+        matches = []
+        for row in bitmap_rows(self.bitmap):
+            if limit is not None and len(matches) >= limit:
+                break
+            matches.append(self.index.records[row])
+        return matches
+
+    def facet_counts(self, facet: str) -> Dict[str, int]:
+        """Number of matching prompts per value of a facet, most common first."""
+        counts = {
+            value: (bitmap & self.bitmap).bit_count()
+            for value, bitmap in self.index.bitmaps.get(facet, {}).items()
+        }
+        return dict(sorted(((value, count) for value, count in counts.items() if count),
+                           key=lambda item: (-item[1], item[0])))
+
+
+@dataclass
+class MetricColumn:
+    """A performance metric sorted by value, with the row of each value."""
+    values: array = field(default_factory=lambda: array('d'))
+    rows: array = field(default_factory=lambda: array('q'))
+
+    def select(self, op: str, threshold: float) -> int:
+        """Bitmap of rows whose value satisfies ``value <op> threshold``."""
+        if op == '>':
+            start, end = bisect_right(self.values, threshold), len(self.values)
+        elif op == '>=':
+            start, end = bisect_left(self.values, threshold), len(self.values)
+        elif op == '<':
+            start, end = 0, bisect_left(self.values, threshold)
+        elif op == '<=':
+            start, end = 0, bisect_right(self.values, threshold)
+        else:
+            start, end = bisect_left(self.values, threshold), bisect_right(self.values, threshold)
+        return rows_to_bitmap(self.rows[start:end])
+
+
+class FacetIndex:
+    """Persistent facet bitmaps and sorted metric columns over prompt files."""
+
+    def __init__(self, path: Optional[Path] = DEFAULT_INDEX_PATH):
+        self.path = Path(path) if path else None
+        self.records: List[PromptRecord] = []
+        self.bitmaps: Dict[str, Dict[str, int]] = {}
+        self.columns: Dict[str, MetricColumn] = {}
+        self.all_rows = 0
+        self._dirty = False
+
+        if self.path:
+            self._read()
+
+    def _read(self) -> None:
+        try:
+            with open(self.path, 'rb') as f:
+                version, records, bitmaps, columns = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, ValueError, TypeError, AttributeError):
+            return
+        if version != INDEX_VERSION:
+            return
+        # Stored as plain tuples so the file loads no matter which module imports this one
+        self.records = [PromptRecord(*fields) for fields in records]
+        self.bitmaps = bitmaps
+        self.columns = {metric: MetricColumn(values, rows) for metric, (values, rows) in columns.items()}
+        self.all_rows = rows_to_bitmap(range(len(self.records)))
+
+    def update(self, prompt_files: Iterable[Path]) -> Dict[str, int]:
+        """
+        Re-index new and modified files and drop deleted ones.
+
+        Returns counts of indexed, unchanged and removed prompts.
+        """
+        # Rebuild rows in path order so listings stay sorted
+        previous = {record.path: record for record in self.records}
+        counts = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+        records = []
+
+        for file_path in sorted(prompt_files):
+            key = os.path.abspath(file_path)
+            try:
+                stat = os.stat(key)
+            except OSError:
+                continue
+
+            record = previous.pop(key, None)
+            if record and (record.mtime_ns, record.size) == (stat.st_mtime_ns, stat.st_size):
+                records.append(record)
+                counts['unchanged'] += 1
+                continue
+
+            try:
+                prompt_data = load_document(file_path, remember=False)
+            except Exception as e:
+                print(f"⚠️  Error loading {file_path}: {e}", file=sys.stderr)
+                continue
+            if not isinstance(prompt_data, dict):
+                continue
+
+            records.append(PromptRecord(
+                path=key,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                title=str(prompt_data.get('title', 'Untitled')),
+                facets=extract_facets(prompt_data),
+                metrics=extract_metrics(prompt_data),
+            ))
+            counts['indexed'] += 1
+
+        counts['removed'] = len(previous)
+        if counts['indexed'] or counts['removed']:
+            self.records = records
+            self._rebuild()
+        return counts
+
+    def _rebuild(self) -> None:
+        """Recompute bitmaps and metric columns from the records."""
+        members: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        metric_values: Dict[str, List[Tuple[float, int]]] = {metric: [] for metric in METRICS}
+
+        for row, record in enumerate(self.records):
+            for facet, values in record.facets.items():
+                for value in values:
+                    members[facet].setdefault(value, []).append(row)
+            for metric, value in record.metrics.items():
+                metric_values[metric].append((value, row))
+
+        self.bitmaps = {
+            facet: {value: rows_to_bitmap(rows) for value, rows in values.items()}
+            for facet, values in members.items()
+        }
+        self.columns = {}
+        for metric, pairs in metric_values.items():
+            pairs.sort()
+            self.columns[metric] = MetricColumn(array('d', (value for value, _ in pairs)),
+                                                array('q', (row for _, row in pairs)))
+        self.all_rows = rows_to_bitmap(range(len(self.records)))
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the index to disk if it changed."""
+        if not self.path or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            records = [(record.path, record.mtime_ns, record.size, record.title, record.facets, record.metrics)
+                       for record in self.records]
+            columns = {metric: (column.values, column.rows) for metric, column in self.columns.items()}
+            pickle.dump((INDEX_VERSION, records, self.bitmaps, columns), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def facet_bitmap(self, facet: str, values: Sequence[str]) -> int:
+        """Rows having any of the given values for a facet."""
+        if facet not in FACETS:
+            raise ValueError(f"Unknown facet '{facet}'. Choose from: {', '.join(FACETS)}")
+        bitmap = 0
+        for value in values:
+            bitmap |= self.bitmaps.get(facet, {}).get(facet_value(value), 0)
+        return bitmap
+
+    def metric_bitmap(self, metric: str, op: str, threshold: float) -> int:
+        """Rows whose metric satisfies the comparison (rows without it never match)."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Choose from: {', '.join(METRICS)}")
+        column = self.columns.get(metric)
+        return column.select(op, threshold) if column else 0
+
+    def query(self, filters: Optional[Dict[str, Sequence[Sequence[str]]]] = None,
+              where: Sequence[Tuple[str, str, float]] = ()) -> QueryResult:
+        """
+        Intersect facet and metric filters.
+
+        ``filters`` maps a facet to a list of value groups; each group
+        matches any of its values and all groups must match. ``where`` is a
+        list of (metric, op, threshold) comparisons.
+        """
+        bitmap = self.all_rows
+        for facet, groups in (filters or {}).items():
+            for values in groups:
+                bitmap &= self.facet_bitmap(facet, values)
+        for metric, op, threshold in where:
+            bitmap &= self.metric_bitmap(metric, op, threshold)
+        return QueryResult(self, bitmap)
+
+
+def parse_where(expression: str) -> Tuple[str, str, float]:
+    """Parse a "metric<op>number" expression."""
+    match = WHERE_PATTERN.match(expression)
+    if not match:
+        raise argparse.ArgumentTypeError(
+            f"invalid --where '{expression}' (expected e.g. completion_rate>60)")
+    metric, op, number = match.groups()
+    if metric not in METRICS:
+        raise argparse.ArgumentTypeError(f"unknown metric '{metric}'. Choose from: {', '.join(METRICS)}")
+    return metric, '=' if op == '==' else op, float(number)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Faceted queries over prompt metadata.")
+    for facet in FACETS:
+        parser.add_argument(f"--{facet.replace('_', '-')}", dest=facet, action='append', default=[],
+                            metavar='VALUE[,VALUE]', help=f"Filter on {facet}")
+    parser.add_argument('--where', action='append', type=parse_where, default=[],
+                        metavar='METRIC<OP>N', help="Numeric filter, e.g. completion_rate>60")
+    parser.add_argument('--counts', default='category,tag',
+                        help="Comma-separated facets to count (default: category,tag)")
+    parser.add_argument('--limit', '-n', type=int, default=20, help="Maximum prompts listed (default: 20)")
+    parser.add_argument('--prompts', type=Path, default=Path(__file__).parent.parent / "prompts",
+                        help="Prompt directory to index (default: prompts/)")
+    parser.add_argument('--index', type=Path, default=DEFAULT_INDEX_PATH,
+                        help=f"Facet index location (default: {DEFAULT_INDEX_PATH})")
+    parser.add_argument('--no-update', action='store_true',
+                        help="Query the index as-is without checking for changed files")
+    add_discovery_arguments(parser)
+    args = parser.parse_args(argv)
+
+    args.filters = {
+        facet: [[value for value in option.split(',') if value.strip()] for option in getattr(args, facet)]
+        for facet in FACETS if getattr(args, facet)
+    }
+    args.count_facets = [facet.strip() for facet in args.counts.split(',') if facet.strip()]
+    unknown = [facet for facet in args.count_facets if facet not in FACETS]
+    if unknown:
+        parser.error(f"unknown facet(s) in --counts: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    discovery_from_args(args)
+    index = FacetIndex(args.index)
+
+    if not args.no_update:
+        if not args.prompts.exists():
+            print(f"❌ Prompts directory not found: {args.prompts}", file=sys.stderr)
+            sys.exit(1)
+        index.update(find_prompt_files(args.prompts))
+        try:
+            index.save()
+        except OSError as e:
+            print(f"⚠️  Could not save facet index: {e}", file=sys.stderr)
+
+    result = index.query(args.filters, args.where)
+    print(f"🔎 {result.count} of {index.all_rows.bit_count()} prompts match\n")
+
+    project_root = args.prompts.resolve().parent
+    records = result.records(args.limit)
+    for record in records:
+        path = Path(record.path)
+        try:
+            path = path.relative_to(project_root)
+        except ValueError:
+            pass
+        category = ', '.join(record.facets.get('category', ())) or 'unknown'
+        print(f"  - {record.title} ({category}) — {path}")
+    if records:
+        print()
+
+    for facet in args.count_facets:
+        counts = result.facet_counts(facet)
+        if not counts:
+            continue
+        print(f"{facet.upper()}:")
+        for value, count in list(counts.items())[:10]:
+            print(f"  {value}: {count}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
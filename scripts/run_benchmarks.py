@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Run Benchmarks - Performance Baselines for the Prompt Scripts
+
+Generates synthetic corpora with generate_corpus.py and times the hot paths
+of validation, index building, top-performer ranking and link checking, so
+slowdowns show up when results are compared between commits.
+
+Usage:
+    python scripts/run_benchmarks.py                        # 1k and 10k prompts, every suite
+    python scripts/run_benchmarks.py --sizes 1000,100000 --suites validate,build_index
+    python scripts/run_benchmarks.py --jobs 1,2,4,8,16      # validation speedup per worker count
+    python scripts/run_benchmarks.py --compare .cache/benchmarks/abc1234.json
+
+Suites:
+    validate        PromptValidator.validate_directory(), once per --jobs value,
+                    with speedup over --jobs 1 and parallel efficiency
+                    (speedup / jobs); jobs=1 is always run as the baseline
+    build_index     build_index.main() cold (--force) and warm (nothing changed)
+    top_performers  analyze_performance() + calculate_top_performers()
+    check_links     check_prompt_links() against a local stub HTTP server
+                    (--link-latency adds a delay per response)
+
+Results:
+    Written as JSON to .cache/benchmarks/<commit>.json (or --output) with
+    the commit, Python version, CPU count and, per suite/case/size, the best
+    wall time of --repeat runs and files per second. --compare prints the
+    change against an earlier results file and exits 1 if any case got
+    slower by more than --tolerance.
+
+The parsed-YAML cache is disabled and the in-process corpus is reset before
+every timed run, so each run parses every file.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import threading
+import contextlib
+import subprocess
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Measure real parsing work, not cache hits
+os.environ["PROMPT_CORPUS_CACHE"] = "off"
+
+import build_index
+import check_links
+from prompt_corpus import reset_corpus
+from prompt_discovery import find_prompt_files
+from generate_corpus import write_corpus
+from validate_prompts import PromptValidator
+from identify_top_performers import analyze_performance, calculate_top_performers
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULT_RESULTS_DIR = PROJECT_ROOT / ".cache" / "benchmarks"
+
+SUITES = ('validate', 'build_index', 'top_performers', 'check_links')
+
+RESULTS_VERSION = 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every request with an empty 200, after an optional delay."""
+
+    latency = 0.0
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._respond()
+
+    def do_GET(self):
+        self._respond()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def stub_server(latency: float = 0.0):
+    """Run the stub link server on a free local port; yields its base URL."""
+    handler = type('Handler', (StubHandler,), {'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def time_run(func: Callable[[], None], repeat: int = 1) -> float:
+    """Best wall time of ``repeat`` quiet runs, each starting from a cold corpus."""
+    best = None
+    for _ in range(max(1, repeat)):
+        reset_corpus()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def git_commit() -> str:
+    """Short hash of HEAD, marked when the tree has local changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{commit}-dirty" if dirty else commit
+
+
+def run_size(size: int, suites: List[str], jobs: List[int], repeat: int,
+             link_latency: float, seed: int) -> List[Dict]:
+    """Generate one corpus and run the selected suites against it."""
+    results = []
+
+    def record(suite: str, case: str, seconds: float, workers: Optional[int] = None,
+               baseline: Optional[float] = None) -> None:
+        speedup = baseline / seconds if baseline and seconds else None
+        efficiency = speedup / workers if speedup and workers else None
+        results.append({
+            'suite': suite,
+            'case': case,
+            'size': size,
+            'seconds': round(seconds, 4),
+            'files_per_second': round(size / seconds, 1) if seconds else None,
+            'speedup': round(speedup, 3) if speedup else None,
+            'efficiency': round(efficiency, 3) if efficiency else None,
+        })
+        scaling = f" {speedup:>7.2f}x {efficiency:>10.0%}" if speedup else ""
+        print(f"{suite:>15} {case:>10} {size:>9} {seconds:>10.3f} {size / seconds if seconds else 0:>10.0f}{scaling}",
+              flush=True)
+
+    workdir = Path(tempfile.mkdtemp(prefix="sora-bench-"))
+    try:
+        with stub_server(link_latency) as base_url:
+            prompts_dir = write_corpus(workdir, size, seed=seed, demo_base=f"{base_url}/v/")
+            prompt_files = find_prompt_files(prompts_dir)
+
+            if 'validate' in suites:
+                validator = PromptValidator(PROJECT_ROOT / "prompt.schema.json")
+                # Warm up lazy imports and regex compilation outside the timed runs
+                list(validator.validate_files(prompt_files[:200]))
+                baseline = None
+                for job_count in [1] + [job_count for job_count in jobs if job_count != 1]:
+                    seconds = time_run(lambda: validator.validate_directory(prompts_dir, jobs=job_count), repeat)
+                    baseline = baseline or seconds
+                    record('validate', f"jobs={job_count}", seconds, job_count, baseline)
+
+            if 'build_index' in suites:
+                state_path = workdir / "build_index_state.json"
+                argv = ['--prompts', str(prompts_dir), '--state', str(state_path)]
+                record('build_index', 'cold', time_run(lambda: build_index.main(argv + ['--force']), repeat))
+                record('build_index', 'warm', time_run(lambda: build_index.main(argv), repeat))
+
+            if 'top_performers' in suites:
+                record('top_performers', 'full', time_run(
+                    lambda: calculate_top_performers(analyze_performance(prompts_dir)), repeat))
+
+            if 'check_links' in suites:
+                record('check_links', 'stub', time_run(
+                    lambda: check_links.check_prompt_links(prompt_files, cache=None), repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return results
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float) -> bool:
+    """Print per-case changes against a baseline; returns True if any case regressed."""
+    previous = {(r['suite'], r['case'], r['size']): r for r in baseline.get('results', [])}
+    regressed = False
+
+    print(f"\n📈 Compared with {baseline.get('commit', 'unknown')}:\n")
+    print(f"{'suite':>15} {'case':>10} {'size':>9} {'before':>10} {'after':>10} {'change':>8}")
+    for result in current['results']:
+        before = previous.get((result['suite'], result['case'], result['size']))
+        if not before:
+            continue
+        change = (result['seconds'] - before['seconds']) / before['seconds'] if before['seconds'] else 0.0
+        marker = ''
+        if change > tolerance:
+            marker = ' ⚠️'
+            regressed = True
+        print(f"{result['suite']:>15} {result['case']:>10} {result['size']:>9} "
+              f"{before['seconds']:>10.3f} {result['seconds']:>10.3f} {change:>+7.1%}{marker}")
+    return regressed
+
+
+def parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the prompt scripts on synthetic corpora.")
+    parser.add_argument('--sizes', default="1000,10000",
+                        help="Comma-separated corpus sizes (default: 1000,10000)")
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help=f"Comma-separated suites (default: {','.join(SUITES)})")
+    parser.add_argument('--jobs', default="1,2,4,8",
+                        help="Worker counts for the validate suite; 1 is always included (default: 1,2,4,8)")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per case; the best is kept (default: 1)")
+    parser.add_argument('--link-latency', type=float, default=0.0,
+                        help="Stub server delay per response in seconds (default: 0)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus generator seed (default: 0)")
+    parser.add_argument('--output', type=Path, help="Results file (default: .cache/benchmarks/<commit>.json)")
+    parser.add_argument('--compare', type=Path, help="Earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Slowdown that counts as a regression with --compare (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    args.sizes = [int(size) for size in parse_list(args.sizes)]
+    args.jobs = [int(job) for job in parse_list(args.jobs)]
+    args.suites = parse_list(args.suites)
+    unknown = [suite for suite in args.suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}. Choose from: {', '.join(SUITES)}")
+    return args
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    commit = git_commit()
+
+    print(f"⏱️  Benchmarking {commit} on {os.cpu_count()} CPUs (Python {platform.python_version()})\n")
+    print(f"{'suite':>15} {'case':>10} {'size':>9} {'seconds':>10} {'files/s':>10} {'speedup':>8} {'efficiency':>10}")
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args.suites, args.jobs, args.repeat, args.link_latency, args.seed))
+
+    report = {
+        'version': RESULTS_VERSION,
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'results': results,
+    }
+
+    output = args.output or DEFAULT_RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"\n💾 Saved results to: {output}")
+
+    if args.compare:
+        try:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"❌ Could not read {args.compare}: {e}", file=sys.stderr)
+            sys.exit(1)
+        if compare_results(report, baseline, args.tolerance):
+            print(f"\n⚠️  Some cases are more than {args.tolerance:.0%} slower")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
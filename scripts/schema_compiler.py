@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Schema Compiler - Specialized Python Validation Code for prompt.schema.json
+
+Translates the JSON schema into a plain Python function that answers one
+question - "is this document valid?" - with inline isinstance, len, regex
+and set checks, instead of walking the schema with Draft7Validator for
+every document. PromptValidator calls it first and only runs
+Draft7Validator (and _format_error) on documents it rejects, so error
+messages are unchanged.
+
+Usage:
+    python scripts/schema_compiler.py                # print the generated code
+    python scripts/schema_compiler.py --check prompts/
+
+    from schema_compiler import load_fast_validator
+    is_valid = load_fast_validator(schema, schema_hash)  # None if unsupported
+    if is_valid and is_valid(document): ...
+
+Supported keywords:
+    type, required, properties, additionalProperties, enum and const (of
+    strings), minLength, maxLength, pattern, items (one schema), minItems,
+    maxItems, uniqueItems, minimum, maximum, exclusiveMinimum,
+    exclusiveMaximum, if/then/else. Annotations (description, error_msg,
+    default, ...) and format (not asserted by Draft7Validator without a
+    format checker) are ignored. Any other keyword makes compilation fail,
+    and validation falls back to Draft7Validator for every document.
+
+The generated check may reject a valid document (the fallback then accepts
+it), but never accepts an invalid one.
+
+Cache:
+    .cache/schema_validator/<schema hash>.py, regenerated whenever the schema
+    hash or COMPILER_VERSION changes.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".cache" / "schema_validator"
+
+# Bump when the generated code changes for the same schema
+COMPILER_VERSION = 1
+
+FUNCTION_NAME = "is_valid"
+
+# Keywords that never affect whether a document is valid
+ANNOTATIONS = {
+    '$schema', '$id', '$comment', 'title', 'description', 'default', 'examples',
+    'error_msg', 'constitution_ref', 'format',
+}
+
+TYPE_CHECKS = {
+    'string': "isinstance({v}, str)",
+    'object': "isinstance({v}, dict)",
+    'array': "isinstance({v}, list)",
+    'boolean': "isinstance({v}, bool)",
+    'null': "{v} is None",
+    'number': "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    # Draft 7 counts integral floats such as 3.0 as integers
+    'integer': "((isinstance({v}, int) and not isinstance({v}, bool)) "
+               "or (isinstance({v}, float) and {v}.is_integer()))",
+}
+
+# Keywords that only constrain instances of one type
+STRING_KEYWORDS = ('minLength', 'maxLength', 'pattern')
+ARRAY_KEYWORDS = ('items', 'minItems', 'maxItems', 'uniqueItems')
+OBJECT_KEYWORDS = ('required', 'properties', 'additionalProperties')
+NUMBER_KEYWORDS = ('minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum')
+
+
+class UnsupportedSchema(Exception):
+    """The schema uses a keyword the compiler cannot translate."""
+
+
+class SchemaCompiler:
+    """Generates the source of a validity-check function from a JSON schema."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self.constants: List[str] = []
+        self.helpers: List[List[str]] = []
+        self._names = 0
+        # Inside an ``if`` schema a check must be exact: a wrong "no" would skip ``then``
+        self._exact = False
+
+    def _name(self, prefix: str) -> str:
+        self._names += 1
+        return f"{prefix}{self._names}"
+
+    def _constant(self, prefix: str, expression: str) -> str:
+        name = self._name(prefix)
+        self.constants.append(f"{name} = {expression}")
+        return name
+
+    def compile(self) -> str:
+        """Return the module source defining ``is_valid(document)``."""
+        body = self._emit(self.schema, "doc", 1)
+        lines = [
+            f"# Generated by schema_compiler.py (version {COMPILER_VERSION}); do not edit",
+            "import re",
+            "",
+            *self.constants,
+            "",
+        ]
+        for helper in self.helpers:
+            lines.extend(helper)
+            lines.append("")
+        lines.append(f"def {FUNCTION_NAME}(doc):")
+        lines.extend(body)
+        lines.append("    return True")
+        return "\n".join(lines) + "\n"
+
+    def _emit(self, schema: Any, var: str, depth: int) -> List[str]:
+        """Statements that ``return False`` when ``var`` does not match ``schema``."""
+        if schema is True or schema == {}:
+            return []
+        if schema is False:
+            return ["    " * depth + "return False"]
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(f"schema must be an object or boolean, got {schema!r}")
+
+        unknown = set(schema) - ANNOTATIONS - {'type', 'enum', 'const', 'if', 'then', 'else'} \
+            - set(STRING_KEYWORDS) - set(ARRAY_KEYWORDS) - set(OBJECT_KEYWORDS) - set(NUMBER_KEYWORDS)
+        if unknown:
+            raise UnsupportedSchema(f"unsupported keyword(s): {', '.join(sorted(unknown))}")
+
+        pad = "    " * depth
+        lines: List[str] = []
+
+        known_type = None
+        if 'type' in schema:
+            types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+            if any(t not in TYPE_CHECKS for t in types):
+                raise UnsupportedSchema(f"unsupported type: {schema['type']!r}")
+            check = " or ".join(TYPE_CHECKS[t].format(v=var) for t in types)
+            lines.append(f"{pad}if not ({check}):")
+            lines.append(f"{pad}    return False")
+            if len(types) == 1:
+                known_type = types[0]
+
+        for keyword in ('enum', 'const'):
+            if keyword not in schema:
+                continue
+            values = schema[keyword] if keyword == 'enum' else [schema[keyword]]
+            if not all(isinstance(value, str) for value in values):
+                raise UnsupportedSchema(f"only string {keyword} values are supported")
+            name = self._constant("_ENUM", repr(frozenset(values)))
+            lines.append(f"{pad}if not (isinstance({var}, str) and {var} in {name}):")
+            lines.append(f"{pad}    return False")
+
+        lines.extend(self._typed_block(schema, var, depth, known_type, 'string', STRING_KEYWORDS, self._emit_string))
+        lines.extend(self._typed_block(schema, var, depth, known_type, 'number', NUMBER_KEYWORDS, self._emit_number))
+        lines.extend(self._typed_block(schema, var, depth, known_type, 'array', ARRAY_KEYWORDS, self._emit_array))
+        lines.extend(self._typed_block(schema, var, depth, known_type, 'object', OBJECT_KEYWORDS, self._emit_object))
+
+        if 'if' in schema and ('then' in schema or 'else' in schema):
+            helper = self._name("_if")
+            exact, self._exact = self._exact, True
+            try:
+                condition = self._emit(schema['if'], "doc", 1)
+            finally:
+                self._exact = exact
+            self.helpers.append([f"def {helper}(doc):", *condition, "    return True"])
+            then_lines = self._emit(schema.get('then', {}), var, depth + 1)
+            else_lines = self._emit(schema.get('else', {}), var, depth + 1)
+            if then_lines:
+                lines.append(f"{pad}if {helper}({var}):")
+                lines.extend(then_lines)
+                if else_lines:
+                    lines.append(f"{pad}else:")
+                    lines.extend(else_lines)
+            elif else_lines:
+                lines.append(f"{pad}if not {helper}({var}):")
+                lines.extend(else_lines)
+
+        return lines
+
+    def _typed_block(self, schema: Dict, var: str, depth: int, known_type: Optional[str], block_type: str,
+                     keywords: tuple, emit: Callable[[Dict, str, int], List[str]]) -> List[str]:
+        """Keyword checks that only apply to one instance type, guarded unless the type is known."""
+        if not any(keyword in schema for keyword in keywords):
+            return []
+        if known_type == block_type or (block_type == 'number' and known_type == 'integer'):
+            return emit(schema, var, depth)
+        if known_type is not None:
+            return []  # The type check already rejects other types
+        inner = emit(schema, var, depth + 1)
+        if not inner:
+            return []
+        guard = TYPE_CHECKS[block_type].format(v=var)
+        return ["    " * depth + f"if {guard}:", *inner]
+
+    def _emit_string(self, schema: Dict, var: str, depth: int) -> List[str]:
+        pad = "    " * depth
+        lines = []
+        # JSON Schema lengths count code points, which is what len() returns
+        if 'minLength' in schema:
+            lines += [f"{pad}if len({var}) < {int(schema['minLength'])}:", f"{pad}    return False"]
+        if 'maxLength' in schema:
+            lines += [f"{pad}if len({var}) > {int(schema['maxLength'])}:", f"{pad}    return False"]
+        if 'pattern' in schema:
+            name = self._constant("_PATTERN", f"re.compile({schema['pattern']!r})")
+            lines += [f"{pad}if {name}.search({var}) is None:", f"{pad}    return False"]
+        return lines
+
+    def _emit_number(self, schema: Dict, var: str, depth: int) -> List[str]:
+        pad = "    " * depth
+        lines = []
+        for keyword, operator in (('minimum', '<'), ('maximum', '>'),
+                                  ('exclusiveMinimum', '<='), ('exclusiveMaximum', '>=')):
+            if keyword in schema:
+                bound = schema[keyword]
+                if isinstance(bound, bool) or not isinstance(bound, (int, float)):
+                    raise UnsupportedSchema(f"{keyword} must be a number")
+                lines += [f"{pad}if {var} {operator} {bound!r}:", f"{pad}    return False"]
+        return lines
+
+    def _emit_array(self, schema: Dict, var: str, depth: int) -> List[str]:
+        pad = "    " * depth
+        lines = []
+        if 'minItems' in schema:
+            lines += [f"{pad}if len({var}) < {int(schema['minItems'])}:", f"{pad}    return False"]
+        if 'maxItems' in schema:
+            lines += [f"{pad}if len({var}) > {int(schema['maxItems'])}:", f"{pad}    return False"]
+        if 'items' in schema:
+            if not isinstance(schema['items'], (dict, bool)):
+                raise UnsupportedSchema("only a single 'items' schema is supported")
+            item = self._name("item")
+            inner = self._emit(schema['items'], item, depth + 1)
+            if inner:
+                lines.append(f"{pad}for {item} in {var}:")
+                lines.extend(inner)
+        if schema.get('uniqueItems'):
+            if self._exact:
+                raise UnsupportedSchema("uniqueItems is not supported inside 'if'")
+            # Only strings are compared by set(); anything else is left to the fallback
+            lines += [
+                f"{pad}if not all(isinstance(x, str) for x in {var}) or len(set({var})) != len({var}):",
+                f"{pad}    return False",
+            ]
+        return lines
+
+    def _emit_object(self, schema: Dict, var: str, depth: int) -> List[str]:
+        pad = "    " * depth
+        lines = []
+        for key in schema.get('required', []):
+            lines += [f"{pad}if {key!r} not in {var}:", f"{pad}    return False"]
+
+        properties = schema.get('properties', {})
+        additional = schema.get('additionalProperties', True)
+        if additional is False:
+            name = self._constant("_KEYS", repr(frozenset(properties)))
+            lines += [f"{pad}if not {name}.issuperset({var}):", f"{pad}    return False"]
+        elif additional is not True:
+            raise UnsupportedSchema("additionalProperties must be a boolean")
+
+        for key, subschema in properties.items():
+            value = self._name("value")
+            inner = self._emit(subschema, value, depth + 1)
+            if inner:
+                lines.append(f"{pad}if {key!r} in {var}:")
+                lines.append(f"{pad}    {value} = {var}[{key!r}]")
+                lines.extend(inner)
+        return lines
+
+
+def compile_schema(schema: Dict[str, Any]) -> str:
+    """Generated module source for a schema; raises UnsupportedSchema."""
+    return SchemaCompiler(schema).compile()
+
+
+def build_function(source: str, filename: str = "<compiled schema>") -> Callable[[Any], bool]:
+    """Execute generated source and return its check function."""
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, filename, 'exec'), namespace)
+    return namespace[FUNCTION_NAME]
+
+
+def load_fast_validator(schema: Dict[str, Any], schema_hash: str,
+                        cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> Optional[Callable[[Any], bool]]:
+    """
+    Return the compiled validity check for a schema, or None if it cannot be compiled.
+
+    Generated code is cached per schema hash and compiler version; a cache
+    that cannot be read or written is ignored.
+    """
+    cache_path = cache_dir / f"{schema_hash}-v{COMPILER_VERSION}.py" if cache_dir else None
+
+    if cache_path:
+        try:
+            source = cache_path.read_text(encoding='utf-8')
+            return build_function(source, str(cache_path))
+        except (OSError, SyntaxError, KeyError, NameError):
+            pass
+
+    try:
+        source = compile_schema(schema)
+    except UnsupportedSchema:
+        return None
+
+    if cache_path:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(source, encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return build_function(source, str(cache_path or "<compiled schema>"))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Compile prompt.schema.json into a Python validity check.")
+    parser.add_argument('--schema', type=Path, default=PROJECT_ROOT / "prompt.schema.json",
+                        help="Schema to compile (default: prompt.schema.json)")
+    parser.add_argument('--check', type=Path, metavar='DIR',
+                        help="Compare the compiled check with Draft7Validator on every YAML file in DIR")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+    with open(args.schema, 'rb') as f:
+        schema_bytes = f.read()
+    schema = json.loads(schema_bytes.decode('utf-8'))
+
+    try:
+        source = compile_schema(schema)
+    except UnsupportedSchema as e:
+        print(f"❌ Cannot compile {args.schema}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.check:
+        print(source, end='')
+        return
+
+    from jsonschema import Draft7Validator
+    from prompt_corpus import load_document
+    from prompt_discovery import find_prompt_files
+
+    is_valid = build_function(source)
+    validator = Draft7Validator(schema)
+    files = find_prompt_files(args.check)
+    mismatches = 0
+    for file_path in files:
+        try:
+            document = load_document(file_path, remember=False)
+        except Exception:
+            continue
+        fast, reference = is_valid(document), validator.is_valid(document)
+        if fast != reference:
+            mismatches += 1
+            print(f"{'⚠️ ' if fast else 'ℹ️ '} {file_path}: compiled={fast} draft7={reference}")
+
+    digest = hashlib.blake2b(schema_bytes, digest_size=16).hexdigest()
+    print(f"✓ Checked {len(files)} files against schema {digest[:12]} ({mismatches} mismatches)")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
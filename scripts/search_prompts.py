@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Search Prompts - Full-Text Search over the Prompt Library
+
+Maintains a persistent inverted index of every prompt and ranks matches
+with BM25, so finding a prompt no longer means browsing category READMEs
+or grepping YAML.
+
+Usage:
+    python scripts/search_prompts.py "golden hour desert"
+    python scripts/search_prompts.py "neon rain" --category cinematic --limit 5
+    python scripts/search_prompts.py --any "noir detective"       # match any term
+    python scripts/search_prompts.py --no-update "steam vapor"    # query index as-is
+    python scripts/search_prompts.py --rebuild "coffee"
+
+Indexed fields (BM25 weight):
+    title (3.0), tags (2.0), summary (2.0), prompt (1.0),
+    camera lens/movement/framing (1.5), physics materials/forces (1.5)
+
+Index:
+    .cache/search_index.sqlite, an SQLite FTS5 table plus a document table
+    holding each file's mtime and size. Before a query the index is brought
+    up to date: only new or modified files are parsed and re-indexed, and
+    deleted files are dropped. Queries read the index without touching YAML.
+"""
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass
+
+from prompt_corpus import load_document
+from prompt_discovery import add_discovery_arguments, discovery_from_args, find_prompt_files
+
+# Default index location (ignored by git)
+DEFAULT_INDEX_PATH = Path(__file__).parent.parent / ".cache" / "search_index.sqlite"
+
+# Bump when the indexed fields or tokenizer change; the index is rebuilt
+INDEX_VERSION = 1
+
+# Indexed fields and their BM25 weights, in FTS5 column order
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'tags': 2.0,
+    'summary': 2.0,
+    'prompt': 1.0,
+    'camera': 1.5,
+    'physics': 1.5,
+}
+
+# Number of indexed files between commits
+COMMIT_EVERY = 500
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT,
+    category TEXT
+);
+CREATE INDEX IF NOT EXISTS docs_category ON docs (category);
+CREATE VIRTUAL TABLE IF NOT EXISTS prompt_fts USING fts5(
+    {', '.join(FIELD_WEIGHTS)},
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+BM25 = f"bm25(prompt_fts, {', '.join(str(weight) for weight in FIELD_WEIGHTS.values())})"
+
+
+@dataclass
+class SearchHit:
+    """A ranked search result."""
+    path: Path
+    title: str
+    category: str
+    score: float
+    snippet: str
+
+
+def field_text(value) -> str:
+    """Flatten a YAML value (string, list or mapping) into indexable text."""
+    if value is None:
+        return ''
+    if isinstance(value, dict):
+        return ' '.join(field_text(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(field_text(item) for item in value)
+    return str(value)
+
+
+def build_match_query(query: str, match_any: bool = False) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Terms are quoted so user input can never be parsed as FTS5 syntax.
+    Returns None if the query has no searchable terms.
+    """
+    terms = list(dict.fromkeys(TOKEN_PATTERN.findall(query.lower())))
+    if not terms:
+        return None
+    return (' OR ' if match_any else ' AND ').join(f'"{term}"' for term in terms)
+
+
+class SearchIndex:
+    """Persistent BM25 full-text index of prompt files."""
+
+    def __init__(self, path: Path = DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS prompt_fts; DROP TABLE IF EXISTS docs;")
+        try:
+            self.conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            self.conn.close()
+            raise RuntimeError(f"SQLite FTS5 support is required for search: {e}") from e
+        self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.conn.commit()
+
+    def update(self, prompt_files: Iterable[Path]) -> Dict[str, int]:
+        """
+        Bring the index in line with the given files.
+
+        Returns counts of indexed, unchanged and removed documents.
+        """
+        known: Dict[str, Tuple[int, int, int]] = {
+            path: (doc_id, mtime_ns, size)
+            for doc_id, path, mtime_ns, size in self.conn.execute("SELECT id, path, mtime_ns, size FROM docs")
+        }
+        counts = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+        seen = set()
+        pending = 0
+
+        for file_path in prompt_files:
+            key = os.path.abspath(file_path)
+            try:
+                stat = os.stat(key)
+            except OSError:
+                continue
+            seen.add(key)
+
+            existing = known.get(key)
+            if existing and existing[1:] == (stat.st_mtime_ns, stat.st_size):
+                counts['unchanged'] += 1
+                continue
+
+            try:
+                prompt_data = load_document(file_path, remember=False)
+            except Exception as e:
+                print(f"⚠️  Error loading {file_path}: {e}", file=sys.stderr)
+                prompt_data = None
+
+            if existing:
+                self._remove(existing[0])
+            if isinstance(prompt_data, dict):
+                self._add(key, stat, prompt_data)
+                counts['indexed'] += 1
+
+            pending += 1
+            if pending >= COMMIT_EVERY:
+                self.conn.commit()
+                pending = 0
+
+        for path, (doc_id, _, _) in known.items():
+            if path not in seen:
+                self._remove(doc_id)
+                counts['removed'] += 1
+
+        self.conn.commit()
+        return counts
+
+    def _add(self, path: str, stat: os.stat_result, prompt_data: Dict) -> None:
+        cursor = self.conn.execute(
+            "INSERT INTO docs (path, mtime_ns, size, title, category) VALUES (?, ?, ?, ?, ?)",
+            (path, stat.st_mtime_ns, stat.st_size,
+             str(prompt_data.get('title', 'Untitled')), str(prompt_data.get('category', 'unknown')))
+        )
+        self.conn.execute(
+            f"INSERT INTO prompt_fts (rowid, {', '.join(FIELD_WEIGHTS)}) "
+            f"VALUES (?, {', '.join('?' for _ in FIELD_WEIGHTS)})",
+            (cursor.lastrowid, *(field_text(prompt_data.get(field)) for field in FIELD_WEIGHTS))
+        )
+
+    def _remove(self, doc_id: int) -> None:
+        self.conn.execute("DELETE FROM prompt_fts WHERE rowid = ?", (doc_id,))
+        self.conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def clear(self) -> None:
+        """Drop every indexed document."""
+        self.conn.execute("DELETE FROM prompt_fts")
+        self.conn.execute("DELETE FROM docs")
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def search(self, query: str, limit: int = 10, category: Optional[str] = None,
+               match_any: bool = False) -> List[SearchHit]:
+        """Return the best matches for a free-text query, best first."""
+        match = build_match_query(query, match_any)
+        if match is None:
+            return []
+
+        sql = (
+            f"SELECT d.path, d.title, d.category, -{BM25}, "
+            f"snippet(prompt_fts, -1, '[', ']', '…', 10) "
+            f"FROM prompt_fts JOIN docs d ON d.id = prompt_fts.rowid "
+            f"WHERE prompt_fts MATCH ?"
+        )
+        params: List = [match]
+        if category:
+            sql += " AND d.category = ?"
+            params.append(category)
+        sql += f" ORDER BY {BM25} LIMIT ?"
+        params.append(limit)
+
+        return [
+            SearchHit(path=Path(path), title=title, category=category, score=score, snippet=snippet)
+            for path, title, category, score, snippet in self.conn.execute(sql, params)
+        ]
+
+    def close(self) -> None:
+        """Commit pending changes and close the database connection."""
+        self.conn.commit()
+        self.conn.close()
+
+
+def format_hit(rank: int, hit: SearchHit, project_root: Path) -> str:
+    """Format a search result for display."""
+    try:
+        display_path = hit.path.relative_to(project_root)
+    except ValueError:
+        display_path = hit.path
+    snippet = ' '.join(hit.snippet.split())
+    return (f"{rank:>2}. {hit.title} ({hit.category}) — score {hit.score:.2f}\n"
+            f"    {display_path}\n"
+            f"    {snippet}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text search over prompt files (BM25).")
+    parser.add_argument('query', nargs='+', help="Search terms")
+    parser.add_argument('--limit', '-n', type=int, default=10, help="Maximum results (default: 10)")
+    parser.add_argument('--category', help="Only return prompts in this category")
+    parser.add_argument('--any', dest='match_any', action='store_true',
+                        help="Match prompts containing any term (default: all terms)")
+    parser.add_argument('--prompts', type=Path, default=Path(__file__).parent.parent / "prompts",
+                        help="Prompt directory to index (default: prompts/)")
+    parser.add_argument('--index', type=Path, default=DEFAULT_INDEX_PATH,
+                        help=f"Search index location (default: {DEFAULT_INDEX_PATH})")
+    parser.add_argument('--no-update', action='store_true',
+                        help="Query the index as-is without checking for changed files")
+    parser.add_argument('--rebuild', action='store_true', help="Re-index every file from scratch")
+    add_discovery_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    discovery_from_args(args)
+    query = ' '.join(args.query)
+
+    try:
+        index = SearchIndex(args.index)
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if args.rebuild:
+            index.clear()
+        if not args.no_update:
+            if not args.prompts.exists():
+                print(f"❌ Prompts directory not found: {args.prompts}", file=sys.stderr)
+                sys.exit(1)
+            counts = index.update(find_prompt_files(args.prompts))
+            if counts['indexed'] or counts['removed']:
+                print(f"🗂️  Index updated: {counts['indexed']} indexed, {counts['removed']} removed, "
+                      f"{counts['unchanged']} unchanged\n")
+
+        start = time.perf_counter()
+        hits = index.search(query, limit=args.limit, category=args.category, match_any=args.match_any)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if not hits:
+            print(f"🔍 No prompts match \"{query}\" ({len(index)} prompts searched)")
+            return
+
+        print(f"🔍 {len(hits)} results for \"{query}\" ({elapsed_ms:.1f} ms)\n")
+        project_root = args.prompts.resolve().parent
+        for rank, hit in enumerate(hits, 1):
+            print(format_hit(rank, hit, project_root))
+            print()
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
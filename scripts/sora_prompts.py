@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+sora-prompts - One Entry Point for Every Prompt Script
+
+Dispatches to the scripts in this directory as subcommands. A subcommand's
+module (and with it jsonschema, requests or PyYAML) is imported only when
+that subcommand runs, so `--help` and light commands start quickly.
+
+Usage:
+    python scripts/sora_prompts.py --help
+    python scripts/sora_prompts.py validate prompts/
+    python scripts/sora_prompts.py build-index --force
+    python scripts/sora_prompts.py top-performers
+    python scripts/sora_prompts.py check-links --jobs 32
+    python scripts/sora_prompts.py run-all              # one pass over the library
+    python scripts/sora_prompts.py <command> --help     # options of one command
+
+run-all walks prompts/ once and parses each file once, feeding validation,
+README indexing, performance ranking and demo link collection (see
+pipeline.py).
+"""
+
+import sys
+import argparse
+import importlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROG = "sora-prompts"
+
+# Subcommand -> (module in scripts/, one-line description)
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    'validate': ('validate_prompts', "Validate prompt YAML files against prompt.schema.json"),
+    'build-index': ('build_index', "Regenerate category README files"),
+    'top-performers': ('identify_top_performers', "Rank prompts by weighted performance score"),
+    'check-links': ('check_links', "Check that demo links are reachable"),
+    'run-all': ('pipeline', "Validate, index, rank and collect links in a single pass"),
+    'search': ('search_prompts', "Full-text search over prompts"),
+    'query': ('query_prompts', "Filter prompts by metadata facets and metrics"),
+    'duplicates': ('detect_duplicates', "Flag near-duplicate prompts"),
+    'compile': ('compile_corpus', "Pack valid prompts into an mmap-able bundle"),
+    'watch': ('watch_prompts', "Revalidate, re-index and re-rank on every save"),
+    'ingest-metrics': ('ingest_metrics', "Write performance metrics from a CSV/JSONL export into prompt files"),
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the subcommand; its own options are left for the subcommand."""
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="Tools for the Sora 2 prompt library.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<16}{description}"
+                                         for name, (_, description) in COMMANDS.items()),
+    )
+    parser.add_argument('command', choices=list(COMMANDS), metavar='command',
+                        help="Command to run (see below)")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="Options for the command")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+    module_name, _ = COMMANDS[args.command]
+
+    # Subcommands import their siblings by name, as when run directly
+    scripts_dir = str(Path(__file__).parent)
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+
+    # Usage lines read "sora-prompts <command>" instead of the module file name
+    sys.argv[0] = f"{PROG} {args.command}"
+    module = importlib.import_module(module_name)
+    module.main(args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,25 @@ AI Video Factory Constitution and prompt-schema-requirements.md contract.
 
 Usage:
     python validate_prompts.py <directory_or_file>
+    python validate_prompts.py --incremental prompts/           # Skip unchanged files
+    python validate_prompts.py --changed-since origin/main prompts/
+    python validate_prompts.py --jobs 8 prompts/                  # Validate in 8 processes
+    python validate_prompts.py --profile prompts/                 # Print per-stage timings
+
+Incremental Mode:
+    --incremental records the content hash of every valid file, plus the hash
+    of prompt.schema.json, in a state file (.cache/validation_state.json).
+    Later runs only revalidate files whose content changed, and everything
+    when the schema changed. Invalid files are always revalidated.
+
+    --changed-since <git-ref> validates only the YAML files that differ from
+    the given ref (plus untracked files), or everything if the schema changed.
+
+Fast Path:
+    Documents are first checked by Python code compiled from the schema
+    (schema_compiler.py, cached in .cache/schema_validator/ per schema hash).
+    Only documents it rejects are run through Draft7Validator, which
+    produces the error messages.
 
 Exit Codes:
     0 - All prompts valid
@@ -16,24 +35,178 @@ Contract: contracts/prompt-schema-requirements.md v1.0.0
 """
 
 import sys
+import os
 import json
+import hashlib
+import argparse
+import subprocess
+import time
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Any, Iterator, List, Dict, Optional, Set, Tuple
 import jsonschema
 from jsonschema import Draft7Validator, ValidationError
 
+from prompt_corpus import load_document, get_corpus
+from schema_compiler import load_fast_validator
+from instrumentation import add_profile_arguments, get_profiler, profiler_from_args
+from prompt_discovery import add_discovery_arguments, discovery_from_args, find_prompt_files, get_rules
+
+# Default location of the incremental validation state (ignored by git)
+DEFAULT_STATE_PATH = Path(__file__).parent.parent / ".cache" / "validation_state.json"
+
+STATE_VERSION = 1
+
+# Upper bound on files sent to a worker process at once
+MAX_CHUNK_SIZE = 256
+
+
+def file_digest(file_path: Path) -> str:
+    """Hash a file's bytes."""
+    with open(file_path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def format_load_error(file_path: Path, error: Exception) -> str:
+    """Format an error raised while loading or validating a prompt file."""
+    if isinstance(error, yaml.YAMLError):
+        return f"[ERROR] {file_path}\nYAML parsing error: {error}"
+    if isinstance(error, FileNotFoundError):
+        return f"[ERROR] File not found: {file_path}"
+    return f"[ERROR] {file_path}\nUnexpected error: {error}"
+
+
+class ValidationState:
+    """
+    Fingerprints of files that passed validation, tied to a schema hash.
+
+    A file is unchanged when its mtime and size match the recorded values,
+    or, failing that, when its content hash does. Loading a state written
+    for a different schema yields an empty state, so everything is
+    revalidated.
+    """
+
+    def __init__(self, path: Path, schema_hash: str):
+        self.path = Path(path)
+        self.schema_hash = schema_hash
+        self.files: Dict[str, Dict] = {}
+        self._dirty = False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == STATE_VERSION and data.get('schema_hash') == schema_hash:
+            self.files = data.get('files', {})
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return os.path.abspath(file_path)
+
+    def is_unchanged(self, file_path: Path) -> bool:
+        """Check whether a previously valid file still has the same content."""
+        record = self.files.get(self._key(file_path))
+        if not record:
+            return False
+
+        try:
+            stat = os.stat(file_path)
+            if record['mtime_ns'] == stat.st_mtime_ns and record['size'] == stat.st_size:
+                return True
+            if record['digest'] != file_digest(file_path):
+                return False
+        except OSError:
+            return False
+
+        # Same content with a new mtime (e.g. after a checkout): refresh the stat
+        record['mtime_ns'] = stat.st_mtime_ns
+        record['size'] = stat.st_size
+        self._dirty = True
+        return True
+
+    def record(self, file_path: Path, is_valid: bool) -> None:
+        """Remember a valid file's fingerprint, or forget an invalid one."""
+        key = self._key(file_path)
+        if not is_valid:
+            if self.files.pop(key, None) is not None:
+                self._dirty = True
+            return
+
+        try:
+            stat = os.stat(file_path)
+            self.files[key] = {
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'digest': file_digest(file_path),
+            }
+            self._dirty = True
+        except OSError:
+            pass
+
+    def save(self) -> None:
+        """Write the state file if anything changed."""
+        if not self._dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': STATE_VERSION,
+                'schema_hash': self.schema_hash,
+                'files': self.files,
+            }, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def git_changed_files(ref: str, paths: List[Path]) -> Set[Path]:
+    """
+    List files under the given paths that differ from a git ref.
+
+    Includes committed and uncommitted changes plus untracked files;
+    deleted files are left out.
+    """
+    paths = [str(path.resolve()) for path in paths]
+    root = Path(subprocess.run(
+        ['git', 'rev-parse', '--show-toplevel'],
+        cwd=os.path.dirname(paths[0]), capture_output=True, text=True, check=True
+    ).stdout.strip())
+
+    commands = [
+        ['git', 'diff', '--name-only', '--diff-filter=ACMR', ref, '--', *paths],
+        ['git', 'ls-files', '--others', '--exclude-standard', '--', *paths],
+    ]
+    changed = set()
+    for command in commands:
+        output = subprocess.run(command, cwd=root, capture_output=True, text=True, check=True).stdout
+        changed.update((root / line).resolve() for line in output.splitlines() if line)
+    return changed
+
 
 class PromptValidator:
     """Validates Sora 2 prompt YAML files against JSON Schema."""
 
-    def __init__(self, schema_path: Path):
-        """Initialize validator with schema file."""
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            self.schema = json.load(f)
+    def __init__(self, schema_path: Path, fast_path: bool = True):
+        """
+        Initialize validator with schema file.
+
+        With ``fast_path``, documents are first checked by code compiled from
+        the schema (see schema_compiler.py); only documents it rejects go
+        through Draft7Validator, which produces the error messages.
+        """
+        self.schema_path = Path(schema_path)
+        with open(schema_path, 'rb') as f:
+            schema_bytes = f.read()
+        self.schema = json.loads(schema_bytes.decode('utf-8'))
+        self.schema_hash = hashlib.blake2b(schema_bytes, digest_size=16).hexdigest()
 
         # Use Draft 7 validator for schema compliance
         self.validator = Draft7Validator(self.schema)
+        self.fast_check = load_fast_validator(self.schema, self.schema_hash) if fast_path else None
 
     def validate_file(self, file_path: Path) -> Tuple[bool, List[str]]:
         """
@@ -42,35 +215,57 @@ class PromptValidator:
         Returns:
             (is_valid, error_messages)
         """
-        errors = []
-
         try:
-            # Load YAML file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                prompt_data = yaml.safe_load(f)
-
-            # Validate against schema
-            validation_errors = list(self.validator.iter_errors(prompt_data))
+            # Load YAML file (parsed once and cached by the shared corpus)
+            prompt_data = load_document(file_path)
+            return self.validate_document(file_path, prompt_data)
+        except Exception as e:
+            return False, [format_load_error(file_path, e)]
 
-            if validation_errors:
-                for error in validation_errors:
-                    error_msg = self._format_error(file_path, error, prompt_data)
-                    errors.append(error_msg)
-                return False, errors
+    def validate_document(self, file_path: Path, prompt_data: Any) -> Tuple[bool, List[str]]:
+        """
+        Validate an already parsed prompt document.
 
-            return True, []
+        Returns:
+            (is_valid, error_messages)
+        """
+        start = time.perf_counter()
+        if self.fast_check is not None and self.fast_check(prompt_data):
+            validation_errors = []
+        else:
+            validation_errors = list(self.validator.iter_errors(prompt_data))
+        get_profiler().observe('schema_validation_seconds', time.perf_counter() - start)
 
-        except yaml.YAMLError as e:
-            errors.append(f"[ERROR] {file_path}\nYAML parsing error: {e}")
-            return False, errors
+        if validation_errors:
+            return False, [self._format_error(file_path, error, prompt_data) for error in validation_errors]
+        return True, []
 
-        except FileNotFoundError:
-            errors.append(f"[ERROR] File not found: {file_path}")
-            return False, errors
+    def validate_files(self, file_paths: List[Path], jobs: int = 1) -> Iterator[Tuple[Path, bool, List[str]]]:
+        """
+        Validate files, yielding (file_path, is_valid, errors) in input order.
 
-        except Exception as e:
-            errors.append(f"[ERROR] {file_path}\nUnexpected error: {e}")
-            return False, errors
+        With ``jobs`` > 1 the files are sharded across a process pool; each
+        worker compiles the schema once and results are streamed back in the
+        original order. Documents the workers parse come back with their
+        results and are merged into this process's corpus, so parallel runs
+        warm the on-disk cache too.
+        """
+        if jobs <= 1 or len(file_paths) <= 1:
+            for file_path in file_paths:
+                yield (file_path, *self.validate_file(file_path))
+            return
+
+        # Read the cache shards before forking so workers inherit cached documents
+        corpus = get_corpus()
+        corpus.preload(file_paths)
+
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, len(file_paths) // (jobs * 4)))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(self.schema_path,)) as executor:
+            for file_path, is_valid, errors, updates in executor.map(_validate_in_worker, file_paths,
+                                                                     chunksize=chunk_size):
+                corpus.merge(updates)
+                yield file_path, is_valid, errors
 
     def _format_error(self, file_path: Path, error: ValidationError, prompt_data: dict) -> str:
         """
@@ -99,47 +294,118 @@ Issue: {error_msg}{constitution_ref}"""
 
         return formatted
 
-    def validate_directory(self, directory: Path) -> Tuple[int, int, List[str]]:
+    def validate_directory(self, directory: Path,
+                           state: Optional[ValidationState] = None,
+                           only: Optional[Set[Path]] = None,
+                           jobs: int = 1) -> Tuple[int, int, List[str]]:
         """
         Recursively validate all YAML files in directory.
 
+        Args:
+            directory: Directory to scan
+            state: Incremental state; unchanged valid files are skipped
+            only: Restrict validation to these (resolved) paths
+            jobs: Number of worker processes (1 validates in this process)
+
         Returns:
             (valid_count, total_count, all_errors)
         """
-        yaml_files = list(directory.rglob("*.yaml")) + list(directory.rglob("*.yml"))
+        profiler = get_profiler()
+        with profiler.stage('discover'):
+            yaml_files = find_prompt_files(directory)
+            if only is not None:
+                yaml_files = [file_path for file_path in yaml_files if file_path.resolve() in only]
 
         if not yaml_files:
-            print(f"⚠️  No YAML files found in {directory}")
+            if only is not None:
+                print(f"✓ No changed YAML files in {directory}")
+            else:
+                print(f"⚠️  No YAML files found in {directory}")
             return 0, 0, []
 
         valid_count = 0
+        skipped_count = 0
         all_errors = []
 
         print(f"✓ Validating prompts in: {directory}\n")
 
-        for file_path in sorted(yaml_files):
-            is_valid, errors = self.validate_file(file_path)
-
-            if is_valid:
-                print(f"✓ {file_path.relative_to(directory.parent)} - VALID")
+        pending = []
+        for file_path in yaml_files:
+            if state and state.is_unchanged(file_path):
                 valid_count += 1
+                skipped_count += 1
             else:
-                print(f"✗ {file_path.relative_to(directory.parent)} - INVALID")
-                all_errors.extend(errors)
+                pending.append(file_path)
+
+        with profiler.stage('validate'):
+            for file_path, is_valid, errors in self.validate_files(pending, jobs):
+                if state:
+                    state.record(file_path, is_valid)
+
+                if is_valid:
+                    print(f"✓ {file_path.relative_to(directory.parent)} - VALID")
+                    valid_count += 1
+                else:
+                    print(f"✗ {file_path.relative_to(directory.parent)} - INVALID")
+                    all_errors.extend(errors)
+
+        if skipped_count:
+            print(f"✓ {skipped_count} unchanged prompts skipped (validated previously)")
 
         return valid_count, len(yaml_files), all_errors
 
 
-def main():
+# Validator owned by each worker process, built once by _init_worker()
+_worker_validator: Optional[PromptValidator] = None
+
+
+def _init_worker(schema_path: Path) -> None:
+    """Compile the schema once per worker process."""
+    global _worker_validator
+    _worker_validator = PromptValidator(schema_path)
+    # Documents the parent stored before forking are already in its cache
+    get_corpus(persist=False).take_updates()
+
+
+def _validate_in_worker(file_path: Path) -> Tuple[Path, bool, List[str], Dict[str, Any]]:
+    """Validate one file in a worker process; also returns the documents it parsed for the parent's cache."""
+    is_valid, errors = _worker_validator.validate_file(file_path)
+    return file_path, is_valid, errors, get_corpus().take_updates()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Validate Sora 2 prompt YAML files against prompt.schema.json.")
+    parser.add_argument('path', nargs='?', help="Prompt file or directory")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Skip files that were valid last run and have not changed")
+    parser.add_argument('--state', type=Path, default=DEFAULT_STATE_PATH,
+                        help="Incremental state file (default: .cache/validation_state.json)")
+    parser.add_argument('--changed-since', metavar='GIT_REF',
+                        help="Only validate files that differ from this git ref")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="Validate in N worker processes (0 = one per CPU)")
+    add_profile_arguments(parser)
+    add_discovery_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point for validation script."""
-    if len(sys.argv) < 2:
+    args = parse_args(argv)
+    profiler = profiler_from_args('validate_prompts', args)
+    discovery_from_args(args)
+    if not args.path:
         print("Usage: python validate_prompts.py <directory_or_file>")
         print("\nExamples:")
         print("  python validate_prompts.py prompts/")
         print("  python validate_prompts.py prompts/cinematic/noir-detective.yaml")
+        print("  python validate_prompts.py --incremental prompts/")
+        print("  python validate_prompts.py --changed-since origin/main prompts/")
         sys.exit(1)
 
-    target_path = Path(sys.argv[1])
+    target_path = Path(args.path)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
     if not target_path.exists():
         print(f"❌ Error: Path does not exist: {target_path}")
@@ -156,9 +422,14 @@ def main():
         sys.exit(1)
 
     try:
-        validator = PromptValidator(schema_path)
+        with profiler.stage('load_schema'):
+            validator = PromptValidator(schema_path)
 
         if target_path.is_file():
+            if not get_rules().accepts_path(target_path):
+                print(f"⏭️  {target_path} - skipped (not a prompt file under the discovery rules)")
+                sys.exit(0)
+
             # Validate single file
             is_valid, errors = validator.validate_file(target_path)
 
@@ -173,8 +444,27 @@ def main():
                 sys.exit(1)
 
         elif target_path.is_dir():
+            state = ValidationState(args.state, validator.schema_hash) if args.incremental else None
+
+            only = None
+            if args.changed_since:
+                try:
+                    changed = git_changed_files(args.changed_since, [target_path, schema_path])
+                except (OSError, subprocess.CalledProcessError) as e:
+                    print(f"❌ Error: could not diff against {args.changed_since}: {e}")
+                    sys.exit(1)
+                # A schema change can invalidate any file, so validate everything
+                if schema_path.resolve() not in changed:
+                    only = changed
+
             # Validate directory
-            valid_count, total_count, all_errors = validator.validate_directory(target_path)
+            valid_count, total_count, all_errors = validator.validate_directory(
+                target_path, state=state, only=only, jobs=jobs
+            )
+
+            if state:
+                with profiler.stage('save_state'):
+                    state.save()
 
             print()  # Blank line before summary
 
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Watch Prompts - Live Validation, Indexing and Ranking While You Edit
+
+Loads the prompt library once, keeps every parsed prompt in memory, and
+reacts to file changes under prompts/. Each saved file is revalidated on its
+own, only its category README is re-rendered, and the top-performer ranking
+is updated - typically in a few milliseconds instead of a cold start of
+every script.
+
+Usage:
+    python scripts/watch_prompts.py              # inotify on Linux, polling elsewhere
+    python scripts/watch_prompts.py --poll       # force polling
+    python scripts/watch_prompts.py --no-readme  # validate and rank only
+
+Per change:
+    - Validation: PromptValidator.validate_file() on the changed file
+    - README: the category's cached entries are reassembled with
+      render_category_readme() (the renderer behind generate_category_readme())
+      and the file is rewritten only if its bytes changed
+    - Ranking: calculate_top_performers() over the in-memory performance
+      table, reporting the file's rank and any change to the top list
+
+Watching:
+    On Linux, inotify (via ctypes, no extra dependency) watches prompts/ and
+    each category directory. Elsewhere, or with --poll, the tree's mtimes and
+    sizes are compared every --interval seconds. Editors that save through a
+    temp file and rename are handled by both.
+
+Stop with Ctrl+C.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from prompt_corpus import load_document
+from prompt_discovery import add_discovery_arguments, discovery_from_args, get_rules, iter_prompt_files
+from validate_prompts import PromptValidator
+from build_index import CATEGORY_DESCRIPTIONS, created_key, generate_prompt_entry, render_category_readme
+from identify_top_performers import PromptPerformance, calculate_top_performers, extract_performance
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Quiet period that groups the events of one save (seconds)
+DEBOUNCE = 0.05
+
+# Default polling interval (seconds)
+POLL_INTERVAL = 1.0
+
+# Share of prompts ranked as top performers, as in identify_top_performers.py
+TOP_PERCENT = 0.10
+
+# inotify event flags (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def is_prompt_file(prompts_dir: Path, path: Path) -> bool:
+    """Whether a changed path is a prompt file under the shared discovery rules."""
+    try:
+        path.relative_to(prompts_dir)
+    except ValueError:
+        return False
+    return get_rules().accepts_path(path)
+
+
+def scan_prompt_files(prompts_dir: Path) -> Dict[Path, Tuple[int, int]]:
+    """Map every prompt file to its (mtime_ns, size)."""
+    return {prompt_file.path: (prompt_file.stat.st_mtime_ns, prompt_file.stat.st_size)
+            for prompt_file in iter_prompt_files(prompts_dir)}
+
+
+class InotifyWatcher:
+    """Reports changed prompt files using Linux inotify."""
+
+    def __init__(self, prompts_dir: Path):
+        self.prompts_dir = prompts_dir
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.watches: Dict[int, Path] = {}
+
+        self.add_watch(prompts_dir)
+        for directory in prompts_dir.rglob('*'):
+            if directory.is_dir():
+                self.add_watch(directory)
+
+    def add_watch(self, directory: Path) -> None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_add_watch {directory}: {os.strerror(error)}")
+        self.watches[wd] = directory
+
+    def _read_events(self) -> bytes:
+        data = b''
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return data
+                raise
+            if not chunk:
+                return data
+            data += chunk
+
+    def changes(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Wait for events and return the prompt files they touched."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        # Let the rest of the save (temp file, rename) arrive
+        time.sleep(DEBOUNCE)
+        data = self._read_events()
+
+        changed: Set[Path] = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; report everything so nothing is missed
+                changed.update(scan_prompt_files(self.prompts_dir))
+                continue
+
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_watch(path)
+                    changed.update(file_path for file_path in scan_prompt_files(path)
+                                   if is_prompt_file(self.prompts_dir, file_path))
+                continue
+            if is_prompt_file(self.prompts_dir, path):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Reports changed prompt files by comparing mtimes and sizes."""
+
+    def __init__(self, prompts_dir: Path, interval: float = POLL_INTERVAL):
+        self.prompts_dir = prompts_dir
+        self.interval = interval
+        self.snapshot = scan_prompt_files(prompts_dir)
+
+    def changes(self, timeout: Optional[float] = None) -> Set[Path]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = scan_prompt_files(self.prompts_dir)
+        changed = {path for path, stat in current.items() if self.snapshot.get(path) != stat}
+        changed.update(path for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(prompts_dir: Path, poll: bool = False, interval: float = POLL_INTERVAL):
+    """Use inotify when available, polling otherwise."""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(prompts_dir)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}); falling back to polling", file=sys.stderr)
+    return PollingWatcher(prompts_dir, interval)
+
+
+class WatchSession:
+    """In-memory view of the prompt library, updated one file at a time."""
+
+    def __init__(self, prompts_dir: Path, validator: PromptValidator, write_readmes: bool = True):
+        self.prompts_dir = prompts_dir
+        self.validator = validator
+        self.write_readmes = write_readmes
+
+        # category -> file -> (created, rendered README entry)
+        self.entries: Dict[str, Dict[Path, Tuple[str, str]]] = {}
+        self.performances: Dict[Path, PromptPerformance] = {}
+        self.invalid: Set[Path] = set()
+        self.top: List[PromptPerformance] = []
+
+    def category_of(self, file_path: Path) -> Optional[str]:
+        """Category directory of a prompt file (None if not in one)."""
+        try:
+            relative = file_path.relative_to(self.prompts_dir)
+        except ValueError:
+            return None
+        return relative.parts[0] if len(relative.parts) == 2 else None
+
+    def load_all(self) -> int:
+        """Parse, validate, render and rank the whole library once; returns the file count."""
+        prompt_files = sorted(scan_prompt_files(self.prompts_dir))
+        for file_path in prompt_files:
+            is_valid, _ = self.validator.validate_file(file_path)
+            if not is_valid:
+                self.invalid.add(file_path)
+            self._index(file_path)
+        self.top = self._rank()
+        return len(prompt_files)
+
+    def _index(self, file_path: Path) -> Tuple[bool, bool]:
+        """
+        Refresh the in-memory entry and performance of one file.
+
+        Returns (entry_changed, performance_changed).
+        """
+        category = self.category_of(file_path)
+        entries = self.entries.setdefault(category, {}) if category else {}
+        old_entry = entries.pop(file_path, None)
+        old_perf = self.performances.pop(file_path, None)
+
+        prompt_data = None
+        if file_path.exists():
+            try:
+                prompt_data = load_document(file_path)
+            except Exception:
+                prompt_data = None  # Reported by validation
+
+        if isinstance(prompt_data, dict):
+            if category:
+                try:
+                    entries[file_path] = (created_key(prompt_data), generate_prompt_entry(prompt_data, file_path.name))
+                except (KeyError, TypeError, ValueError, AttributeError):
+                    pass  # Incomplete prompt; build_index.py would fail on it too
+            perf = extract_performance(prompt_data, file_path)
+            if perf:
+                self.performances[file_path] = perf
+
+        new_perf = self.performances.get(file_path)
+        perf_changed = (old_perf is None) != (new_perf is None) or (
+            old_perf is not None and (old_perf.weighted_score, old_perf.title) != (new_perf.weighted_score, new_perf.title)
+        )
+        return entries.get(file_path) != old_entry, perf_changed
+
+    def _rank(self) -> List[PromptPerformance]:
+        performances = [self.performances[path] for path in sorted(self.performances)]
+        return calculate_top_performers(performances, top_percent=TOP_PERCENT)
+
+    def refresh_readme(self, category: str) -> Optional[bool]:
+        """Re-render one category README; returns whether it was rewritten."""
+        entries = self.entries.get(category)
+        if not entries or category not in CATEGORY_DESCRIPTIONS:
+            return None
+        # Same order as build_index.py: files by name, then newest first
+        content = render_category_readme(category, [entries[path] for path in sorted(entries)])
+        readme_path = self.prompts_dir / category / "README.md"
+        current = readme_path.read_text(encoding='utf-8') if readme_path.exists() else None
+        if current == content:
+            return False
+        with open(readme_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return True
+
+    def handle_change(self, file_path: Path) -> None:
+        """Revalidate, re-render and re-rank after one file changed."""
+        start = time.perf_counter()
+        display = file_path.relative_to(self.prompts_dir.parent)
+        lines = []
+
+        if file_path.exists():
+            is_valid, errors = self.validator.validate_file(file_path)
+            if is_valid:
+                self.invalid.discard(file_path)
+                lines.append(f"✓ {display} - VALID")
+            else:
+                self.invalid.add(file_path)
+                lines.append(f"✗ {display} - INVALID")
+                lines.extend(errors)
+        else:
+            self.invalid.discard(file_path)
+            lines.append(f"🗑️  {display} - removed")
+
+        entry_changed, perf_changed = self._index(file_path)
+
+        category = self.category_of(file_path)
+        if self.write_readmes and category and entry_changed:
+            rewritten = self.refresh_readme(category)
+            if rewritten:
+                lines.append(f"📝 Updated {category}/README.md ({len(self.entries[category])} prompts)")
+
+        if perf_changed:
+            previous = [perf.file_path for perf in self.top]
+            self.top = self._rank()
+            current = [perf.file_path for perf in self.top]
+            if file_path in current:
+                lines.append(f"🏆 Rank #{current.index(file_path) + 1} of {len(current)} top performers")
+            elif file_path in previous:
+                lines.append("🏆 Dropped out of the top performers")
+            elif current != previous:
+                lines.append("🏆 Top performers reordered")
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        lines.append(f"   ({elapsed_ms:.1f} ms)")
+        print("\n".join(lines) + "\n", flush=True)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Revalidate, re-index and re-rank prompts as they change.")
+    parser.add_argument('--prompts', type=Path, default=PROJECT_ROOT / "prompts",
+                        help="Prompt directory to watch (default: prompts/)")
+    parser.add_argument('--poll', action='store_true', help="Poll for changes instead of using inotify")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help=f"Polling interval in seconds (default: {POLL_INTERVAL})")
+    parser.add_argument('--no-readme', action='store_true', help="Do not rewrite category READMEs")
+    add_discovery_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+    discovery_from_args(args)
+    prompts_dir = args.prompts.resolve()
+
+    if not prompts_dir.is_dir():
+        print(f"❌ Prompts directory not found: {prompts_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    session = WatchSession(prompts_dir, PromptValidator(PROJECT_ROOT / "prompt.schema.json"),
+                           write_readmes=not args.no_readme)
+    total = session.load_all()
+    watcher = create_watcher(prompts_dir, args.poll, args.interval)
+
+    print(f"👀 Watching {prompts_dir} ({type(watcher).__name__.replace('Watcher', '').lower()})")
+    print(f"   {total} prompts loaded in {time.perf_counter() - start:.2f}s "
+          f"({len(session.invalid)} invalid, {len(session.performances)} with performance data)")
+    print("   Press Ctrl+C to stop.\n", flush=True)
+
+    try:
+        while True:
+            for file_path in sorted(watcher.changes(timeout=1.0)):
+                session.handle_change(file_path)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Shared fixtures: make scripts/ importable, isolate process-wide state and serve canned HTTP answers."""
+
+import sys
+import shutil
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+import prompt_corpus  # noqa: E402
+import prompt_discovery  # noqa: E402
+import schema_compiler  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch):
+    """Keep tests off the repository's .cache/ and give each one default discovery rules."""
+    monkeypatch.setenv(prompt_corpus.CACHE_ENV_VAR, 'off')
+    monkeypatch.setattr(prompt_corpus, '_corpus', None)
+    monkeypatch.setattr(prompt_discovery, '_rules', prompt_discovery.DiscoveryRules())
+    # No cache directory: the schema is compiled in memory
+    monkeypatch.setattr(schema_compiler.load_fast_validator, '__defaults__', (None,))
+
+
+@pytest.fixture
+def prompt_library(tmp_path):
+    """A copy of the repository's prompts/ directory to modify freely."""
+    prompts_dir = tmp_path / "prompts"
+    shutil.copytree(PROJECT_ROOT / "prompts", prompts_dir)
+    return prompts_dir
+
+
+class StubServer:
+    """
+    Local HTTP server answering from a route table.
+
+    ``routes`` maps a path to a list of (status, headers) answers; each
+    request takes the next one and the last keeps repeating. Every request
+    is recorded as (method, path with query).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def answer(self):
+                stub.requests.append((self.command, self.path))
+                answers = stub.routes.get(urlsplit(self.path).path, [(404, {})])
+                status, headers = answers.pop(0) if len(answers) > 1 else answers[0]
+                body = b'{}'
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            do_GET = do_HEAD = answer
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def route(self, path, *answers):
+        self.routes[path] = [answer if isinstance(answer, tuple) else (answer, {}) for answer in answers]
+        return f"{self.url}{path}"
+
+
+@pytest.fixture
+def stub_server():
+    stub = StubServer()
+    stub.thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
@@ -0,0 +1,163 @@
+"""Category README builds: incremental reuse of entries and state, and streamed output."""
+
+import os
+
+import pytest
+
+from build_index import BuildState, build_category, file_digest, main, stream_category_readme
+from conftest import PROJECT_ROOT
+from prompt_discovery import find_prompt_files
+
+CATEGORIES = ('animation', 'cinematic', 'experimental', 'hyperrealism')
+
+
+def readmes(prompts_dir):
+    return {readme.parent.name: readme.read_text(encoding='utf-8') for readme in sorted(prompts_dir.glob("*/README.md"))}
+
+
+def set_field(file_path, field, value):
+    """Override a top-level field, keeping the original line under another key."""
+    text = file_path.read_text(encoding='utf-8')
+    assert f"\n{field}:" in text
+    file_path.write_text(text.replace(f"\n{field}:", f"\n{field}: \"{value}\"\nold_{field}:", 1), encoding='utf-8')
+
+
+@pytest.fixture
+def build(prompt_library, tmp_path, capsys):
+    """Run build_index on the library with a state file; returns the captured output."""
+    def run(*argv, state='state.json'):
+        main(['--prompts', str(prompt_library), '--state', str(tmp_path / state), *argv])
+        return capsys.readouterr()
+    return run
+
+
+class TestIncrementalBuild:
+    def test_unchanged_library_is_skipped(self, build):
+        build()
+        output = build().out
+        assert [line for line in output.splitlines() if "README.md" in line] == [
+            f"⏭️  Skipped {category}/README.md (inputs unchanged)" for category in CATEGORIES]
+
+    def test_edit_re_renders_only_that_entry(self, prompt_library, build):
+        build()
+        set_field(prompt_library / "cinematic" / "noir-detective.yaml", 'title', "Retitled Noir")
+        output = build().out
+
+        assert "✅ Updated cinematic/README.md (3 prompts, 1 entries re-rendered)" in output
+        assert output.count("Skipped") == 3
+        assert "Retitled Noir" in (prompt_library / "cinematic" / "README.md").read_text(encoding='utf-8')
+
+    def test_incremental_output_matches_a_forced_build(self, prompt_library, build):
+        build()
+        (prompt_library / "animation" / "cel-shaded-action.yaml").unlink()
+        set_field(prompt_library / "hyperrealism" / "urban-architecture.yaml", 'created', "2030-01-01")
+        build()
+        incremental = readmes(prompt_library)
+
+        build('--force', state='other.json')
+        assert readmes(prompt_library) == incremental
+        assert "**Total Prompts**: 2" in incremental['animation']
+        assert incremental['hyperrealism'].index("urban-architecture") < incremental['hyperrealism'].index("morning-coffee")
+
+    def test_hand_edited_readme_is_rebuilt(self, prompt_library, build):
+        build()
+        built = readmes(prompt_library)
+        (prompt_library / "animation" / "README.md").write_text("edited by hand\n", encoding='utf-8')
+
+        output = build().out
+        assert "✅ Updated animation/README.md (3 prompts, 0 entries re-rendered)" in output
+        assert readmes(prompt_library) == built
+
+    def test_touched_files_are_still_skipped(self, prompt_library, build):
+        build()
+        for file_path in prompt_library.glob("*/*.yaml"):
+            os.utime(file_path, ns=(1, 1))
+        assert build().out.count("Skipped") == 4
+
+    def test_state_from_another_generator_is_discarded(self, tmp_path, build):
+        build()
+        assert BuildState(tmp_path / "state.json", "another-generator").files == {}
+
+    def test_file_that_fails_to_load_is_retried(self, prompt_library, build):
+        (prompt_library / "experimental" / "glitch-aesthetic.yaml").write_text("title: [unclosed\n", encoding='utf-8')
+        build()
+        output = build()
+
+        assert "experimental/README.md already up to date (2 prompts" in output.out
+        assert "glitch-aesthetic.yaml" in output.err
+
+
+def render_both(prompt_library, tmp_path, category, state=None):
+    """Render a category with build_category and with stream_category_readme."""
+    yaml_files = find_prompt_files(prompt_library / category)
+    state = state or BuildState(tmp_path / "state.json", "generator", fresh=True)
+    for yaml_file in yaml_files:
+        state.fingerprint(yaml_file)
+    in_memory, count, _, all_loaded = build_category(category, yaml_files, state)
+
+    readme_path = prompt_library / category / "README.md"
+    readme_path.unlink()
+    changed, streamed_count, _, streamed_all_loaded, digest = stream_category_readme(
+        category, yaml_files, readme_path, state)
+    streamed = readme_path.read_text(encoding='utf-8')
+
+    assert changed
+    assert (streamed_count, streamed_all_loaded) == (count, all_loaded)
+    assert digest == file_digest(streamed.encode('utf-8'))
+    return in_memory, streamed
+
+
+class TestStreamingBuild:
+    @pytest.mark.parametrize('category', CATEGORIES)
+    def test_matches_the_in_memory_build(self, prompt_library, tmp_path, category):
+        in_memory, streamed = render_both(prompt_library, tmp_path, category)
+        assert streamed == in_memory == (PROJECT_ROOT / "prompts" / category / "README.md").read_text(encoding='utf-8')
+
+    @pytest.mark.parametrize('created', [
+        'created: "2025-11-02"', "created: '2024-01-30'", "created: 2026-03-04", "created: 2026-03-04  # imported",
+        "created: ''", None,
+    ])
+    def test_matches_with_mixed_creation_dates(self, prompt_library, tmp_path, created):
+        file_path = prompt_library / "cinematic" / "desert-wanderer.yaml"
+        text = file_path.read_text(encoding='utf-8')
+        assert 'created: "2025-10-14"\n' in text
+        file_path.write_text(text.replace('created: "2025-10-14"\n', f"{created}\n" if created else "", 1),
+                             encoding='utf-8')
+
+        in_memory, streamed = render_both(prompt_library, tmp_path, 'cinematic')
+        assert streamed == in_memory
+
+    def test_matches_with_cached_entries(self, prompt_library, tmp_path):
+        state = BuildState(tmp_path / "state.json", "generator", fresh=True)
+        render_both(prompt_library, tmp_path, 'animation', state)
+        set_field(prompt_library / "animation" / "paper-cutout-forest.yaml", 'title', "Retitled Forest")
+
+        in_memory, streamed = render_both(prompt_library, tmp_path, 'animation', state)
+        assert streamed == in_memory
+        assert "Retitled Forest" in streamed
+
+    def test_matches_when_a_file_fails_to_load(self, prompt_library, tmp_path, capsys):
+        (prompt_library / "experimental" / "glitch-aesthetic.yaml").write_text("title: [unclosed\n", encoding='utf-8')
+        in_memory, streamed = render_both(prompt_library, tmp_path, 'experimental')
+        assert streamed == in_memory
+        assert "**Total Prompts**: 2" in streamed
+
+    def test_identical_readme_is_left_alone(self, prompt_library, tmp_path):
+        readme_path = prompt_library / "cinematic" / "README.md"
+        os.utime(readme_path, ns=(1, 1))
+        changed, count, _, _, _ = stream_category_readme(
+            'cinematic', find_prompt_files(prompt_library / "cinematic"), readme_path,
+            BuildState(tmp_path / "state.json", "generator", fresh=True))
+
+        assert (changed, count) == (False, 3)
+        assert readme_path.stat().st_mtime_ns == 1
+        assert [path.name for path in readme_path.parent.iterdir() if path.name.startswith(".README.")] == []
+
+    def test_stream_flag_builds_the_same_readmes(self, prompt_library, build):
+        build('--force')
+        built = readmes(prompt_library)
+        for readme in prompt_library.glob("*/README.md"):
+            readme.unlink()
+
+        build('--force', '--stream', state='other.json')
+        assert readmes(prompt_library) == built
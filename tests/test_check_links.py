@@ -0,0 +1,326 @@
+"""Link checker behaviour against a local stub server, without network access."""
+
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+import check_links
+from check_links import (
+    CircuitBreaker, HostLimiter, LinkCheckPlan, LinkCheckResult, LinkProbe, OEmbedProbe,
+    canonicalize_url, check_plan, merge_results, parse_retry_after, platform_probes,
+    save_results, select_probe,
+)
+
+
+def make_plan(*links):
+    plan = LinkCheckPlan(references={}, file_order=[], skipped=[])
+    for number, link in enumerate(links):
+        plan.add(Path(f"/repo/prompts/cinematic/p{number}.yaml"), {'title': f"P{number}", 'demo_link': link})
+    return plan
+
+
+def make_result(name, accessible=True):
+    return LinkCheckResult(Path(f"/repo/prompts/cinematic/{name}.yaml"), name, f"https://example.com/{name}",
+                           accessible, 200 if accessible else 404, None, 'example.com')
+
+
+class TestHostLimiter:
+    def test_spaces_requests_to_the_platform_rate(self):
+        limiter = HostLimiter(per_host=4, rates={'youtube.com': 20.0})
+        starts = []
+        for _ in range(4):
+            with limiter.slot("https://youtube.com/watch?v=a"):
+                starts.append(time.monotonic())
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        assert min(gaps) >= 0.045
+
+    def test_hosts_without_a_rate_are_not_delayed(self):
+        limiter = HostLimiter(per_host=4, rates={'youtube.com': 1.0})
+        start = time.monotonic()
+        for _ in range(5):
+            with limiter.slot("https://example.com/a"):
+                pass
+        assert time.monotonic() - start < 0.5
+
+    def test_caps_concurrent_requests_per_host(self):
+        limiter = HostLimiter(per_host=2)
+        active, peak = 0, 0
+        lock = threading.Lock()
+
+        def hold():
+            nonlocal active, peak
+            with limiter.slot("https://example.com/a"):
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.05)
+                with lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=hold) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert peak == 2
+
+    def test_pause_holds_back_the_host(self):
+        limiter = HostLimiter()
+        limiter.pause("https://example.com/a", 0.1)
+        start = time.monotonic()
+        with limiter.slot("https://example.com/b"):
+            pass
+        assert time.monotonic() - start >= 0.09
+
+
+class TestCircuitBreaker:
+    UNREACHABLE = LinkProbe(False, None, "Timeout", unreachable=True)
+    ANSWERED = LinkProbe(True, 200, None)
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        breaker.record('h', self.UNREACHABLE)
+        assert breaker.allow('h')
+        breaker.record('h', self.UNREACHABLE)
+        assert not breaker.allow('h')
+        assert breaker.allow('other')
+        assert breaker.open_probe('h').circuit_open
+        assert "after 2 consecutive" in breaker.open_probe('h').error_message
+
+    def test_an_answer_resets_the_count(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        breaker.record('h', self.UNREACHABLE)
+        breaker.record('h', self.ANSWERED)
+        breaker.record('h', self.UNREACHABLE)
+        assert breaker.allow('h')
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+        breaker.record('h', self.UNREACHABLE)
+        assert not breaker.allow('h')
+        time.sleep(0.06)
+        assert breaker.allow('h')
+        assert not breaker.allow('h')  # only one trial while it is in flight
+
+        breaker.record('h', self.UNREACHABLE)
+        assert not breaker.allow('h')  # failed trial: open for another cooldown
+        time.sleep(0.06)
+        assert breaker.allow('h')
+        breaker.record('h', self.ANSWERED)
+        assert breaker.allow('h') and breaker.allow('h')
+
+    def test_threshold_zero_disables(self):
+        breaker = CircuitBreaker(threshold=0)
+        for _ in range(5):
+            breaker.record('h', self.UNREACHABLE)
+        assert breaker.allow('h')
+
+
+class TestRetryAfter:
+    @pytest.mark.parametrize('value, expected', [
+        ('5', 5.0),
+        (' 120 ', 120.0),
+        (None, None),
+        ('', None),
+        ('soon', None),
+        ('-3', None),
+    ])
+    def test_delay_seconds(self, value, expected):
+        assert parse_retry_after(value) == expected
+
+    def test_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        assert 25 <= parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+
+    def test_http_date_in_the_past_is_zero(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_rate_limited_link_is_retried(self, stub_server):
+        url = stub_server.route('/video', (429, {'Retry-After': '0'}), 200)
+        [result] = check_plan(make_plan(url), probes={})
+        assert result.accessible
+        assert [path for _, path in stub_server.requests] == ['/video', '/video']
+
+    def test_gives_up_after_max_retries(self, stub_server):
+        url = stub_server.route('/video', (503, {'Retry-After': '0'}))
+        [result] = check_plan(make_plan(url), probes={}, max_retries=1)
+        assert not result.accessible
+        assert result.status_code == 503
+        assert "after 1 retries" in result.error_message
+
+
+class TestCanonicalizeUrl:
+    @pytest.mark.parametrize('url, expected', [
+        ('https://youtu.be/abc123', 'https://youtube.com/watch?v=abc123'),
+        ('https://www.youtube.com/watch?v=abc123&si=x&t=5', 'https://youtube.com/watch?v=abc123'),
+        ('https://m.youtube.com/shorts/abc123/', 'https://youtube.com/watch?v=abc123'),
+        ('https://www.youtube.com/embed/abc123?feature=oembed', 'https://youtube.com/watch?v=abc123'),
+        ('https://player.vimeo.com/video/76979871', 'https://vimeo.com/76979871'),
+        ('https://vimeo.com/channels/staffpicks/76979871', 'https://vimeo.com/76979871'),
+        ('https://www.youtube.com/@channel?si=x', 'https://youtube.com/@channel'),
+        ('https://streamable.com/abc?utm_source=x&b=2&a=1', 'https://streamable.com/abc?a=1&b=2'),
+    ])
+    def test_video_hosts_collapse(self, url, expected):
+        assert canonicalize_url(url) == expected
+
+    @pytest.mark.parametrize('url, expected', [
+        ('https://github.com/o/r/blob/x?ref=main', 'https://github.com/o/r/blob/x?ref=main'),
+        ('https://www.example.org/page?feature=a', 'https://www.example.org/page?feature=a'),
+        ('HTTPS://Example.org:443#top', 'https://example.org/'),
+    ])
+    def test_other_hosts_keep_their_query_and_host(self, url, expected):
+        assert canonicalize_url(url) == expected
+
+    def test_plan_probes_the_link_as_written(self, stub_server):
+        written = stub_server.route('/page', 200) + '?ref=main&utm_source=x'
+        plan = make_plan(written, written + ' ')
+        assert len(plan.references) == 1
+
+        results = check_plan(plan, probes={})
+        assert [result.accessible for result in results] == [True, True]
+        assert stub_server.requests == [('HEAD', '/page?ref=main&utm_source=x')]
+
+
+class TestOEmbedProbe:
+    VIDEO = "https://www.youtube.com/watch?v=abc123"
+
+    @pytest.mark.parametrize('status, accessible, message', [
+        (200, True, None),
+        (400, False, "Not a valid video link"),
+        (401, False, "Video is private or cannot be embedded"),
+        (403, False, "Video is private or cannot be embedded"),
+        (404, False, "Video not found (removed or never published)"),
+        (500, False, "oEmbed lookup failed (HTTP 500)"),
+    ])
+    def test_status_mapping(self, stub_server, status, accessible, message):
+        endpoint = stub_server.route('/oembed', status)
+        probe = OEmbedProbe(endpoint)(self.VIDEO)
+        assert (probe.accessible, probe.status_code, probe.error_message) == (accessible, status, message)
+        assert probe.final_url == self.VIDEO
+
+    def test_asks_for_the_link_as_json(self, stub_server):
+        endpoint = stub_server.route('/oembed', 200)
+        OEmbedProbe(endpoint)(self.VIDEO)
+        [(method, path)] = stub_server.requests
+        assert method == 'GET'
+        assert 'url=https%3A%2F%2Fwww.youtube.com%2Fwatch%3Fv%3Dabc123' in path
+        assert 'format=json' in path
+
+    def test_rate_limit_carries_retry_after(self, stub_server):
+        endpoint = stub_server.route('/oembed', (429, {'Retry-After': '7'}))
+        probe = OEmbedProbe(endpoint)(self.VIDEO)
+        assert probe.status_code == 429
+        assert probe.retry_after == 7.0
+
+    def test_unreachable_endpoint(self):
+        probe = OEmbedProbe("http://127.0.0.1:9/oembed")(self.VIDEO, timeout=2)
+        assert not probe.accessible and probe.unreachable
+
+    def test_unexpected_errors_become_a_probe(self):
+        class BrokenSession:
+            def get(self, *args, **kwargs):
+                raise ValueError("bad payload")
+
+        probe = OEmbedProbe("http://127.0.0.1:9/oembed")(self.VIDEO, session=BrokenSession())
+        assert not probe.accessible
+        assert probe.error_message == "Unexpected error: bad payload"
+
+    @pytest.mark.parametrize('url, uses_oembed', [
+        ("https://youtu.be/abc123", True),
+        ("https://www.youtube.com/shorts/abc123", True),
+        ("https://vimeo.com/76979871", True),
+        ("https://www.youtube.com/@channel", False),
+        ("https://www.youtube.com/playlist?list=PL123", False),
+        ("https://vimeo.com/someuser", False),
+        ("https://example.com/video.mp4", False),
+    ])
+    def test_only_single_videos_use_oembed(self, url, uses_oembed):
+        assert isinstance(select_probe(url, platform_probes()), OEmbedProbe) == uses_oembed
+
+    def test_check_plan_uses_the_endpoint(self, stub_server):
+        endpoint = stub_server.route('/oembed', 404)
+        results = check_plan(make_plan(self.VIDEO, "https://youtu.be/abc123"),
+                             probes=platform_probes({'youtube.com': endpoint}))
+        assert [result.error_message for result in results] == ["Video not found (removed or never published)"] * 2
+        assert len(stub_server.requests) == 1
+
+
+class TestShards:
+    LINKS = [f"https://example.com/video/{number}" for number in range(40)]
+
+    def test_shards_partition_the_plan(self):
+        plan = make_plan(*self.LINKS)
+        shards = [plan.shard(index, 4) for index in range(1, 5)]
+        keys = [key for shard in shards for key in shard.references]
+        assert sorted(keys) == sorted(plan.references)
+        assert all(shard.links.keys() == shard.references.keys() for shard in shards)
+        assert sum(len(shard.file_order) for shard in shards) == len(plan.file_order)
+
+    def test_merge_combines_every_shard(self, tmp_path):
+        save_results(tmp_path / "1.json", [make_result('b')], (1, 2), {'hits': 1, 'revalidated': 0, 'misses': 2})
+        save_results(tmp_path / "2.json", [make_result('a', accessible=False)], (2, 2),
+                     {'hits': 0, 'revalidated': 1, 'misses': 1})
+
+        results, cache_stats, problems = merge_results([tmp_path / "1.json", tmp_path / "2.json"])
+        assert [result.prompt_title for result in results] == ['a', 'b']
+        assert not results[0].accessible
+        assert cache_stats == {'hits': 1, 'revalidated': 1, 'misses': 3}
+        assert problems == []
+
+    def test_merge_reports_missing_and_repeated_shards(self, tmp_path):
+        save_results(tmp_path / "1.json", [make_result('a')], (1, 3))
+        save_results(tmp_path / "1-again.json", [make_result('a')], (1, 3))
+
+        _, _, problems = merge_results([tmp_path / "1.json", tmp_path / "1-again.json", tmp_path / "absent.json"])
+        assert any("already read" in problem for problem in problems)
+        assert any("absent.json" in problem for problem in problems)
+        assert any("missing shard(s): 2, 3" in problem for problem in problems)
+
+    def test_merge_rejects_mixed_shard_counts(self, tmp_path):
+        save_results(tmp_path / "1.json", [make_result('a')], (1, 2))
+        save_results(tmp_path / "2.json", [make_result('b')], (2, 3))
+
+        _, _, problems = merge_results([tmp_path / "1.json", tmp_path / "2.json"])
+        assert any("different shard counts" in problem for problem in problems)
+
+
+def test_duplicate_links_are_probed_once(stub_server):
+    url = stub_server.route('/video', 200)
+    results = check_plan(make_plan(url, url, url + '#t=3'), probes={})
+    assert [result.accessible for result in results] == [True, True, True]
+    assert len(stub_server.requests) == 1
+
+
+def test_head_failure_falls_back_to_get(stub_server):
+    url = stub_server.route('/video', 405, 200)
+    assert check_links.probe_link(url).accessible
+    assert [method for method, _ in stub_server.requests] == ['HEAD', 'GET']
+
+
+def test_main_reports_cache_stats_taken_before_closing(stub_server, tmp_path, monkeypatch):
+    from link_cache import LinkCache
+
+    prompt = tmp_path / "prompts" / "cinematic" / "p.yaml"
+    prompt.parent.mkdir(parents=True)
+    prompt.write_text(f"title: P\ndemo_link: {stub_server.route('/v/1', 200)}\n", encoding='utf-8')
+
+    stats = LinkCache.stats
+
+    def stats_while_open(cache):
+        cache.conn.execute("SELECT 1")  # raises ProgrammingError once the connection is closed
+        return stats(cache)
+
+    monkeypatch.setattr(LinkCache, 'stats', stats_while_open)
+    results_path = tmp_path / "results.json"
+    with pytest.raises(SystemExit) as exit_info:
+        check_links.main([str(tmp_path / "prompts"), '--cache', str(tmp_path / "links.sqlite"),
+                          '--results', str(results_path), '--no-platform-probes'])
+    assert exit_info.value.code == 0
+
+    _, results, cache_stats = check_links.load_results(results_path)
+    assert [result.accessible for result in results] == [True]
+    assert cache_stats == {'hits': 0, 'revalidated': 0, 'misses': 1}
@@ -0,0 +1,114 @@
+"""Ranking and report formatting of prompt performance."""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from identify_top_performers import (CATEGORY_TOP_N, SCORE_LABELS, PromptPerformance, StreamingRanker, TopKHeap,
+                                     calculate_top_performers, extract_performance, format_for_readme,
+                                     load_prompt, ranker_from_store)
+from metrics_store import MetricsStore
+
+
+def make_performance(name, retention_3s=80.0, retention_5s=60.0, completion_rate=50.0, category='cinematic'):
+    return PromptPerformance(Path(f"/repo/prompts/{category}/{name}.yaml"), name.title(), category,
+                             retention_3s, retention_5s, completion_rate, None, 0.0, "2025-10-14")
+
+
+class TestReadmeFormat:
+    def test_snapshot_scores_are_weighted_scores(self):
+        output = format_for_readme([make_performance('noir')])
+        assert "| Weighted score: 65.00" in output
+        assert "*Scores based on: retention_3s × 0.4 + retention_5s × 0.3 + completion_rate × 0.3*" in output
+
+    def test_history_scores_are_labelled_with_their_mode(self):
+        perf = make_performance('noir')
+        perf.weighted_score = 2.5
+        output = format_for_readme([perf], SCORE_LABELS['trend'],
+                                   "score trend over the last 28 days (points per week)")
+        assert "| Trend (points/week): 2.50" in output
+        assert "Weighted score" not in output
+        assert "*Scores: score trend over the last 28 days (points per week) from the performance history" in output
+
+
+def random_performances(seed, count):
+    """Performances with few distinct scores, so ties are common."""
+    rng = random.Random(seed)
+    performances = []
+    for index in range(count):
+        perf = make_performance(f"prompt-{index}", category=rng.choice(['cinematic', 'animation', 'experimental']))
+        perf.weighted_score = float(rng.randint(0, 10))
+        performances.append(perf)
+    return performances
+
+
+def full_sort(performances):
+    """Reference ranking: a stable sort, best first, earlier arrivals first on equal score."""
+    return sorted(performances, key=lambda perf: perf.weighted_score, reverse=True)
+
+
+def names(performances):
+    return [perf.title for perf in performances]
+
+
+class TestRanking:
+    @pytest.mark.parametrize('seed', range(5))
+    @pytest.mark.parametrize('k', [0, 1, 3, 10, 99, 100, 150])
+    def test_heap_matches_a_full_sort(self, seed, k):
+        performances = random_performances(seed, 100)
+        heap = TopKHeap(k)
+        for perf in performances:
+            heap.push(perf)
+        assert names(heap.ranked()) == names(full_sort(performances)[:k])
+        assert names(heap.ranked(2)) == names(full_sort(performances)[:min(k, 2)])
+
+    @pytest.mark.parametrize('seed', range(5))
+    @pytest.mark.parametrize('top_percent', [0.01, 0.1, 0.25, 1.0])
+    def test_ranker_matches_a_full_sort(self, seed, top_percent):
+        performances = random_performances(seed, 250)
+        top_count = max(1, int(len(performances) * top_percent))
+        ranker = StreamingRanker(top_count, top_percent).consume(iter(performances))
+
+        expected = full_sort(performances)[:top_count]
+        assert names(ranker.top_performers()) == names(expected)
+        assert ranker.cutoff_score() == expected[-1].weighted_score
+
+        for category, stats in ranker.categories.items():
+            members = [perf for perf in performances if perf.category == category]
+            assert stats.count == len(members)
+            assert stats.average_score == pytest.approx(sum(perf.weighted_score for perf in members) / len(members))
+            assert names(stats.top.ranked()) == names(full_sort(members)[:CATEGORY_TOP_N])
+
+    def test_one_shot_iterator_ranks_like_a_list(self):
+        performances = random_performances(7, 300)
+        assert names(calculate_top_performers(iter(performances), 0.1, max_count=len(performances))) == \
+            names(calculate_top_performers(performances, 0.1)) == names(full_sort(performances)[:30])
+
+    def test_empty_input(self):
+        ranker = StreamingRanker(10).consume([])
+        assert (ranker.top_performers(), ranker.cutoff_score(), ranker.categories) == ([], None, {})
+        assert calculate_top_performers([]) == []
+
+    def test_store_ranking_matches_the_streaming_ranker(self, tmp_path):
+        rng = random.Random(3)
+        files = []
+        for index in range(60):
+            file_path = tmp_path / f"prompt-{index:02d}.yaml"
+            file_path.write_text(
+                f"title: Prompt {index}\ncategory: {rng.choice(['cinematic', 'animation'])}\n"
+                f"performance: {{retention_3s: {rng.choice([60, 70, 80])}, retention_5s: {rng.choice([50, 60])}, "
+                f"completion_rate: 40}}\n", encoding='utf-8')
+            files.append(file_path)
+
+        streaming = StreamingRanker(6).consume(extract_performance(load_prompt(f), f) for f in files)
+        store = MetricsStore.build(files)
+        from_store = ranker_from_store(store)
+
+        assert names(from_store.top_performers()) == names(streaming.top_performers())
+        assert from_store.categories.keys() == streaming.categories.keys()
+        for category, stats in streaming.categories.items():
+            assert from_store.categories[category].count == stats.count
+            assert from_store.categories[category].average_score == pytest.approx(stats.average_score)
+            assert names(from_store.categories[category].top.ranked()) == names(stats.top.ranked())
+        store.close()
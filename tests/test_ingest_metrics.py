@@ -0,0 +1,184 @@
+"""Text-level rewrites of the performance block, checked by re-parsing the result."""
+
+import json
+from datetime import date
+
+import pytest
+import yaml
+
+import ingest_metrics
+from ingest_metrics import PromptIndex, apply_update, check_round_trip, parse_args, rewrite_performance
+from performance_history import PerformanceHistory
+
+METRICS = {'retention_3s': 61.5, 'completion_rate': 33.0}
+
+
+def rewrite(text, metrics=METRICS):
+    updated = rewrite_performance(text, metrics)
+    assert check_round_trip(text, updated, metrics, 'test.yaml') is None
+    return updated
+
+
+class TestRewritePerformance:
+    def test_keeps_inline_and_column_zero_comments(self):
+        text = ("title: A\n"
+                "performance:\n"
+                "  retention_3s: 50.0  # first pass\n"
+                "# column-0 note inside the block\n"
+                "  completion_rate: 40.0\n"
+                "created: \"2025-10-14\"\n")
+        assert rewrite(text) == ("title: A\n"
+                                 "performance:\n"
+                                 "  retention_3s: 61.5  # first pass\n"
+                                 "# column-0 note inside the block\n"
+                                 "  completion_rate: 33.0\n"
+                                 "created: \"2025-10-14\"\n")
+
+    def test_leaves_nested_keys_alone(self):
+        text = ("performance:\n"
+                "  retention_3s: 50.0\n"
+                "  source:\n"
+                "    retention_3s: 10\n"
+                "    completion_rate: 5\n"
+                "  replays: 1\n"
+                "created: x\n")
+        updated = rewrite(text)
+        assert "    retention_3s: 10\n    completion_rate: 5\n" in updated
+        assert yaml.safe_load(updated)['performance'] == {
+            'retention_3s': 61.5, 'source': {'retention_3s': 10, 'completion_rate': 5},
+            'replays': 1, 'completion_rate': 33.0,
+        }
+
+    def test_rewrites_flow_mapping_as_block(self):
+        text = "title: A\nperformance: {retention_3s: 50, replays: 2}  # from export\ncreated: x\n"
+        assert rewrite(text) == ("title: A\n"
+                                 "performance: # from export\n"
+                                 "  retention_3s: 61.5\n"
+                                 "  replays: 2\n"
+                                 "  completion_rate: 33.0\n"
+                                 "created: x\n")
+
+    def test_keeps_crlf_line_endings(self):
+        text = "title: A\r\nperformance:\r\n  retention_3s: 50.0  # note\r\n  replays: 3\r\ncreated: x\r\n"
+        updated = rewrite(text)
+        assert updated == ("title: A\r\nperformance:\r\n  retention_3s: 61.5  # note\r\n  replays: 3\r\n"
+                           "  completion_rate: 33.0\r\ncreated: x\r\n")
+        assert "\n" not in updated.replace("\r\n", "")
+
+    def test_keeps_crlf_line_endings_of_flow_mapping(self):
+        updated = rewrite("title: A\r\nperformance: {replays: 2}\r\ncreated: x\r\n")
+        assert "\n" not in updated.replace("\r\n", "")
+
+    def test_appends_missing_block(self):
+        assert rewrite("title: A\ncreated: x") == ("title: A\ncreated: x\n\n"
+                                                   "performance:\n"
+                                                   "  retention_3s: 61.5\n"
+                                                   "  completion_rate: 33.0\n")
+        assert rewrite("title: A\r\n").endswith("\r\n\r\nperformance:\r\n  retention_3s: 61.5\r\n"
+                                                "  completion_rate: 33.0\r\n")
+
+    def test_adds_missing_metrics_at_block_indent(self):
+        text = "performance:\n    replays: 1\ncreated: x\n"
+        assert rewrite(text) == ("performance:\n    replays: 1\n"
+                                 "    retention_3s: 61.5\n    completion_rate: 33.0\ncreated: x\n")
+
+    def test_equal_value_keeps_its_spelling(self):
+        text = "performance:\n  retention_3s: 85\n"
+        assert rewrite_performance(text, {'retention_3s': 85.0}) == text
+
+
+class TestRoundTripCheck:
+    def test_reports_keys_that_changed_unexpectedly(self):
+        original = "title: A\nperformance:\n  replays: 1\n"
+        updated = "title: B\nperformance:\n  replays: 2\n"
+        assert check_round_trip(original, updated, {'replays': 2}, 'test.yaml') == \
+            "rewritten file does not round-trip (title)"
+        assert check_round_trip(original, "title: A\nperformance:\n  replays: 3\n", {'replays': 2},
+                                'test.yaml') == "rewritten file does not round-trip (replays)"
+
+    def test_rejected_rewrite_leaves_the_file_alone(self, tmp_path):
+        # The anchor is lost when the block is rewritten, so the alias no longer resolves
+        text = "title: A\nperformance: &perf\n  replays: 1\nbaseline: *perf\n"
+        file_path = tmp_path / "anchored.yaml"
+        file_path.write_text(text, encoding='utf-8')
+
+        path, status, error = apply_update(str(file_path), {'replays': 5})
+
+        assert (path, status) == (str(file_path), 'error')
+        assert error
+        assert file_path.read_text(encoding='utf-8') == text
+
+    def test_mismatching_rewrite_is_not_written(self, tmp_path, monkeypatch):
+        text = "title: A\nperformance:\n  replays: 1\n"
+        file_path = tmp_path / "prompt.yaml"
+        file_path.write_text(text, encoding='utf-8')
+        monkeypatch.setattr('ingest_metrics.rewrite_performance',
+                            lambda text, metrics: text.replace("replays: 1", "replays: 1\n  extra: true"))
+
+        assert apply_update(str(file_path), {'replays': 1}) == (
+            str(file_path), 'error', "rewritten file does not round-trip (extra)")
+        assert file_path.read_text(encoding='utf-8') == text
+
+    def test_applied_rewrite_is_written(self, tmp_path):
+        file_path = tmp_path / "prompt.yaml"
+        file_path.write_bytes(b"title: A\r\nperformance:\r\n  replays: 1\r\n")
+
+        assert apply_update(str(file_path), {'replays': 4}) == (str(file_path), 'updated', None)
+        assert file_path.read_bytes() == b"title: A\r\nperformance:\r\n  replays: 4\r\n"
+        assert apply_update(str(file_path), {'replays': 4}) == (str(file_path), 'unchanged', None)
+
+
+class TestPromptIndex:
+    def test_resolves_slug_title_and_path(self, prompt_library):
+        index = PromptIndex(prompt_library, cache_path=None).refresh()
+        expected = str(prompt_library / "cinematic" / "noir-detective.yaml")
+
+        assert index.resolve({'slug': 'noir-detective'}) == (expected, None)
+        assert index.resolve({'path': 'cinematic/noir-detective.yaml'}) == (expected, None)
+        title = index.files[expected][4]
+        assert index.resolve({'title': f"  {title.upper()} "}) == (expected, None)
+
+    def test_numeric_cells_are_matched_as_text(self, prompt_library):
+        (prompt_library / "cinematic" / "noir-detective.yaml").rename(prompt_library / "cinematic" / "2049.yaml")
+        index = PromptIndex(prompt_library, cache_path=None).refresh()
+
+        assert index.resolve({'slug': 2049}) == (str(prompt_library / "cinematic" / "2049.yaml"), None)
+        assert index.resolve({'slug': 2049, 'category': 7}) == (None, "no prompt with slug '2049'")
+        assert index.resolve({'path': 12}) == (None, "unknown path '12'")
+        assert index.resolve({'title': 3.5}) == (None, "no prompt with title '3.5'")
+
+
+class TestArguments:
+    def test_date_becomes_a_day_number(self):
+        assert parse_args(['export.csv', '--date', '2025-10-20']).date == date(2025, 10, 20).toordinal()
+        assert parse_args(['export.csv']).date is None
+
+    @pytest.mark.parametrize('value', ['2025-13-40', 'yesterday', ''])
+    def test_bad_date_is_a_usage_error(self, value, capsys):
+        with pytest.raises(SystemExit) as exit_info:
+            parse_args(['export.csv', '--date', value])
+        assert exit_info.value.code == 2
+        assert f"argument --date: invalid date {value!r}" in capsys.readouterr().err
+
+
+def test_history_is_recorded_only_for_applied_rewrites(prompt_library, tmp_path, monkeypatch):
+    monkeypatch.setattr(PromptIndex.__init__, '__defaults__', (tmp_path / "prompt_index.pickle",))
+    anchored = prompt_library / "cinematic" / "noir-detective.yaml"
+    anchored.write_text(anchored.read_text(encoding='utf-8') + "performance: &perf\n  replays: 1\nbaseline: *perf\n",
+                        encoding='utf-8')
+    export = tmp_path / "export.jsonl"
+    export.write_text("\n".join(json.dumps(row) for row in (
+        {'slug': 'noir-detective', 'replays': 5},
+        {'slug': 'desert-wanderer', 'replays': 7},
+    )), encoding='utf-8')
+    history_path = tmp_path / "history.sqlite"
+
+    with pytest.raises(SystemExit):
+        ingest_metrics.main([str(export), '--prompts', str(prompt_library), '--jobs', '1',
+                             '--record-history', '--date', '2025-10-20', '--history', str(history_path)])
+
+    day = date(2025, 10, 20).toordinal()
+    with PerformanceHistory(history_path) as history:
+        assert history.measurements('cinematic', 'noir-detective') == []
+        assert history.measurements('cinematic', 'desert-wanderer') == [(day, None, None, None, 7, None)]
+    assert "replays: 7" in (prompt_library / "cinematic" / "desert-wanderer.yaml").read_text(encoding='utf-8')
@@ -0,0 +1,49 @@
+"""Columnar metrics store: value coercion and incremental refresh."""
+
+from metrics_store import MetricsStore
+
+
+def write_prompt(directory, name, performance):
+    file_path = directory / "cinematic" / f"{name}.yaml"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(f"title: {name}\ncategory: cinematic\nperformance: {performance}\n", encoding='utf-8')
+    return file_path
+
+
+def test_booleans_are_not_metrics(tmp_path):
+    files = [
+        write_prompt(tmp_path, 'flag', "{retention_3s: true, replays: true}"),
+        write_prompt(tmp_path, 'count', "{retention_3s: 80, replays: 4}"),
+        write_prompt(tmp_path, 'float-count', "{retention_3s: 80.5, replays: 4.0}"),
+        write_prompt(tmp_path, 'fraction', "{retention_3s: 80, replays: 2.5}"),
+    ]
+    store = MetricsStore.build(files)
+    rows = {store.string('title', row): row for row in range(store.rows)}
+
+    assert store.metric('replays', rows['flag']) is None
+    assert store.metric('retention_3s', rows['flag']) is None
+    assert store.metric('replays', rows['count']) == 4
+    assert store.metric('replays', rows['float-count']) == 4
+    assert store.metric('replays', rows['fraction']) is None
+    assert rows['flag'] not in store.rankable_rows()
+
+
+def test_refresh_writes_only_when_files_changed(tmp_path, monkeypatch):
+    files = [write_prompt(tmp_path, name, "{retention_3s: 70, replays: 1}") for name in ('a', 'b')]
+    store_path = tmp_path / "metrics.bin"
+    saves = []
+    save = MetricsStore.save
+    monkeypatch.setattr(MetricsStore, 'save', lambda self, path: saves.append(path) or save(self, path))
+
+    MetricsStore.refresh(files, store_path).close()
+    MetricsStore.refresh(files, store_path).close()
+    assert len(saves) == 1
+
+    write_prompt(tmp_path, 'a', "{retention_3s: 75, replays: 2}")
+    store = MetricsStore.refresh(files, store_path)
+    assert len(saves) == 2
+    assert sorted(store.metric('retention_3s', row) for row in range(store.rows)) == [70.0, 75.0]
+    store.close()
+
+    MetricsStore.refresh(files[:1], store_path).close()
+    assert len(saves) == 3
@@ -0,0 +1,39 @@
+"""Performance history aggregates computed inside SQLite."""
+
+import pytest
+
+from identify_top_performers import parse_args
+from performance_history import PerformanceHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    with PerformanceHistory(tmp_path / "history.sqlite") as history:
+        history.record_many([
+            ('cinematic', 'noir', 100, 50.0, 50.0, 50.0, None),
+            ('cinematic', 'noir', 110, 70.0, 70.0, 70.0, None),
+        ])
+        yield history
+
+
+def test_decay_weighs_recent_measurements_more(history):
+    scores = history.scores('decay', as_of=110, half_life_days=10)
+    assert scores[('cinematic', 'noir')] == pytest.approx((50.0 * 0.5 + 70.0) / 1.5)
+
+
+@pytest.mark.parametrize('half_life_days', [0, -5.0, float('nan')])
+def test_decay_rejects_non_positive_half_life(history, half_life_days):
+    with pytest.raises(ValueError, match="half-life must be positive"):
+        history.scores('decay', as_of=110, half_life_days=half_life_days)
+
+
+@pytest.mark.parametrize('value', ['0', '-3', 'nan', 'soon'])
+def test_half_life_option_rejects_non_positive_values(value, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(['--rank-by', 'decay', f'--half-life={value}'])
+    assert exit_info.value.code == 2
+    assert "argument --half-life" in capsys.readouterr().err
+
+
+def test_half_life_option_accepts_fractional_days():
+    assert parse_args(['--half-life', '7.5']).half_life == 7.5
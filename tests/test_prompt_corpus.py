@@ -0,0 +1,128 @@
+"""Parsed-YAML cache: lazy per-directory shards, staleness checks and parallel warm-up."""
+
+import os
+import pickle
+
+import pytest
+import yaml
+
+import prompt_corpus
+from conftest import PROJECT_ROOT
+from prompt_corpus import PromptCorpus, get_corpus
+from prompt_discovery import find_prompt_files
+from validate_prompts import PromptValidator
+
+
+def test_parallel_validation_warms_the_cache(prompt_library, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "corpus"
+    monkeypatch.setenv(prompt_corpus.CACHE_ENV_VAR, str(cache_dir))
+    files = find_prompt_files(prompt_library)
+
+    validator = PromptValidator(PROJECT_ROOT / "prompt.schema.json")
+    results = list(validator.validate_files(files, jobs=2))
+    get_corpus().save()
+
+    assert [path for path, _, _ in results] == files
+    assert all(is_valid for _, is_valid, _ in results)
+    warm = PromptCorpus(cache_dir)
+    for file_path in files:
+        warm.load(file_path)
+    assert (warm.parsed, warm.reused) == (0, len(files))
+
+
+def load_all(corpus, files):
+    return [corpus.load(file_path) for file_path in files]
+
+
+def rewrite(file_path, old, new):
+    text = file_path.read_text(encoding='utf-8')
+    assert old in text
+    file_path.write_text(text.replace(old, new, 1), encoding='utf-8')
+
+
+class TestPromptCorpus:
+    def test_documents_survive_a_round_trip_through_the_cache(self, prompt_library, tmp_path):
+        files = find_prompt_files(prompt_library)
+        cold = PromptCorpus(tmp_path / "corpus")
+        documents = load_all(cold, files)
+        cold.save()
+
+        warm = PromptCorpus(tmp_path / "corpus")
+        assert load_all(warm, files) == documents == [yaml.safe_load(f.read_text(encoding='utf-8')) for f in files]
+        assert (cold.parsed, warm.parsed, warm.reused) == (len(files), 0, len(files))
+
+    def test_one_shard_per_directory_read_on_first_lookup(self, prompt_library, tmp_path):
+        files = find_prompt_files(prompt_library)
+        cold = PromptCorpus(tmp_path / "corpus")
+        load_all(cold, files)
+        cold.save()
+        assert len(list((tmp_path / "corpus").glob("*.pickle"))) == 4
+
+        warm = PromptCorpus(tmp_path / "corpus")
+        warm.load(prompt_library / "cinematic" / "noir-detective.yaml")
+        assert list(warm._shards) == [str(prompt_library / "cinematic")]
+        assert len(warm._shards[str(prompt_library / "cinematic")]) == 3
+
+    def test_changed_file_is_parsed_again(self, prompt_library, tmp_path):
+        file_path = prompt_library / "cinematic" / "noir-detective.yaml"
+        cold = PromptCorpus(tmp_path / "corpus")
+        title = cold.load(file_path)['title']
+        cold.save()
+
+        rewrite(file_path, title, title[::-1])  # same size, new content
+        os.utime(file_path, ns=(1, 1))
+        warm = PromptCorpus(tmp_path / "corpus")
+        assert warm.load(file_path)['title'] == title[::-1]
+        assert warm.parsed == 1
+
+    def test_touched_but_unchanged_file_is_not_parsed_again(self, prompt_library, tmp_path):
+        file_path = prompt_library / "cinematic" / "noir-detective.yaml"
+        cold = PromptCorpus(tmp_path / "corpus")
+        document = cold.load(file_path)
+        cold.save()
+
+        os.utime(file_path, ns=(1, 1))
+        warm = PromptCorpus(tmp_path / "corpus")
+        assert warm.load(file_path) == document
+        assert (warm.parsed, warm.reused) == (0, 1)
+
+    @pytest.mark.parametrize('damage', ['garbage', 'truncated', 'empty', 'old version', 'other directory'])
+    def test_damaged_shard_is_parsed_again(self, prompt_library, tmp_path, damage):
+        file_path = prompt_library / "cinematic" / "noir-detective.yaml"
+        cold = PromptCorpus(tmp_path / "corpus")
+        document = cold.load(file_path)
+        cold.save()
+        (shard_path,) = (tmp_path / "corpus").glob("*.pickle")
+
+        data = shard_path.read_bytes()
+        version, directory, documents = pickle.loads(data)
+        shard_path.write_bytes({
+            'garbage': b"not a pickle",
+            'truncated': data[:len(data) // 2],
+            'empty': b"",
+            'old version': pickle.dumps((version - 1, directory, documents)),
+            'other directory': pickle.dumps((version, "/elsewhere", documents)),
+        }[damage])
+
+        warm = PromptCorpus(tmp_path / "corpus")
+        assert warm.load(file_path) == document
+        assert warm.parsed == 1
+        warm.save()
+        assert PromptCorpus(tmp_path / "corpus").load(file_path) == document
+
+    def test_save_drops_deleted_files(self, prompt_library, tmp_path):
+        files = find_prompt_files(prompt_library / "cinematic")
+        cold = PromptCorpus(tmp_path / "corpus")
+        load_all(cold, files)
+        files[0].unlink()
+        cold.save()
+
+        (shard_path,) = (tmp_path / "corpus").glob("*.pickle")
+        _, _, documents = pickle.loads(shard_path.read_bytes())
+        assert sorted(documents) == [str(file_path) for file_path in files[1:]]
+
+    def test_disabled_cache_writes_nothing(self, prompt_library, tmp_path):
+        corpus = PromptCorpus(None)
+        load_all(corpus, find_prompt_files(prompt_library))
+        corpus.save()
+        assert list(tmp_path.iterdir()) == [prompt_library]
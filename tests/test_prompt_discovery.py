@@ -0,0 +1,111 @@
+"""Prompt discovery: the same rules and order wherever the walk starts."""
+
+import subprocess
+
+import pytest
+
+from prompt_discovery import DiscoveryRules, find_prompt_files, iter_categories, prompts_root, relative_to_root
+
+EXCLUDES = [
+    (),
+    ('experimental/*',),
+    ('*-draft.yaml',),
+    ('cinematic/noir-detective.yaml', 'animation/*'),
+    ('*/nested/*',),
+    ('hyperrealism/*.yml',),
+]
+
+
+@pytest.fixture
+def library(prompt_library):
+    """The prompt library plus nested, draft, .yml, hidden, backup and non-prompt files."""
+    extra = [
+        "cinematic/nested/deep-shot.yaml",
+        "cinematic/nested/deeper/deepest.yml",
+        "experimental/glitch-draft.yaml",
+        "hyperrealism/rain-on-glass.yml",
+        "animation/.hidden.yaml",
+        "animation/watercolor-dreamscape.yaml~",
+        "animation/#autosave.yaml#",
+        "animation/.drafts/secret.yaml",
+        "cinematic/notes.txt",
+        "top-level.yaml",
+        "empty-category/README.md",
+    ]
+    for name in extra:
+        (prompt_library / name).parent.mkdir(parents=True, exist_ok=True)
+        (prompt_library / name).write_text("title: Extra\n", encoding='utf-8')
+    return prompt_library
+
+
+def start_points(root):
+    """The root, every directory below it and every file, as a walk could be started."""
+    return [root] + sorted(path for path in root.rglob("*"))
+
+
+@pytest.mark.parametrize('exclude', EXCLUDES, ids=lambda exclude: ','.join(exclude) or 'none')
+def test_walks_agree_wherever_they_start(library, exclude):
+    rules = DiscoveryRules(exclude=exclude)
+    everything = find_prompt_files(library, rules)
+    assert everything == sorted(everything)
+
+    for start in start_points(library):
+        expected = [path for path in everything if path == start or start in path.parents]
+        assert find_prompt_files(start, rules) == expected, start
+        if start.is_file():
+            assert rules.accepts_path(start) == (start in everything)
+
+
+def test_rules_applied(library):
+    found = [relative_to_root(path) for path in find_prompt_files(library, DiscoveryRules(exclude=('*-draft.yaml',)))]
+    assert "cinematic/nested/deeper/deepest.yml" in found
+    assert "hyperrealism/rain-on-glass.yml" in found
+    assert "top-level.yaml" in found
+    assert not [name for name in found if "draft" in name or "hidden" in name or "autosave" in name
+                or name.endswith(("~", ".txt", ".md"))]
+
+
+def test_exclude_matches_below_the_prompts_root(library):
+    rules = DiscoveryRules(exclude=('noir-detective.yaml',))
+    assert library / "cinematic" / "noir-detective.yaml" in find_prompt_files(library / "cinematic", rules)
+    rules = DiscoveryRules(exclude=('cinematic/noir-detective.yaml',))
+    assert library / "cinematic" / "noir-detective.yaml" not in find_prompt_files(library / "cinematic", rules)
+
+
+def test_root_outside_a_prompts_directory(library, tmp_path):
+    outside = tmp_path / "library"
+    library.rename(outside)
+    assert prompts_root(outside / "cinematic") == outside / "cinematic"
+    assert prompts_root(outside / "cinematic" / "noir-detective.yaml") == outside / "cinematic"
+    rules = DiscoveryRules(exclude=('noir-detective.yaml',))
+    assert outside / "cinematic" / "noir-detective.yaml" not in find_prompt_files(outside / "cinematic", rules)
+
+
+@pytest.mark.parametrize('exclude', EXCLUDES, ids=lambda exclude: ','.join(exclude) or 'none')
+def test_git_listing_matches_the_walk(library, tmp_path, exclude):
+    subprocess.run(['git', 'init', '-q'], cwd=tmp_path, check=True)
+    subprocess.run(['git', 'add', 'prompts/cinematic'], cwd=tmp_path, check=True)
+    walk = DiscoveryRules(exclude=exclude)
+    git = DiscoveryRules(exclude=exclude, use_git=True)
+
+    for start in [library, library / "cinematic", library / "cinematic" / "nested", library / "animation"]:
+        assert find_prompt_files(start, git) == find_prompt_files(start, walk), start
+
+
+def test_git_listing_leaves_out_ignored_files(library, tmp_path):
+    subprocess.run(['git', 'init', '-q'], cwd=tmp_path, check=True)
+    (tmp_path / ".gitignore").write_text("*-draft.yaml\n", encoding='utf-8')
+    found = find_prompt_files(library, DiscoveryRules(use_git=True))
+    assert library / "experimental" / "glitch-draft.yaml" not in found
+    assert library / "experimental" / "glitch-aesthetic.yaml" in found
+
+
+def test_categories_group_the_walk(library):
+    rules = DiscoveryRules(exclude=('experimental/*',))
+    categories = list(iter_categories(library, rules))
+
+    assert [category for category, _ in categories] == [
+        'animation', 'cinematic', 'empty-category', 'experimental', 'hyperrealism']
+    for category, prompt_files in categories:
+        assert [prompt_file.path for prompt_file in prompt_files] == [
+            path for path in find_prompt_files(library / category, rules) if path.parent.name == category]
@@ -0,0 +1,164 @@
+"""Faceted queries: bitmap filters and metric ranges agree with a scan of the documents."""
+
+import os
+import random
+import argparse
+
+import pytest
+import yaml
+
+from generate_corpus import write_corpus
+from prompt_discovery import find_prompt_files
+from query_prompts import (FACETS, METRICS, FacetIndex, bitmap_rows, extract_facets, extract_metrics, main,
+                           parse_where, rows_to_bitmap)
+
+OPERATORS = {
+    '>': lambda value, threshold: value > threshold,
+    '>=': lambda value, threshold: value >= threshold,
+    '<': lambda value, threshold: value < threshold,
+    '<=': lambda value, threshold: value <= threshold,
+    '=': lambda value, threshold: value == threshold,
+}
+
+
+@pytest.fixture(scope='module')
+def corpus(tmp_path_factory):
+    """A synthetic library and the (facets, metrics) of each document, keyed by absolute path."""
+    prompts_dir = write_corpus(tmp_path_factory.mktemp("corpus"), 300, seed=11)
+    files = find_prompt_files(prompts_dir)
+    documents = {}
+    for file_path in files:
+        document = yaml.safe_load(file_path.read_text(encoding='utf-8'))
+        documents[os.path.abspath(file_path)] = (extract_facets(document), extract_metrics(document))
+    return files, documents
+
+
+def scan(documents, filters, where):
+    """Reference answer: the sorted paths a plain loop over the documents would select."""
+    matches = []
+    for path, (facets, metrics) in documents.items():
+        if all(any(value.lower() in facets.get(facet, ()) for value in group)
+               for facet, groups in filters.items() for group in groups) and \
+                all(metric in metrics and OPERATORS[op](metrics[metric], threshold)
+                    for metric, op, threshold in where):
+            matches.append(path)
+    return sorted(matches)
+
+
+def random_query(rng, index):
+    filters = {}
+    for facet in rng.sample(list(FACETS), rng.randint(0, 2)):
+        values = sorted(index.bitmaps.get(facet, {})) or ['missing']
+        filters[facet] = [rng.sample(values + ['missing'], rng.randint(1, 2)) for _ in range(rng.randint(1, 2))]
+    where = []
+    for metric in rng.sample(METRICS, rng.randint(0, 2)):
+        column = index.columns[metric].values
+        threshold = rng.choice(list(column)) if column and rng.random() < 0.7 else rng.uniform(-5, 105)
+        where.append((metric, rng.choice(list(OPERATORS)), threshold))
+    return filters, where
+
+
+class TestBitmaps:
+    @pytest.mark.parametrize('rows', [[], [0], [7, 8], [3, 64, 65, 1000], list(range(0, 300, 3))])
+    def test_round_trip(self, rows):
+        bitmap = rows_to_bitmap(rows)
+        assert list(bitmap_rows(bitmap)) == rows
+        assert bitmap.bit_count() == len(rows)
+
+
+class TestQueries:
+    def test_random_queries_match_a_scan(self, corpus):
+        files, documents = corpus
+        index = FacetIndex(None)
+        index.update(files)
+        rng = random.Random(5)
+
+        for _ in range(300):
+            filters, where = random_query(rng, index)
+            result = index.query(filters, where)
+            expected = scan(documents, filters, where)
+            assert [record.path for record in result.records()] == expected, (filters, where)
+            assert result.count == len(expected)
+
+    def test_facet_counts_match_a_scan(self, corpus):
+        files, documents = corpus
+        index = FacetIndex(None)
+        index.update(files)
+        result = index.query({'category': [['cinematic']]})
+
+        for facet in FACETS:
+            expected = {}
+            for path in scan(documents, {'category': [['cinematic']]}, []):
+                for value in documents[path][0].get(facet, ()):
+                    expected[value] = expected.get(value, 0) + 1
+            counts = result.facet_counts(facet)
+            assert counts == expected
+            assert list(counts.values()) == sorted(counts.values(), reverse=True)
+
+    def test_values_match_case_insensitively(self, prompt_library):
+        index = FacetIndex(None)
+        index.update(find_prompt_files(prompt_library))
+        titles = [record.title for record in index.query({'tag': [['NOIR']], 'category': [['Cinematic']]}).records()]
+        assert titles == ["Noir Detective in Rain"]
+
+    def test_unknown_facet_and_metric(self):
+        index = FacetIndex(None)
+        with pytest.raises(ValueError, match="Unknown facet"):
+            index.query({'colour': [['red']]})
+        with pytest.raises(ValueError, match="Unknown metric"):
+            index.query(where=[('views', '>', 1.0)])
+
+
+class TestIndexUpdates:
+    def test_incremental_update_matches_a_fresh_index(self, prompt_library):
+        index = FacetIndex(None)
+        files = find_prompt_files(prompt_library)
+        assert index.update(files) == {'indexed': 12, 'unchanged': 0, 'removed': 0}
+
+        noir = prompt_library / "cinematic" / "noir-detective.yaml"
+        noir.write_text(noir.read_text(encoding='utf-8').replace("noir, rain", "noir, snow"), encoding='utf-8')
+        (prompt_library / "animation" / "cel-shaded-action.yaml").unlink()
+        files = find_prompt_files(prompt_library)
+        assert index.update(files) == {'indexed': 1, 'unchanged': 10, 'removed': 1}
+
+        fresh = FacetIndex(None)
+        fresh.update(files)
+        assert index.records == fresh.records
+        assert index.bitmaps == fresh.bitmaps
+        assert index.query({'tag': [['snow']]}).count == 1
+
+    def test_saved_index_is_reloaded(self, prompt_library, tmp_path):
+        index = FacetIndex(tmp_path / "facets.pickle")
+        index.update(find_prompt_files(prompt_library))
+        index.save()
+
+        reloaded = FacetIndex(tmp_path / "facets.pickle")
+        assert reloaded.records == index.records
+        assert reloaded.query({'category': [['hyperrealism']]}).count == 3
+        assert reloaded.update(find_prompt_files(prompt_library))['unchanged'] == 12
+
+    @pytest.mark.parametrize('content', [b"", b"not a pickle"])
+    def test_corrupt_index_is_empty(self, tmp_path, content):
+        (tmp_path / "facets.pickle").write_bytes(content)
+        assert FacetIndex(tmp_path / "facets.pickle").records == []
+
+
+class TestCommandLine:
+    @pytest.mark.parametrize('expression, parsed', [
+        ("completion_rate>60", ('completion_rate', '>', 60.0)),
+        (" replays >= 3 ", ('replays', '>=', 3.0)),
+        ("retention_3s==72.5", ('retention_3s', '=', 72.5)),
+    ])
+    def test_parse_where(self, expression, parsed):
+        assert parse_where(expression) == parsed
+
+    @pytest.mark.parametrize('expression', ["completion_rate", "views>3", "replays ~ 3"])
+    def test_parse_where_rejects(self, expression):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_where(expression)
+
+    def test_lists_matches(self, prompt_library, tmp_path, capsys):
+        main(['--tag', 'noir,coffee', '--prompts', str(prompt_library), '--index', str(tmp_path / "facets.pickle")])
+        output = capsys.readouterr().out
+        assert "🔎 2 of 12 prompts match" in output
+        assert "  - Noir Detective in Rain (cinematic) — prompts/cinematic/noir-detective.yaml" in output
@@ -0,0 +1,117 @@
+"""The compiled validity check agrees with Draft7Validator on mutated real prompts."""
+
+import copy
+import json
+from datetime import date
+
+import pytest
+import yaml
+from jsonschema import Draft7Validator
+
+from conftest import PROJECT_ROOT
+from prompt_discovery import find_prompt_files
+from schema_compiler import build_function, compile_schema
+
+SCHEMA = json.loads((PROJECT_ROOT / "prompt.schema.json").read_text(encoding='utf-8'))
+
+# One value of every YAML type, including look-alikes (bool vs int, 3.0 vs 3, date vs string)
+WRONG_TYPES = ["text", "", 0, 3, 3.0, 2.5, -1, True, False, None, [], ["a-tag"], {}, {'key': "value"},
+               date(2025, 10, 14)]
+
+
+def boundary_values(schema):
+    """Values just inside and just outside a property schema's constraints."""
+    values = []
+    for bound in ('minLength', 'maxLength'):
+        if bound in schema:
+            values.extend("x" * max(0, schema[bound] + delta) for delta in (-1, 0, 1))
+    if 'pattern' in schema:
+        values.extend(["2.0", "2.1.3", "2.x", "6-8 seconds", "6-8 second", "6 seconds", "2025-10-14",
+                       "2025-1-14", "https://example.com/v", "ftp://example.com", "golden-hour", "Golden_Hour"])
+    for bound in ('minimum', 'maximum'):
+        if bound in schema:
+            values.extend(schema[bound] + delta for delta in (-1, -0.5, 0, 0.5, 1))
+            values.append(float(schema[bound]))
+    if 'enum' in schema:
+        values.extend(schema['enum'] + [value.upper() for value in schema['enum']] + ["other"])
+    items = schema.get('items')
+    if items:
+        item = "x" * items.get('minLength', 1) if 'pattern' not in items else "tag"
+        values.extend([[], [item], [item, item], [f"{item}-{n}" for n in range(schema.get('maxItems', 3) + 1)],
+                       [item, 5], ["BAD TAG"], ["x"]])
+    return values
+
+
+def valid_example(schema):
+    """A value the reference validator accepts for a property schema."""
+    if schema.get('type') == 'object':
+        return {name: valid_example(sub) for name, sub in schema.get('properties', {}).items()}
+    validator = Draft7Validator(schema)
+    return next(value for value in boundary_values(schema) + WRONG_TYPES if validator.is_valid(value))
+
+
+def mutations(document, schema, path=()):
+    """Yield (description, mutated document) for every property of an object schema under ``path``."""
+    def copy_with_target():
+        mutated = copy.deepcopy(document)
+        target = mutated
+        for key in path:
+            target = target[key]
+        return mutated, target
+
+    where = '.'.join(path) or 'document'
+    for name in schema.get('required', []):
+        mutated, target = copy_with_target()
+        if name in target:
+            del target[name]
+            yield f"{where}.{name} missing", mutated
+
+    mutated, target = copy_with_target()
+    target['unexpected_key'] = "value"
+    yield f"{where} extra key", mutated
+
+    for name, property_schema in schema.get('properties', {}).items():
+        for value in WRONG_TYPES + boundary_values(property_schema):
+            mutated, target = copy_with_target()
+            target[name] = value
+            yield f"{where}.{name} = {value!r}", mutated
+        if property_schema.get('type') == 'object':
+            # Mutate inside the nested object, starting from a valid one if the prompt has none
+            base, target = copy_with_target()
+            if not isinstance(target.get(name), dict):
+                target[name] = valid_example(property_schema)
+            yield from mutations(base, property_schema, path + (name,))
+
+
+def real_prompts():
+    return [yaml.safe_load(file_path.read_text(encoding='utf-8'))
+            for file_path in find_prompt_files(PROJECT_ROOT / "prompts")]
+
+
+@pytest.fixture(scope='module')
+def checks():
+    return build_function(compile_schema(SCHEMA)), Draft7Validator(SCHEMA)
+
+
+@pytest.mark.parametrize('document', real_prompts(), ids=lambda document: document['title'])
+def test_compiled_check_matches_draft7_on_mutations(document, checks):
+    compiled, reference = checks
+    assert compiled(document) is True
+
+    mismatches = []
+    count = 0
+    for description, mutated in mutations(document, SCHEMA):
+        count += 1
+        if compiled(mutated) != reference.is_valid(mutated):
+            mismatches.append(f"{description}: compiled={compiled(mutated)} draft7={reference.is_valid(mutated)}")
+    assert count > 500
+    assert not mismatches, "\n".join(mismatches)
+
+
+@pytest.mark.parametrize('category', ['hyperrealism', 'cinematic'])
+def test_conditional_physics_requirement(category, checks):
+    compiled, reference = checks
+    for document in real_prompts():
+        mutated = dict(document, category=category)
+        mutated.pop('physics', None)
+        assert compiled(mutated) == reference.is_valid(mutated) == (category != 'hyperrealism')
@@ -0,0 +1,144 @@
+"""Full-text search: query building, BM25 ranking and incremental index updates."""
+
+import sqlite3
+
+import pytest
+
+from prompt_discovery import find_prompt_files
+from search_prompts import SearchIndex, build_match_query, main
+
+
+def write_prompt(directory, name, title, prompt, category='cinematic', tags=('placeholder',)):
+    file_path = directory / category / f"{name}.yaml"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(f"title: {title}\ncategory: {category}\ntags: [{', '.join(tags)}]\n"
+                         f"prompt: {prompt}\n", encoding='utf-8')
+    return file_path
+
+
+@pytest.fixture
+def index(tmp_path):
+    search_index = SearchIndex(tmp_path / "index.sqlite")
+    yield search_index
+    search_index.close()
+
+
+def titles(hits):
+    return [hit.title for hit in hits]
+
+
+class TestMatchQuery:
+    def test_terms_are_quoted_lowercased_and_deduplicated(self):
+        assert build_match_query("Golden hour GOLDEN") == '"golden" AND "hour"'
+        assert build_match_query("golden hour", match_any=True) == '"golden" OR "hour"'
+
+    def test_fts_syntax_is_not_interpreted(self):
+        assert build_match_query('noir" OR NEAR(rain*') == '"noir" AND "or" AND "near" AND "rain"'
+
+    def test_query_without_terms(self):
+        assert build_match_query(" -*\"() ") is None
+
+
+class TestSearch:
+    def test_finds_prompts_in_the_library(self, prompt_library, index):
+        assert index.update(find_prompt_files(prompt_library)) == {'indexed': 12, 'unchanged': 0, 'removed': 0}
+        assert titles(index.search("noir detective")) == ["Noir Detective in Rain"]
+        assert titles(index.search("coffee steam")) == ["Morning Coffee Pour"]
+        assert index.search("noir coffee") == []
+
+    def test_any_term_and_category_filter(self, prompt_library, index):
+        index.update(find_prompt_files(prompt_library))
+        both = titles(index.search("noir coffee", match_any=True))
+        assert sorted(both) == ["Morning Coffee Pour", "Noir Detective in Rain"]
+        assert titles(index.search("noir coffee", match_any=True, category='hyperrealism')) == ["Morning Coffee Pour"]
+
+    def test_title_matches_outrank_prompt_matches(self, tmp_path, index):
+        files = [
+            write_prompt(tmp_path, 'body', "Quiet street", "a lighthouse at dusk"),
+            write_prompt(tmp_path, 'title', "Lighthouse", "a quiet street at dusk"),
+        ]
+        index.update(files)
+        hits = index.search("lighthouse")
+        assert titles(hits) == ["Lighthouse", "Quiet street"]
+        assert hits[0].score > hits[1].score > 0
+
+    def test_limit(self, prompt_library, index):
+        index.update(find_prompt_files(prompt_library))
+        assert len(index.search("rain", match_any=True)) > 2
+        assert len(index.search("rain", limit=2)) == 2
+
+    def test_hostile_queries_do_not_raise(self, prompt_library, index):
+        index.update(find_prompt_files(prompt_library))
+        for query in ['"', 'NEAR(', 'title:noir', '*', 'AND OR NOT', "rain'; DROP TABLE docs; --"]:
+            index.search(query)
+        assert len(index) == 12
+
+
+class TestIndexUpdates:
+    def test_only_changed_files_are_reindexed(self, prompt_library, index):
+        files = find_prompt_files(prompt_library)
+        index.update(files)
+        assert index.update(files) == {'indexed': 0, 'unchanged': 12, 'removed': 0}
+
+        noir = prompt_library / "cinematic" / "noir-detective.yaml"
+        noir.write_text(noir.read_text(encoding='utf-8').replace("Noir Detective in Rain", "Gumshoe Under Lamplight"),
+                        encoding='utf-8')
+        (prompt_library / "hyperrealism" / "morning-coffee.yaml").unlink()
+        files = find_prompt_files(prompt_library)
+
+        assert index.update(files) == {'indexed': 1, 'unchanged': 10, 'removed': 1}
+        assert titles(index.search("gumshoe")) == ["Gumshoe Under Lamplight"]
+        assert index.search("coffee steam") == []
+        assert len(index) == 11
+
+    def test_incremental_index_answers_like_a_fresh_one(self, prompt_library, tmp_path, index):
+        index.update(find_prompt_files(prompt_library))
+        write_prompt(prompt_library, 'lantern', "Lantern Rain", "rain falls on a paper lantern")
+        (prompt_library / "animation" / "paper-cutout-forest.yaml").unlink()
+        index.update(find_prompt_files(prompt_library))
+
+        fresh = SearchIndex(tmp_path / "fresh.sqlite")
+        fresh.update(find_prompt_files(prompt_library))
+        for query in ["rain", "forest", "lantern", "neon night"]:
+            assert [(hit.path, hit.score) for hit in index.search(query, match_any=True)] == \
+                [(hit.path, hit.score) for hit in fresh.search(query, match_any=True)]
+        fresh.close()
+
+    def test_unreadable_file_is_dropped(self, prompt_library, index, capsys):
+        files = find_prompt_files(prompt_library)
+        index.update(files)
+        (prompt_library / "cinematic" / "noir-detective.yaml").write_text("title: [unclosed\n", encoding='utf-8')
+
+        assert index.update(files)['indexed'] == 0
+        assert index.search("noir detective") == []
+        assert "noir-detective.yaml" in capsys.readouterr().err
+
+    def test_index_persists_and_is_rebuilt_on_version_change(self, prompt_library, tmp_path):
+        first = SearchIndex(tmp_path / "index.sqlite")
+        first.update(find_prompt_files(prompt_library))
+        first.close()
+
+        reopened = SearchIndex(tmp_path / "index.sqlite")
+        assert len(reopened) == 12
+        reopened.close()
+
+        conn = sqlite3.connect(str(tmp_path / "index.sqlite"))
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+        conn.close()
+        outdated = SearchIndex(tmp_path / "index.sqlite")
+        assert len(outdated) == 0
+        outdated.close()
+
+
+class TestMain:
+    def test_prints_ranked_results(self, prompt_library, tmp_path, capsys):
+        main(['noir', '--prompts', str(prompt_library), '--index', str(tmp_path / "index.sqlite")])
+        output = capsys.readouterr().out
+        assert "Index updated: 12 indexed, 0 removed, 0 unchanged" in output
+        assert " 1. Noir Detective in Rain (cinematic)" in output
+        assert "prompts/cinematic/noir-detective.yaml" in output
+
+    def test_no_update_queries_the_index_as_is(self, prompt_library, tmp_path, capsys):
+        main(['noir', '--no-update', '--prompts', str(prompt_library), '--index', str(tmp_path / "index.sqlite")])
+        assert 'No prompts match "noir" (0 prompts searched)' in capsys.readouterr().out
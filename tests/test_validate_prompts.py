@@ -0,0 +1,166 @@
+"""Incremental and changed-file validation: the state file, git diffs and what main() revalidates."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import PROJECT_ROOT
+from validate_prompts import PromptValidator, ValidationState, git_changed_files, main
+
+SCHEMA_PATH = PROJECT_ROOT / "prompt.schema.json"
+
+
+def break_prompt(file_path):
+    """Make a prompt invalid without breaking its YAML."""
+    with open(file_path, 'a', encoding='utf-8') as f:
+        f.write("unexpected_key: value\n")
+
+
+def git(cwd, *args):
+    return subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                          cwd=cwd, capture_output=True, text=True, check=True).stdout
+
+
+@pytest.fixture
+def workspace(prompt_library, tmp_path, monkeypatch):
+    """The prompt library next to a copy of the schema, as main() expects from the working directory."""
+    shutil.copy(SCHEMA_PATH, tmp_path / "prompt.schema.json")
+    monkeypatch.chdir(tmp_path)
+    return prompt_library
+
+
+def run_main(*argv):
+    with pytest.raises(SystemExit) as exit_info:
+        main(list(argv))
+    return exit_info.value.code
+
+
+def validated_files(output):
+    return sorted(line.split()[1] for line in output.splitlines() if line.endswith(("- VALID", "- INVALID")))
+
+
+class TestValidationState:
+    def test_unchanged_file_is_recognised_after_a_reload(self, prompt_library, tmp_path):
+        file_path = prompt_library / "cinematic" / "noir-detective.yaml"
+        state = ValidationState(tmp_path / "state.json", "schema-1")
+        assert not state.is_unchanged(file_path)
+        state.record(file_path, True)
+        state.save()
+
+        assert ValidationState(tmp_path / "state.json", "schema-1").is_unchanged(file_path)
+
+    def test_edited_file_is_changed(self, prompt_library, tmp_path):
+        file_path = prompt_library / "cinematic" / "noir-detective.yaml"
+        state = ValidationState(tmp_path / "state.json", "schema-1")
+        state.record(file_path, True)
+
+        text = file_path.read_text(encoding='utf-8')
+        file_path.write_text(text.replace("title:", "title: ", 1), encoding='utf-8')
+        assert not state.is_unchanged(file_path)
+
+    def test_touched_file_with_same_content_is_unchanged(self, prompt_library, tmp_path):
+        file_path = prompt_library / "cinematic" / "noir-detective.yaml"
+        state = ValidationState(tmp_path / "state.json", "schema-1")
+        state.record(file_path, True)
+        state.save()
+
+        os.utime(file_path, ns=(1, 1))
+        reloaded = ValidationState(tmp_path / "state.json", "schema-1")
+        assert reloaded.is_unchanged(file_path)
+        assert reloaded.files[os.path.abspath(file_path)]['mtime_ns'] == 1
+
+    def test_invalid_file_is_forgotten(self, prompt_library, tmp_path):
+        file_path = prompt_library / "cinematic" / "noir-detective.yaml"
+        state = ValidationState(tmp_path / "state.json", "schema-1")
+        state.record(file_path, True)
+        state.record(file_path, False)
+        assert not state.is_unchanged(file_path)
+
+    def test_state_for_another_schema_is_ignored(self, prompt_library, tmp_path):
+        file_path = prompt_library / "cinematic" / "noir-detective.yaml"
+        state = ValidationState(tmp_path / "state.json", "schema-1")
+        state.record(file_path, True)
+        state.save()
+
+        assert not ValidationState(tmp_path / "state.json", "schema-2").is_unchanged(file_path)
+
+    def test_corrupt_state_file_is_empty(self, tmp_path):
+        (tmp_path / "state.json").write_text("{not json", encoding='utf-8')
+        assert ValidationState(tmp_path / "state.json", "schema-1").files == {}
+
+    def test_save_without_changes_writes_nothing(self, tmp_path):
+        ValidationState(tmp_path / "state.json", "schema-1").save()
+        assert not (tmp_path / "state.json").exists()
+
+
+class TestIncrementalValidation:
+    def test_second_run_only_revalidates_edited_files(self, workspace, capsys):
+        assert run_main('--incremental', '--state', 'state.json', 'prompts') == 0
+        assert len(validated_files(capsys.readouterr().out)) == 12
+
+        break_prompt(workspace / "animation" / "cel-shaded-action.yaml")
+        assert run_main('--incremental', '--state', 'state.json', 'prompts') == 1
+        output = capsys.readouterr().out
+        assert validated_files(output) == ["prompts/animation/cel-shaded-action.yaml"]
+        assert "11 unchanged prompts skipped" in output
+        assert "Summary: 11/12 prompts valid" in output
+
+    def test_invalid_files_are_revalidated_every_run(self, workspace, capsys):
+        break_prompt(workspace / "animation" / "cel-shaded-action.yaml")
+        run_main('--incremental', '--state', 'state.json', 'prompts')
+        capsys.readouterr()
+
+        assert run_main('--incremental', '--state', 'state.json', 'prompts') == 1
+        assert validated_files(capsys.readouterr().out) == ["prompts/animation/cel-shaded-action.yaml"]
+
+    def test_incremental_result_matches_a_full_run(self, workspace, capsys):
+        validator = PromptValidator(SCHEMA_PATH)
+        run_main('--incremental', '--state', 'state.json', 'prompts')
+        break_prompt(workspace / "hyperrealism" / "morning-coffee.yaml")
+
+        full = validator.validate_directory(workspace)
+        incremental = validator.validate_directory(workspace, state=ValidationState("state.json",
+                                                                                    validator.schema_hash))
+        capsys.readouterr()
+        assert incremental == full
+
+
+class TestChangedSince:
+    @pytest.fixture
+    def repository(self, workspace, tmp_path):
+        git(tmp_path, 'init', '-q')
+        git(tmp_path, 'add', '.')
+        git(tmp_path, 'commit', '-qm', "baseline")
+        return workspace
+
+    def test_lists_modified_and_untracked_files(self, repository, tmp_path):
+        break_prompt(repository / "animation" / "cel-shaded-action.yaml")
+        shutil.copy(repository / "cinematic" / "noir-detective.yaml", repository / "cinematic" / "copy.yaml")
+        (repository / "experimental" / "glitch-aesthetic.yaml").unlink()
+
+        changed = git_changed_files('HEAD', [repository, tmp_path / "prompt.schema.json"])
+        assert changed == {(repository / "animation" / "cel-shaded-action.yaml").resolve(),
+                           (repository / "cinematic" / "copy.yaml").resolve()}
+
+    def test_validates_only_changed_files(self, repository, capsys):
+        break_prompt(repository / "animation" / "cel-shaded-action.yaml")
+        assert run_main('--changed-since', 'HEAD', 'prompts') == 1
+        output = capsys.readouterr().out
+        assert validated_files(output) == ["prompts/animation/cel-shaded-action.yaml"]
+        assert "Summary: 0/1 prompts valid" in output
+
+    def test_nothing_changed(self, repository, capsys):
+        assert run_main('--changed-since', 'HEAD', 'prompts') == 0
+        assert "No changed YAML files" in capsys.readouterr().out
+
+    def test_schema_change_validates_everything(self, repository, tmp_path, capsys):
+        with open(tmp_path / "prompt.schema.json", 'a', encoding='utf-8') as f:
+            f.write("\n")
+        assert run_main('--changed-since', 'HEAD', 'prompts') == 0
+        assert len(validated_files(capsys.readouterr().out)) == 12
+
+    def test_unknown_ref_is_an_error(self, repository, capsys):
+        assert run_main('--changed-since', 'no-such-ref', 'prompts') == 1
+        assert "could not diff against no-such-ref" in capsys.readouterr().out
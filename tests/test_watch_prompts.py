@@ -0,0 +1,34 @@
+"""Watch mode keeps category READMEs in step with the shared discovery rules."""
+
+import re
+
+from conftest import PROJECT_ROOT
+from validate_prompts import PromptValidator
+from watch_prompts import WatchSession
+
+
+def retitle(file_path, title):
+    text, count = re.subn(r'^title:.*$', f'title: "{title}"', file_path.read_text(encoding='utf-8'),
+                          count=1, flags=re.MULTILINE)
+    assert count == 1
+    file_path.write_text(text, encoding='utf-8')
+
+
+def test_saving_prompts_keeps_yml_files_in_the_readme(prompt_library):
+    category = prompt_library / "cinematic"
+    yml_file = category / "noir-detective.yml"
+    (category / "noir-detective.yaml").rename(yml_file)
+
+    session = WatchSession(prompt_library, PromptValidator(PROJECT_ROOT / "prompt.schema.json"))
+    assert session.load_all() == 12
+
+    retitle(category / "desert-wanderer.yaml", "Desert Wanderer Revised")
+    session.handle_change(category / "desert-wanderer.yaml")
+    retitle(yml_file, "Noir Detective Revised")
+    session.handle_change(yml_file)
+
+    readme = (category / "README.md").read_text(encoding='utf-8')
+    assert "**Total Prompts**: 3" in readme
+    assert "Desert Wanderer Revised" in readme
+    assert "Noir Detective Revised" in readme
+    assert "(noir-detective.yml)" in readme